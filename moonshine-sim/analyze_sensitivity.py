@@ -0,0 +1,25 @@
+import time
+
+from moonshine.sensitivity import run_morris, run_sobol
+
+def run_sensitivity(n_samples=1 << 18, n_trajectories=20_000, workers=None):
+    """
+    Ranks the factors behind recovered power, flush interval and per-litre
+    carbon (factor ranges in data/sensitivity.yaml).
+    """
+    for model in ("node", "drift", "impact"):
+        start = time.perf_counter()
+        names, sobol = run_sobol(model, n_samples, workers=workers)
+        _, morris = run_morris(model, n_trajectories, workers=workers)
+        evaluations = n_samples * (len(names) + 2) + n_trajectories * (len(names) + 1)
+        print(f"--- Sensitivity: {model} ({evaluations:,} evaluations, {time.perf_counter() - start:.1f}s) ---")
+        for output, indices in sobol.items():
+            print(f"{output}:")
+            effects = morris[output]
+            for i in indices.total.argsort()[::-1]:
+                print(f"  {names[i]:<28} S1 {indices.first_order[i]:6.3f} | ST {indices.total[i]:6.3f} | "
+                      f"mu* {effects.mu_star[i]:10.4g} | sigma {effects.sigma[i]:10.4g}")
+        print()
+
+if __name__ == "__main__":
+    run_sensitivity()
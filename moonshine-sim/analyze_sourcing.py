@@ -1,16 +1,43 @@
-from moonshine.impact import ImpactAnalyzer, FEEDSTOCKS
+from moonshine.cache import cached
+from moonshine.impact import ImpactAnalyzer, Logistics, get_data_file
+from moonshine.instrument import span
+from moonshine.pareto import select_sourcing
+from moonshine.routes import DEFAULT_NETWORK_PATH, load_network
 from moonshine.thermo import Distiller
 
+@cached(data_files=lambda: [get_data_file()])
+def compare_sources(scenarios, fill_volume_l):
+    """
+    Impact columns plus the Pareto front/layers for a list of scenarios.
+    """
+    results = ImpactAnalyzer(volume_l=fill_volume_l).analyze_batch(
+        [s["key"] for s in scenarios], 0.0,
+        transport_carbon_kg_per_l=[Logistics.calculate_route_impact(1.0, s["legs"]) for s in scenarios],
+    )
+    front, layers = select_sourcing(results)
+    return results, front, layers
+
+@cached(data_files=lambda: [get_data_file(), DEFAULT_NETWORK_PATH])
+def optimize_routes(site, objective, fill_volume_l):
+    """
+    Impact columns and the chosen Route for every origin serving `site`.
+    """
+    solution = load_network().shortest_routes(objective, sites=[site])
+    results = solution.analyze(ImpactAnalyzer(volume_l=fill_volume_l))
+    routes = [solution.route(origin, site) for origin in results["origin"]]
+    return results, routes
+
+@span("analyze_sourcing.run_sourcing_comparison")
 def run_sourcing_comparison():
     # Volume for a single rack unit fill (estimated 5 Liters)
     fill_volume_l = 5.0
     
     scenarios = [
-        {"name": "Local Corn (Truck 100km)", "key": "CORN", "dist": 100, "mode": "TRUCK"},
-        {"name": "Distant Sugar Beet (Rail 1000km)", "key": "SUGAR_BEET", "dist": 1000, "mode": "RAIL"},
-        {"name": "Imported Sugarcane (Ship 8000km + Truck 200km)", "key": "SUGARCANE", "dist": 8200, "mode": "SHIP"},
-        {"name": "Local Cellulosic (Truck 50km)", "key": "CELLULOSIC", "dist": 50, "mode": "TRUCK"},
-        {"name": "Regional Potato (Truck 500km)", "key": "POTATO", "dist": 500, "mode": "TRUCK"},
+        {"name": "Local Corn (Truck 100km)", "key": "CORN", "legs": [(100, "TRUCK")]},
+        {"name": "Distant Sugar Beet (Rail 1000km)", "key": "SUGAR_BEET", "legs": [(1000, "RAIL")]},
+        {"name": "Imported Sugarcane (Ship 8000km + Truck 200km)", "key": "SUGARCANE", "legs": [(8000, "SHIP"), (200, "TRUCK")]},
+        {"name": "Local Cellulosic (Truck 50km)", "key": "CELLULOSIC", "legs": [(50, "TRUCK")]},
+        {"name": "Regional Potato (Truck 500km)", "key": "POTATO", "legs": [(500, "TRUCK")]},
     ]
     
     analyzer = ImpactAnalyzer(volume_l=fill_volume_l)
@@ -23,21 +50,26 @@ def run_sourcing_comparison():
     print(f"{'Scenario':<40} | {'CO2(kg)':<8} | {'Water(L)':<8} | {'W-Water(L)':<10} | {'Cost($)':<8}")
     print("-" * 85)
     
-    results = []
-    for s in scenarios:
-        res = analyzer.analyze_source(s["key"], s["dist"], s["mode"])
-        print(f"{s['name']:<40} | {res['total_carbon_kg']:<8.2f} | {res['total_water_l']:<8.1f} | {res['weighted_water_l']:<10.1f} | {res['total_cost_usd']:<8.2f}")
-        results.append((s['name'], res))
+    results, front, layers = compare_sources(scenarios, fill_volume_l)
+    names = [s["name"] for s in scenarios]
+    for i, name in enumerate(names):
+        print(f"{name:<40} | {results['total_carbon_kg'][i]:<8.2f} | {results['total_water_l'][i]:<8.1f} | {results['weighted_water_l'][i]:<10.1f} | {results['total_cost_usd'][i]:<8.2f}")
 
     # Identify bests
-    best_carbon = min(results, key=lambda x: x[1]['total_carbon_kg'])
-    best_water = min(results, key=lambda x: x[1]['weighted_water_l'])
-    best_cost = min(results, key=lambda x: x[1]['total_cost_usd'])
+    best_carbon = results['total_carbon_kg'].argmin()
+    best_water = results['weighted_water_l'].argmin()
+    best_cost = results['total_cost_usd'].argmin()
     
     print("-" * 85)
-    print(f"Best for Carbon: {best_carbon[0]} ({best_carbon[1]['total_carbon_kg']:.2f} kg)")
-    print(f"Best for Water:  {best_water[0]} ({best_water[1]['weighted_water_l']:.1f} Weighted L)")
-    print(f"Best for Cost:   {best_cost[0]} (${best_cost[1]['total_cost_usd']:.2f})")
+    print(f"Best for Carbon: {names[best_carbon]} ({results['total_carbon_kg'][best_carbon]:.2f} kg)")
+    print(f"Best for Water:  {names[best_water]} ({results['weighted_water_l'][best_water]:.1f} Weighted L)")
+    print(f"Best for Cost:   {names[best_cost]} (${results['total_cost_usd'][best_cost]:.2f})")
+
+    # Trade-off set across carbon, weighted water and cost
+    print("\n--- Pareto Set (Carbon / Weighted Water / Cost) ---")
+    for i in layers.argsort(kind="stable"):
+        tag = "non-dominated" if layers[i] == 0 else f"layer {layers[i]}"
+        print(f"{names[i]:<48} | {tag}")
     
     print("\n--- Break-even Analysis (Carbon) ---")
     be_km = analyzer.find_carbon_breakeven_distance("CORN", "SUGAR_BEET", mode_b="RAIL")
@@ -49,5 +81,18 @@ def run_sourcing_comparison():
     be_km_cane = analyzer.find_carbon_breakeven_distance("CORN", "SUGARCANE", mode_b="SHIP")
     print(f"Local Corn vs Imported Sugarcane (Ship): Sugarcane is better up to {be_km_cane:.0f} km")
 
+@span("analyze_sourcing.run_route_optimization")
+def run_route_optimization(site="SITE_DALLAS", objective="carbon"):
+    fill_volume_l = 5.0
+    network = load_network()
+    results, routes = optimize_routes(site, objective, fill_volume_l)
+
+    print(f"\n--- Route Optimization to {network.nodes[site]['name']} (min {objective}) ---")
+    for i in results["total_carbon_kg"].argsort():
+        route = routes[i]
+        path = " > ".join(f"{mode} {km:.0f}km" for km, mode in route.transport_legs)
+        print(f"{network.nodes[route.origin]['name']:<30} | {results['total_carbon_kg'][i]:<6.2f} kg | ${results['total_cost_usd'][i]:<6.2f} | {path}")
+
 if __name__ == "__main__":
     run_sourcing_comparison()
+    run_route_optimization()
@@ -0,0 +1,37 @@
+"""
+Compares the per-node Distiller loop against the batched analyze_nodes API.
+
+    python benchmarks/bench_distiller.py [n_nodes]
+"""
+import sys
+import time
+import numpy as np
+from moonshine.thermo import Distiller, analyze_nodes
+
+def bench(n_nodes=1_000_000, loop_sample=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    mixes = rng.uniform(0.5, 0.7, n_nodes)
+    tdps = rng.uniform(200, 1000, n_nodes)
+
+    # The scalar loop is timed on a sample and extrapolated; a full 1e6 run
+    # takes long enough to be annoying without changing the conclusion.
+    sample = min(loop_sample, n_nodes)
+    start = time.perf_counter()
+    for mix, tdp in zip(mixes[:sample], tdps[:sample]):
+        still = Distiller(mix_ratio=mix)
+        still.analyze_node(tdp)
+        still.get_flash_point()
+    loop_s = (time.perf_counter() - start) * n_nodes / sample
+
+    start = time.perf_counter()
+    analyze_nodes(mixes, tdps)
+    batch_s = time.perf_counter() - start
+
+    print(f"--- Distiller Benchmark ({n_nodes:,} nodes) ---")
+    print(f"Scalar loop (extrapolated): {loop_s:8.3f} s")
+    print(f"Batched analyze_nodes:      {batch_s:8.3f} s")
+    print(f"Speedup: {loop_s / batch_s:.0f}x")
+    return loop_s, batch_s
+
+if __name__ == "__main__":
+    bench(int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000)
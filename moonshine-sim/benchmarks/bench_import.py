@@ -0,0 +1,69 @@
+"""
+Cold vs warm import time of moonshine.impact, plus the cost of the first
+feedstock access (which is where YAML parsing now happens). Also checks
+that importing moonshine.evaluator on a cold cache does not load yaml.
+
+    python benchmarks/bench_import.py [repeats]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SIM_ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import time
+t0 = time.perf_counter()
+import moonshine.impact as impact
+t1 = time.perf_counter()
+impact.get_feedstocks()
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t1)
+"""
+
+EVALUATOR_PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import moonshine.evaluator
+print(time.perf_counter() - t0, int("yaml" in sys.modules))
+"""
+
+def _probe(cache_dir):
+    env = dict(os.environ, MOONSHINE_CACHE_DIR=str(cache_dir), PYTHONPATH=str(SIM_ROOT))
+    out = subprocess.run([sys.executable, "-c", PROBE], env=env, check=True,
+                         capture_output=True, text=True).stdout
+    import_s, access_s = (float(v) for v in out.split())
+    return import_s, access_s
+
+def _probe_evaluator(cache_dir):
+    env = dict(os.environ, MOONSHINE_CACHE_DIR=str(cache_dir), PYTHONPATH=str(SIM_ROOT))
+    out = subprocess.run([sys.executable, "-c", EVALUATOR_PROBE], env=env, check=True,
+                         capture_output=True, text=True).stdout
+    import_s, loaded_yaml = out.split()
+    return float(import_s), loaded_yaml == "1"
+
+def bench(repeats=5):
+    cold, warm, evaluator = [], [], []
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as cache:
+            cold.append(_probe(cache))  # empty cache: parses YAML
+            warm.append(_probe(cache))  # compiled cache populated
+        with tempfile.TemporaryDirectory() as cache:
+            evaluator.append(_probe_evaluator(cache))
+    cold_import, cold_access = (min(v) for v in zip(*cold))
+    warm_import, warm_access = (min(v) for v in zip(*warm))
+
+    print(f"--- moonshine.impact Import Benchmark (best of {repeats}) ---")
+    print(f"{'':<6} | {'import (ms)':<12} | {'first access (ms)':<18}")
+    print(f"{'cold':<6} | {cold_import*1e3:<12.2f} | {cold_access*1e3:<18.2f}")
+    print(f"{'warm':<6} | {warm_import*1e3:<12.2f} | {warm_access*1e3:<18.2f}")
+    evaluator_import = min(s for s, _ in evaluator)
+    evaluator_yaml = any(loaded for _, loaded in evaluator)
+    print(f"moonshine.evaluator cold import: {evaluator_import*1e3:.2f} ms | yaml loaded: {evaluator_yaml}")
+    return {"cold": (cold_import, cold_access), "warm": (warm_import, warm_access),
+            "evaluator_cold": (evaluator_import, evaluator_yaml)}
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
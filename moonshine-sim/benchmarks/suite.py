@@ -0,0 +1,297 @@
+"""
+Benchmark suite for the physics and impact hot paths, with baselines.
+
+    python benchmarks/suite.py run [--quick] [--output results.json] [--filter distiller]
+    python benchmarks/suite.py compare baseline.json [current.json] [--threshold 0.25]
+
+`run` times every case and writes JSON. `compare` reruns the suite (or
+reads a second JSON file) and exits with status 1 if any case is slower
+than its baseline by more than the threshold (0.25 = 25%).
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+SIM_ROOT = Path(__file__).resolve().parent.parent
+if str(SIM_ROOT) not in sys.path:
+    sys.path.insert(0, str(SIM_ROOT))
+
+FORMAT_VERSION = 1
+DEFAULT_THRESHOLD = 0.25
+BATCH_SIZE = 1_000_000
+QUICK_BATCH_SIZE = 10_000
+
+# name -> (setup(n) returning a zero-argument callable, scalar?, self_timed?)
+CASES = {}
+
+
+def case(name, scalar=False, self_timed=False):
+    # self_timed cases return their own duration in seconds per call
+    def register(setup):
+        CASES[name] = (setup, scalar, self_timed)
+        return setup
+    return register
+
+
+def _inputs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0.5, 0.7, n), rng.uniform(200, 1000, n)
+
+
+@case("distiller.analyze_node", scalar=True)
+def _analyze_node(n):
+    from moonshine.thermo import Distiller
+    still = Distiller(mix_ratio=0.60)
+    return lambda: still.analyze_node(tdp_watts=350)
+
+
+@case("distiller.analyze_nodes")
+def _analyze_nodes(n):
+    from moonshine.thermo import analyze_nodes
+    mixes, tdps = _inputs(n)
+    return lambda: analyze_nodes(mixes, tdps)
+
+
+@case("distiller.get_boiling_point", scalar=True)
+def _get_boiling_point(n):
+    from moonshine.thermo import Distiller
+    still = Distiller(mix_ratio=0.60)
+    return still.get_boiling_point
+
+
+@case("distiller.boiling_point")
+def _boiling_point(n):
+    from moonshine.thermo import boiling_point
+    mixes, _ = _inputs(n)
+    return lambda: boiling_point(mixes)
+
+
+@case("distiller.simulate_drift", scalar=True)
+def _simulate_drift(n):
+    from moonshine.thermo import Distiller
+    still = Distiller(mix_ratio=0.60)
+    return lambda: still.simulate_drift(leak_rate_vol_pct_per_day=0.5, days=30)
+
+
+@case("distiller.drift_and_flush_day")
+def _drift_batch(n):
+    from moonshine.thermo import drift_mix, solve_flush_day
+    mixes, _ = _inputs(n)
+    leaks = np.random.default_rng(1).uniform(0.1, 2.0, n)
+    return lambda: (drift_mix(mixes, leaks, 30), solve_flush_day(mixes, leaks))
+
+
+@case("startup.simulate_startup", scalar=True)
+def _simulate_startup(n):
+    from simulate_startup import simulate_startup
+    return lambda: simulate_startup(tdp_watts=350, fluid_volume_ml=500, verbose=False)
+
+
+@case("startup.solve_startup")
+def _solve_startup(n):
+    from moonshine.startup import solve_startup
+    _, tdps = _inputs(n)
+    volumes = np.random.default_rng(2).uniform(200, 2000, n)
+    return lambda: solve_startup(tdp_watts=tdps, fluid_volume_ml=volumes, loss_w_per_k=0.5)
+
+
+@case("impact.analyze_source", scalar=True)
+def _analyze_source(n):
+    from moonshine.impact import ImpactAnalyzer
+    analyzer = ImpactAnalyzer(volume_l=1000)
+    analyzer.analyze_source("CORN", 500)  # load data outside the timed call
+    return lambda: analyzer.analyze_source("SUGARCANE", 8000, "SHIP")
+
+
+@case("impact.analyze_batch")
+def _analyze_batch(n):
+    from moonshine.impact import ImpactAnalyzer, get_feedstock_table
+    analyzer = ImpactAnalyzer(volume_l=1000)
+    rng = np.random.default_rng(3)
+    feedstocks = rng.integers(0, len(get_feedstock_table().codes), n)
+    modes = rng.integers(0, 3, n)
+    distances = rng.uniform(0, 10000, n)
+    return lambda: analyzer.analyze_batch(feedstocks, distances, modes)
+
+
+@case("evaluator.run_evaluation", scalar=True)
+def _run_evaluation(n):
+    from moonshine.evaluator import run_evaluation
+    return lambda: run_evaluation(verbose=False)
+
+
+@case("evaluator.evaluate_designs")
+def _evaluate_designs(n):
+    from moonshine.evaluator import evaluate_designs
+    from moonshine.impact import get_feedstock_table
+    rng = np.random.default_rng(4)
+    args = (rng.uniform(200, 1000, n), rng.uniform(1, 10, n),
+            rng.integers(0, len(get_feedstock_table().codes), n), rng.uniform(0, 5000, n))
+    return lambda: evaluate_designs(*args)
+
+
+IMPORT_PROBE = """
+import time
+t0 = time.perf_counter()
+import moonshine.thermo, moonshine.impact, moonshine.evaluator
+moonshine.impact.get_feedstocks()
+print(time.perf_counter() - t0)
+"""
+
+
+@case("import.moonshine", scalar=True, self_timed=True)
+def _import(n):
+    # A fresh interpreter per call; interpreter start-up is not included
+    env = dict(os.environ, PYTHONPATH=str(SIM_ROOT))
+
+    def probe():
+        out = subprocess.run([sys.executable, "-c", IMPORT_PROBE], env=env, check=True,
+                             capture_output=True, text=True).stdout
+        return float(out)
+    return probe
+
+
+def _time_call(func, repeats, min_time, self_timed=False):
+    # Best-of-repeats per-call time; calls are looped until one repeat takes
+    # at least min_time so fast scalar paths are not lost in timer noise.
+    if self_timed:
+        return min(func() for _ in range(repeats))
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed / loops
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def run_suite(pattern="*", quick=False, repeats=None, min_time=None):
+    """
+    Times every case whose name matches `pattern` (fnmatch). Returns the
+    JSON-ready results document. The result cache is off while timing, so
+    repeated calls measure the computation rather than cache hits.
+    """
+    batch = QUICK_BATCH_SIZE if quick else BATCH_SIZE
+    repeats = repeats or (3 if quick else 5)
+    min_time = min_time if min_time is not None else (0.05 if quick else 0.2)
+    results = {}
+    saved = os.environ.get("MOONSHINE_RESULT_CACHE")
+    os.environ["MOONSHINE_RESULT_CACHE"] = "0"
+    try:
+        for name, (setup, scalar, self_timed) in CASES.items():
+            if not fnmatch.fnmatch(name, pattern):
+                continue
+            n = 1 if scalar else batch
+            seconds = _time_call(setup(n), repeats, min_time, self_timed)
+            results[name] = {"seconds": seconds, "items": n, "seconds_per_item": seconds / n}
+    finally:
+        if saved is None:
+            del os.environ["MOONSHINE_RESULT_CACHE"]
+        else:
+            os.environ["MOONSHINE_RESULT_CACHE"] = saved
+    return {
+        "version": FORMAT_VERSION,
+        "quick": quick,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Ratio current/baseline per case present in both documents.
+    Returns (rows, regressed) where rows are (name, base_s, current_s, ratio).
+    """
+    if baseline.get("version") != current.get("version"):
+        raise ValueError("Benchmark files have different format versions")
+    if baseline.get("quick") != current.get("quick"):
+        raise ValueError("Cannot compare quick and full benchmark runs")
+    rows, regressed = [], []
+    for name, base in baseline["results"].items():
+        if name not in current["results"]:
+            continue
+        base_s = base["seconds_per_item"]
+        now_s = current["results"][name]["seconds_per_item"]
+        ratio = now_s / base_s if base_s > 0 else np.inf
+        rows.append((name, base_s, now_s, ratio))
+        if ratio > 1 + threshold:
+            regressed.append(name)
+    return rows, regressed
+
+
+def _format_s(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def _print_results(doc):
+    print(f"--- Moonshine Benchmarks ({'quick' if doc['quick'] else 'full'}) ---")
+    for name, r in doc["results"].items():
+        print(f"{name:32} {_format_s(r['seconds']):>12} / call  ({r['items']:,} items, "
+              f"{_format_s(r['seconds_per_item'])} / item)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="time the suite")
+    run.add_argument("--output", "-o", help="write results JSON here")
+
+    cmp = sub.add_parser("compare", help="fail if slower than a baseline")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current", nargs="?", help="results JSON (default: run the suite now)")
+    cmp.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    run.add_argument("--quick", action="store_true", help="small batches, fewer repeats")
+    for p in (run, cmp):
+        p.add_argument("--filter", default="*", help="fnmatch pattern on case names")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        doc = run_suite(args.filter, args.quick)
+        _print_results(doc)
+        if args.output:
+            Path(args.output).write_text(json.dumps(doc, indent=2) + "\n")
+        return 0
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    if args.current:
+        current = json.loads(Path(args.current).read_text())
+    else:
+        current = run_suite(args.filter, baseline.get("quick", False))
+    rows, regressed = compare(baseline, current, args.threshold)
+    print(f"--- Benchmark Comparison (threshold +{args.threshold:.0%}) ---")
+    for name, base_s, now_s, ratio in rows:
+        flag = "REGRESSED" if name in regressed else ""
+        print(f"{name:32} {_format_s(base_s):>12} -> {_format_s(now_s):>12}  x{ratio:5.2f} {flag}")
+    if regressed:
+        print(f"{len(regressed)} case(s) regressed: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
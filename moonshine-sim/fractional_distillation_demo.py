@@ -1,38 +1,29 @@
 import numpy as np
+from moonshine.rayleigh import DEMO_FRACTIONS, evaporated_fraction_at_boiling_point, iter_evaporation
+from moonshine.thermo import FLUSH_THRESHOLD_C
 
-def get_boiling_point(ethanol_frac):
+def simulate_evaporation(initial_volume_ml=1000, initial_mix=0.60, evaporated_fraction=DEMO_FRACTIONS):
     """
-    Rough approximation of Ethanol-Water boiling point curve at 1 atm.
+    Prints the Rayleigh distillation trajectory of a single charge.
+    For many charges at once use moonshine.rayleigh directly.
     """
-    x = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
-    y = [100.0, 92.7, 87.7, 84.4, 82.5, 81.3, 80.5, 79.8, 79.1, 78.5, 78.4]
-    return np.interp(ethanol_frac, x, y)
+    chunk = next(iter_evaporation(initial_volume_ml, initial_mix, evaporated_fraction))
 
-def simulate_evaporation(initial_volume_ml=1000, initial_mix=0.60, steps=100):
-    vol_liquid = initial_volume_ml
-    mix_liquid = initial_mix
-    
-    print(f"{'Step':<5} | {'Vol (mL)':<10} | {'Mix (%)':<10} | {'BP (°C)':<10}")
-    print("-" * 45)
-    
-    for i in range(steps):
-        bp = get_boiling_point(mix_liquid)
-        
-        if i % 10 == 0:
-            print(f"{i:<5} | {vol_liquid:<10.1f} | {mix_liquid*100:<10.1f} | {bp:<10.2f}")
-        
-        # VLE approximation
-        alpha = 3.0 
-        mix_vapor = (alpha * mix_liquid) / (1 + (alpha - 1) * mix_liquid)
-        
-        dv = vol_liquid * 0.01
-        total_ethanol = vol_liquid * mix_liquid
-        vapor_ethanol = dv * mix_vapor
-        
-        vol_liquid -= dv
-        if vol_liquid <= 0: break
-        mix_liquid = (total_ethanol - vapor_ethanol) / vol_liquid
-        if mix_liquid < 0: mix_liquid = 0
+    print(f"{'Evap (%)':<8} | {'Vol (mL)':<10} | {'Mix (%)':<10} | {'BP (°C)':<10}")
+    print("-" * 48)
+    for i, fraction in enumerate(chunk.evaporated_fraction):
+        print(f"{fraction*100:<8.1f} | {chunk.volume_ml[0, i]:<10.1f} | {chunk.mix_ratio[0, i]*100:<10.1f} | {chunk.boiling_point_c[0, i]:<10.2f}")
+
+def leak_tolerance(initial_mix=np.arange(0.40, 0.85, 0.05), threshold_c=FLUSH_THRESHOLD_C):
+    """
+    Fraction of each charge that can be lost to vapor leaks before the
+    boiling point reaches the flush threshold.
+    """
+    fractions = evaporated_fraction_at_boiling_point(initial_mix, threshold_c)
+    print(f"\n--- Leak tolerance to {threshold_c:.0f} °C ---")
+    for mix, fraction in zip(initial_mix, fractions):
+        print(f"Mix {mix*100:4.0f}% | can evaporate {fraction*100:5.1f}% of the charge")
 
 if __name__ == "__main__":
-    simulate_evaporation()
\ No newline at end of file
+    simulate_evaporation()
+    leak_tolerance()
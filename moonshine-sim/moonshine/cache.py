@@ -0,0 +1,332 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from moonshine.data import atomic_write_bytes, cache_dir, file_digest
+from moonshine.instrument import count
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked eviction
+    fcntl = None
+
+_FORMAT_VERSION = 1
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+PACKAGE_DIR = Path(__file__).resolve().parent
+
+_code_digest = None
+_default_cache = None
+
+
+def cache_enabled(default=False):
+    """
+    Whether @cached functions use their cache. MOONSHINE_RESULT_CACHE=1
+    turns caching on and 0/false/off turns it off; when it is unset the
+    default on-disk cache is off.
+    """
+    value = os.environ.get("MOONSHINE_RESULT_CACHE", "").lower()
+    if not value:
+        return default
+    return value not in ("0", "false", "off", "no")
+
+
+def code_digest():
+    """
+    SHA-256 over every module of the moonshine package, so any code change
+    invalidates cached results.
+    """
+    global _code_digest
+    if _code_digest is None:
+        digest = hashlib.sha256()
+        for path in sorted(PACKAGE_DIR.rglob("*.py")):
+            digest.update(str(path.relative_to(PACKAGE_DIR)).encode())
+            digest.update(file_digest(path).encode())
+        _code_digest = digest.hexdigest()
+    return _code_digest
+
+
+def _update(digest, obj):
+    # Canonical, type-tagged encoding of call arguments. Equal values give
+    # equal digests regardless of dict order or array memory layout.
+    if obj is None or isinstance(obj, (bool, int, float, complex, str)):
+        digest.update(f"{type(obj).__name__}:{obj!r};".encode())
+    elif isinstance(obj, bytes):
+        digest.update(b"bytes:%d;" % len(obj) + obj)
+    elif isinstance(obj, Path):
+        digest.update(f"path:{obj};".encode())
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            _update(digest, obj.tolist())
+        else:
+            digest.update(f"ndarray:{obj.dtype.str}:{obj.shape};".encode())
+            digest.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, np.generic):
+        _update(digest, obj.item())
+    elif isinstance(obj, (list, tuple)):
+        digest.update(f"{type(obj).__name__}:{len(obj)}[".encode())
+        for item in obj:
+            _update(digest, item)
+        digest.update(b"]")
+    elif isinstance(obj, dict):
+        digest.update(f"dict:{len(obj)}{{".encode())
+        for key in sorted(obj, key=repr):
+            _update(digest, key)
+            _update(digest, obj[key])
+        digest.update(b"}")
+    elif hasattr(obj, "__dict__"):
+        digest.update(f"object:{type(obj).__module__}.{type(obj).__qualname__}".encode())
+        _update(digest, vars(obj))
+    else:
+        raise ValueError(f"Cannot hash argument of type {type(obj).__name__}")
+
+
+def params_digest(*args, **kwargs):
+    digest = hashlib.sha256()
+    _update(digest, (list(args), kwargs))
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _function_id(func):
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = ""
+    return f"{func.__module__}.{func.__qualname__}", hashlib.sha256(source.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk store of function results.
+
+    An entry's key is a hash of the function (name, source and the moonshine
+    package code), its arguments, and the content of the data files it
+    depends on. Each entry is a pickle plus a JSON record of the hashes that
+    produced it, both written atomically, so concurrent readers never see a
+    partial entry. Writers serialise through a file lock and keep a running
+    total of stored bytes next to it; only when that total exceeds max_bytes
+    is the store scanned and the least recently used entries dropped.
+    """
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory) if directory is not None else cache_dir() / "results"
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _paths(self, key):
+        folder = self.directory / "objects" / key[:2]
+        return folder / f"{key}.pickle", folder / f"{key}.json"
+
+    @contextmanager
+    def _lock(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def make_key(self, func, args=(), kwargs=None, data_files=()):
+        """
+        Returns (key, record) where record lists every hash in the key.
+        """
+        name, source_digest = _function_id(func)
+        record = {
+            "version": _FORMAT_VERSION,
+            "function": name,
+            "source_sha256": source_digest,
+            "code_sha256": code_digest(),
+            "params_sha256": params_digest(*args, **(kwargs or {})),
+            "data_files": [[Path(p).name, file_digest(p)] for p in data_files],
+        }
+        key = hashlib.sha256(json.dumps(record, sort_keys=True).encode()).hexdigest()
+        return key, record
+
+    def get(self, key):
+        """
+        Returns (True, value) on a hit and (False, None) on a miss.
+        """
+        data_path, _ = self._paths(key)
+        try:
+            with open(data_path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            self.misses += 1
+            count("cache.misses")
+            return False, None
+        try:
+            os.utime(data_path)  # recency for LRU eviction
+        except OSError:
+            pass
+        self.hits += 1
+        count("cache.hits")
+        return True, value
+
+    def put(self, key, value, record=None):
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return False
+        if len(payload) > self.max_bytes:
+            return False
+        record = dict(record or {}, key=key, created=time.time(), size=len(payload),
+                      result_sha256=hashlib.sha256(payload).hexdigest())
+        data_path, record_path = self._paths(key)
+        try:
+            with self._lock():
+                total = self._read_total() + len(payload)
+                atomic_write_bytes(record_path, json.dumps(record, indent=1, sort_keys=True).encode())
+                atomic_write_bytes(data_path, payload)
+                self.writes += 1
+                if total > self.max_bytes:
+                    total = self._evict()
+                self._write_total(total)
+        except OSError:
+            # A read-only cache directory should not break the simulation
+            return False
+        return True
+
+    def _read_total(self):
+        # Bytes stored, as counted by writers. Rewriting an existing key
+        # over-counts, which only brings the next full scan forward.
+        try:
+            return int((self.directory / ".size").read_text())
+        except (OSError, ValueError):
+            return sum(size for _, size, _ in self._entries())
+
+    def _write_total(self, total):
+        atomic_write_bytes(self.directory / ".size", str(total).encode())
+
+    def _entries(self):
+        objects = self.directory / "objects"
+        if not objects.exists():
+            return []
+        entries = []
+        for path in objects.glob("*/*.pickle"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        # Scan the store and drop least recently used entries until it fits;
+        # returns the exact remaining size
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            for victim in (path, path.with_suffix(".json")):
+                try:
+                    victim.unlink()
+                except OSError:
+                    pass
+            total -= size
+            self.evictions += 1
+        return total
+
+    def size_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def manifest(self):
+        """
+        Records of every stored entry: function, code/source/params/data-file
+        hashes and the hash of the pickled result.
+        """
+        records = []
+        for _, _, path in sorted(self._entries()):
+            try:
+                records.append(json.loads(path.with_suffix(".json").read_text()))
+            except (OSError, ValueError):
+                continue
+        return records
+
+    def verify(self):
+        """
+        Keys of entries whose stored result no longer matches its recorded
+        hash (corrupted or tampered with).
+        """
+        bad = []
+        for record in self.manifest():
+            data_path, _ = self._paths(record["key"])
+            try:
+                actual = file_digest(data_path)
+            except OSError:
+                continue
+            if actual != record["result_sha256"]:
+                bad.append(record["key"])
+        return bad
+
+    def clear(self):
+        with self._lock():
+            for _, _, path in self._entries():
+                for victim in (path, path.with_suffix(".json")):
+                    try:
+                        victim.unlink()
+                    except OSError:
+                        pass
+            self._write_total(0)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+
+def default_cache() -> ResultCache:
+    global _default_cache
+    if _default_cache is None or _default_cache.directory != cache_dir() / "results":
+        _default_cache = ResultCache()
+    return _default_cache
+
+
+def cached(data_files=(), cache=None):
+    """
+    Decorator that stores results in a ResultCache.
+
+    data_files is a list of paths, or a callable returning one, whose content
+    is part of the key (e.g. lambda: [impact.get_data_file()]); list every
+    data file the function reads. The undecorated function stays available
+    as `.uncached`.
+
+    Without an explicit cache, caching is opt-in (MOONSHINE_RESULT_CACHE=1).
+    Only decorate functions whose result is cheaper to unpickle than to
+    recompute.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not cache_enabled(default=cache is not None):
+                return func(*args, **kwargs)
+            store = cache if cache is not None else default_cache()
+            files = data_files() if callable(data_files) else data_files
+            key, record = store.make_key(func, args, kwargs, files)
+            hit, value = store.get(key)
+            if hit:
+                return value
+            value = func(*args, **kwargs)
+            store.put(key, value, record)
+            return value
+        wrapper.uncached = func
+        return wrapper
+    return decorate
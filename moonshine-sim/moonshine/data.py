@@ -0,0 +1,131 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+from moonshine.instrument import count, span
+
+# This file is in moonshine-sim/moonshine/data.py
+# We need to go up two levels to root, then into data/
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+_CACHE_VERSION = 1
+_MEMORY_CACHE = {}
+
+
+def cache_dir():
+    """
+    Directory for compiled data caches. Override with MOONSHINE_CACHE_DIR.
+    """
+    override = os.environ.get("MOONSHINE_CACHE_DIR")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "moonshine"
+
+
+def file_digest(path):
+    """
+    SHA-256 hex digest of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def atomic_write_bytes(path, payload):
+    """
+    Write payload to path via a temp file and rename, so concurrent readers
+    never observe a partially written file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _parse_yaml(path):
+    # PyYAML is only imported when a file actually has to be parsed
+    import yaml
+    with open(path, "r") as f:
+        return yaml.safe_load(f)
+
+
+def _disk_cache_path(path):
+    key = hashlib.sha1(str(path).encode()).hexdigest()
+    return cache_dir() / "yaml" / f"{key}.pickle"
+
+
+@span("data.load_yaml")
+def load_yaml(path, use_disk_cache=True):
+    """
+    Parse a YAML data file, reusing a compiled copy where possible.
+
+    Results are kept in memory per path and pickled to cache_dir(). A cached
+    copy is reused while the file's mtime and size are unchanged; if they
+    changed but the content hash did not (e.g. a fresh checkout), the cache
+    is refreshed without re-parsing.
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _MEMORY_CACHE.get(path)
+    if cached is not None and cached[0] == stamp:
+        count("data.load_yaml.memory_hits")
+        return cached[1]
+
+    data = None
+    if use_disk_cache:
+        data = _load_compiled(path, stamp)
+    if data is None:
+        count("data.load_yaml.parsed")
+        data = _parse_yaml(path)
+        if use_disk_cache:
+            _store_compiled(path, stamp, file_digest(path), data)
+
+    _MEMORY_CACHE[path] = (stamp, data)
+    return data
+
+
+def _load_compiled(path, stamp):
+    cache_path = _disk_cache_path(path)
+    try:
+        with open(cache_path, "rb") as f:
+            record = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if record.get("version") != _CACHE_VERSION:
+        return None
+    if record["stamp"] == stamp:
+        return record["data"]
+
+    digest = file_digest(path)
+    if record["sha256"] != digest:
+        return None
+    _store_compiled(path, stamp, digest, record["data"])
+    return record["data"]
+
+
+def _store_compiled(path, stamp, digest, data):
+    record = {"version": _CACHE_VERSION, "stamp": stamp, "sha256": digest, "data": data}
+    try:
+        atomic_write_bytes(_disk_cache_path(path), pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL))
+    except OSError:
+        # A read-only home directory should not break the simulation
+        pass
+
+
+def clear_memory_cache():
+    _MEMORY_CACHE.clear()
@@ -1,20 +1,36 @@
-class Dimensions:
+from moonshine.data import load_yaml
+from moonshine.spec import DEFAULT_SPEC_PATH, load_spec
+
+
+def _track(code):
+    # Plain dict copy of a track as written in the spec (original units)
+    tracks = load_yaml(DEFAULT_SPEC_PATH)["tracks"]
+    if code not in tracks:
+        raise AttributeError(f"Unknown hardware track: {code}")
+    return dict(tracks[code])
+
+
+class _LazyTracks(type):
+    # Tracks are read on first attribute access, so importing this module
+    # (and everything that imports Dimensions) does not parse the spec
+    def __getattr__(cls, code):
+        if code.startswith("_"):
+            raise AttributeError(code)
+        return _track(code)
+
+
+class Dimensions(metaclass=_LazyTracks):
     """
-    Physical Constraints for the Hardware Tracks.
+    Physical Constraints for the Hardware Tracks, e.g. Dimensions.TOWER_V1
+    or Dimensions.RICKHOUSE_2U. Read from data/moonshine_v1.yaml on first
+    access; for SI-converted, immutable values use
+    moonshine.spec.load_spec().tracks instead.
     """
-    
-    RICKHOUSE_2U = {
-        "name": "The Rickhouse",
-        "max_height_mm": 88,
-        "rack_depth_mm": 700,
-        "condenser_type": "Horizontal Axial",
-        "pump_required": True
-    }
-    
-    TOWER_V1 = {
-        "name": "The Moonshine Tower",
-        "max_footprint_mm": [140, 140],
-        "max_height_mm": 400,
-        "condenser_type": "Vertical Gravity-Fed",
-        "pump_required": True # Mandated to prevent zeotropic fractionation
-    }
\ No newline at end of file
+
+
+def hardware_spec(variant=None):
+    """
+    The compiled default hardware spec, or one of its named variants.
+    """
+    spec = load_spec()
+    return spec if variant is None else spec.variant(variant)
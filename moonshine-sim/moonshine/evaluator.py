@@ -1,6 +1,19 @@
-from moonshine.thermo import Distiller
-from moonshine.designs import Dimensions
+from functools import lru_cache, partial
+
+import numpy as np
+from moonshine.thermo import Distiller, analyze_nodes
 from moonshine.impact import ImpactAnalyzer
+from moonshine.graph import DependencyGraph
+from moonshine.instrument import span
+from moonshine.spec import load_spec
+
+# Target project mix
+MIX_RATIO = 0.60
+# We pass if the carbon footprint is below a certain threshold (arbitrary 10kg for now)
+CARBON_LIMIT_KG = 10.0
+# Reference rack whose rack_pumped solve gives OPTION_A's per-node pump load
+# (layout parameters of data/hydraulic_models.yaml; pump_shutoff in kPa)
+PUMPED_RACK = {"n_nodes": 16, "condenser_height": 1.8, "downcomer_length": 2.0, "pump_shutoff": 100.0}
 
 class EvaluationMetrics:
     def __init__(self, name, description):
@@ -13,7 +26,7 @@ class DesignOption:
     def __init__(self, id, name, parasitic_load_w):
         self.id = id
         self.name = name
-        self.parasitic_load_w = parasitic_load_w
+        self._parasitic_load_w = parasitic_load_w
         self.tests = {
             "NET_ENERGY_SURPLUS": EvaluationMetrics("Net Energy Surplus", "Calculates recovered power minus parasitic loads."),
             "THERMAL_STABILITY": EvaluationMetrics("Thermal Stability", "Checks if boiling point stays below 85°C."),
@@ -21,47 +34,195 @@ class DesignOption:
             "ENVIRONMENTAL_IMPACT": EvaluationMetrics("Environmental Impact", "Analysis of sourcing and production footprint.")
         }
 
-# Define the Architecture Struct
-ARCHITECTURES = {
-    "OPTION_A": DesignOption("A", "Forced Circulation (Pump)", parasitic_load_w=12.0),
-    "OPTION_B": DesignOption("B", "Pumpless Ejector (Vapor-Jet)", parasitic_load_w=0.0),
-    "OPTION_C": DesignOption("C", "Passive Thermosyphon (Gravity)", parasitic_load_w=0.0)
-}
-
-# Specific Tests for Options B and C
-ARCHITECTURES["OPTION_B"].tests["EJECTOR_MOTIVE_PRESSURE"] = EvaluationMetrics(
-    "Ejector Motive Pressure", "Verify if TDP produces enough vapor pressure to drive the Venturi."
-)
-ARCHITECTURES["OPTION_C"].tests["GRAVITY_HEAD_PRESSURE"] = EvaluationMetrics(
-    "Gravity Head Pressure", "Verify if 400mm height overcomes turbine resistance."
-)
-
-def run_evaluation(tdp_watts=350, fill_volume_l=5.0, feedstock="CORN", dist_km=100):
-    distiller = Distiller(mix_ratio=0.60)
-    base_data = distiller.analyze_node(tdp_watts)
-    recovered_pwr = base_data["recovered_power_w"]
-    
-    impact_analyzer = ImpactAnalyzer(volume_l=fill_volume_l)
-    impact_data = impact_analyzer.analyze_source(feedstock, dist_km)
-    
+    @property
+    def parasitic_load_w(self):
+        # May be given as a function (a cached hydraulic solve), which is
+        # only run once the load is needed rather than at import time
+        load = self._parasitic_load_w
+        return load() if callable(load) else load
+
+@lru_cache(maxsize=None)
+def _pumped_rack_load():
+    # Mean per-node pump power of PUMPED_RACK. Like _tower_gravity_head it
+    # depends on no design input, so it is solved once per process.
+    from moonshine.hydraulics import HydraulicModel
+    solution = HydraulicModel.from_yaml("rack_pumped").solve(mix_ratio=MIX_RATIO, **PUMPED_RACK)
+    return float(solution.node_parasitic_w().mean())
+
+def build_architectures():
+    """
+    Returns a fresh set of candidate architectures (with untouched test results).
+    """
+    architectures = {
+        "OPTION_A": DesignOption("A", "Forced Circulation (Pump)", parasitic_load_w=_pumped_rack_load),
+        "OPTION_B": DesignOption("B", "Pumpless Ejector (Vapor-Jet)", parasitic_load_w=0.0),
+        "OPTION_C": DesignOption("C", "Passive Thermosyphon (Gravity)", parasitic_load_w=0.0)
+    }
+
+    # Specific Tests for Options B and C
+    architectures["OPTION_B"].tests["EJECTOR_MOTIVE_PRESSURE"] = EvaluationMetrics(
+        "Ejector Motive Pressure", "Verify if TDP produces enough vapor pressure to drive the Venturi."
+    )
+    architectures["OPTION_C"].tests["GRAVITY_HEAD_PRESSURE"] = EvaluationMetrics(
+        "Gravity Head Pressure", "Verify if 400mm height overcomes turbine resistance."
+    )
+    return architectures
+
+# Define the Architecture Struct (reference definitions; run_evaluation works on copies)
+ARCHITECTURES = build_architectures()
+
+# Inputs of a single design point, in run_evaluation argument order
+DESIGN_INPUTS = ("tdp_watts", "fill_volume_l", "feedstock", "dist_km")
+
+def is_thermally_stable(key):
+    # Only forced circulation holds the boiling point under 85°C under load
+    return key == "OPTION_A"
+
+@span("evaluator.evaluate_designs")
+def evaluate_designs(tdp_watts, fill_volume_l, feedstock, dist_km, architectures=None):
+    """
+    Pure, vectorized evaluation of every architecture at every design point.
+    Not cached on disk: recomputing is cheaper than pickling the result.
+
+    tdp_watts, fill_volume_l, feedstock and dist_km are equally shaped arrays
+    (or scalars) describing N design points. Returns a dict of arrays of
+    shape (N, n_options), with options in `architectures` order, plus the
+    option keys under "option_keys".
+    """
+    architectures = architectures if architectures is not None else ARCHITECTURES
+    keys = list(architectures)
+    tdp_watts, fill_volume_l, dist_km = (np.atleast_1d(np.asarray(v, dtype=float))
+                                         for v in (tdp_watts, fill_volume_l, dist_km))
+    feedstock = np.atleast_1d(feedstock)
+
+    base_data = analyze_nodes(MIX_RATIO, tdp_watts)
+    impact_data = ImpactAnalyzer(volume_l=1.0).analyze_batch(feedstock, dist_km, volumes_l=fill_volume_l)
+
+    parasitic = np.array([architectures[k].parasitic_load_w for k in keys])
+    surplus = base_data["recovered_power_w"][:, None] - parasitic[None, :]
+    stable = np.array([is_thermally_stable(k) for k in keys])
+    total_carbon = np.broadcast_to(impact_data["total_carbon_kg"][:, None], surplus.shape)
+    # GRAVITY_HEAD_PRESSURE depends on no design input (see _tower_gravity_head);
+    # options without the test get False and NaN
+    gravity = np.array(["GRAVITY_HEAD_PRESSURE" in architectures[k].tests for k in keys])
+    head_passed, pressure_bar, _ = _tower_gravity_head() if gravity.any() else (False, np.nan, np.nan)
+
+    return {
+        "option_keys": keys,
+        "recovered_power_w": np.broadcast_to(base_data["recovered_power_w"][:, None], surplus.shape),
+        "surplus_w": surplus,
+        "net_energy_passed": surplus > 0,
+        "thermal_stability_passed": np.broadcast_to(stable[None, :], surplus.shape),
+        "total_carbon_kg": total_carbon,
+        "environmental_passed": total_carbon < CARBON_LIMIT_KG,
+        "gravity_head_passed": np.broadcast_to((gravity & head_passed)[None, :], surplus.shape),
+        "pressure_bar": np.broadcast_to(np.where(gravity, pressure_bar, np.nan)[None, :], surplus.shape),
+        "impact": impact_data,
+    }
+
+def _net_energy_test(parasitic_load_w, node_data):
+    surplus = node_data["recovered_power_w"] - parasitic_load_w
+    return surplus > 0, {"surplus_w": surplus}
+
+def _thermal_stability_test(key):
+    return is_thermally_stable(key), {}
+
+def _environmental_test(impact_data):
+    return impact_data["total_carbon_kg"] < CARBON_LIMIT_KG, impact_data
+
+@lru_cache(maxsize=None)
+def _tower_gravity_head():
+    # The tower loop depends on no design input, so it is solved once per
+    # process. hydraulics (and scipy.sparse) is only imported when needed.
+    from moonshine.hydraulics import GRAVITY_HEAD_THRESHOLD_BAR, HydraulicModel
+    height_m = load_spec().tracks.TOWER_V1.max_height_m
+    solution = HydraulicModel.from_yaml("tower_thermosyphon").solve(
+        mix_ratio=MIX_RATIO, condenser_height=height_m)
+    pressure_bar = float(solution.nodes["turbine_dp_pa"][0]) / 1e5
+    return pressure_bar > GRAVITY_HEAD_THRESHOLD_BAR, pressure_bar, float(solution.nodes["flow_lpm"][0])
+
+def _gravity_head_test():
+    # Turbine pressure drop of the tower loop, net of pipe and cold plate losses
+    passed, pressure_bar, flow_lpm = _tower_gravity_head()
+    return passed, {"pressure_bar": pressure_bar, "flow_lpm": flow_lpm}
+
+class DesignEvaluator:
+    """
+    Incremental evaluation of one design point for an interactive session.
+
+    Every (option, test) pair is a node in a DependencyGraph with only the
+    inputs it really needs: NET_ENERGY_SURPLUS depends on TDP alone,
+    ENVIRONMENTAL_IMPACT on feedstock, distance and fill volume. evaluate()
+    recomputes only the nodes whose inputs changed and updates just those
+    tests on the held DesignOptions; `last_run` reports what was reused.
+    """
+    def __init__(self, tdp_watts=350, fill_volume_l=5.0, feedstock="CORN", dist_km=100, architectures=None):
+        self.architectures = architectures if architectures is not None else build_architectures()
+        self.graph = DependencyGraph()
+        inputs = dict(zip(DESIGN_INPUTS, (tdp_watts, fill_volume_l, feedstock, dist_km)))
+        for name, value in inputs.items():
+            self.graph.add_input(name, value)
+
+        self.graph.add_node("node_analysis", lambda tdp: Distiller(mix_ratio=MIX_RATIO).analyze_node(tdp),
+                            ["tdp_watts"])
+        self.graph.add_node("impact",
+                            lambda fill, feed, dist: ImpactAnalyzer(volume_l=fill).analyze_source(feed, dist),
+                            ["fill_volume_l", "feedstock", "dist_km"])
+        for key, opt in self.architectures.items():
+            self.graph.add_node(f"{key}.NET_ENERGY_SURPLUS", partial(_net_energy_test, opt.parasitic_load_w),
+                                ["node_analysis"])
+            self.graph.add_node(f"{key}.THERMAL_STABILITY", partial(_thermal_stability_test, key))
+            self.graph.add_node(f"{key}.ENVIRONMENTAL_IMPACT", _environmental_test, ["impact"])
+            if "GRAVITY_HEAD_PRESSURE" in opt.tests:
+                self.graph.add_node(f"{key}.GRAVITY_HEAD_PRESSURE", _gravity_head_test)
+
+    @property
+    def inputs(self):
+        return {name: self.graph.stored_value(name) for name in DESIGN_INPUTS}
+
+    @property
+    def last_run(self):
+        return self.graph.last_run
+
+    @span("evaluator.DesignEvaluator.evaluate")
+    def evaluate(self, **inputs):
+        """
+        Apply changed inputs (any of DESIGN_INPUTS) and bring every test up
+        to date. Returns the {key: DesignOption} dict held by this evaluator.
+        """
+        self.graph.set_inputs(**inputs)
+        names = [f"{key}.{test}" for key, opt in self.architectures.items()
+                 for test in ("NET_ENERGY_SURPLUS", "THERMAL_STABILITY", "ENVIRONMENTAL_IMPACT",
+                              "GRAVITY_HEAD_PRESSURE")
+                 if test in opt.tests]
+        values = self.graph.evaluate(names)
+        recomputed = set(self.last_run["recomputed"])
+        for name in names:
+            if name in recomputed:
+                key, test = name.split(".", 1)
+                passed, result_data = values[name]
+                self.architectures[key].tests[test].passed = bool(passed)
+                self.architectures[key].tests[test].result_data = result_data
+        return self.architectures
+
+@span("evaluator.run_evaluation")
+def run_evaluation(tdp_watts=350, fill_volume_l=5.0, feedstock="CORN", dist_km=100, verbose=True):
+    """
+    Evaluates every architecture for one design point and returns a fresh
+    {key: DesignOption} dict with the test results filled in.
+    For repeated evaluations with small input changes use DesignEvaluator.
+    """
+    architectures = DesignEvaluator(tdp_watts, fill_volume_l, feedstock, dist_km).evaluate()
+
+    if not verbose:
+        return architectures
+
     print(f"--- Evaluating Architectures for {tdp_watts}W TDP ---")
     print(f"--- Sourcing: {feedstock} at {dist_km}km ---")
-    
-    for key, opt in ARCHITECTURES.items():
-        # Test 1: Net Energy Surplus
-        surplus = recovered_pwr - opt.parasitic_load_w
-        opt.tests["NET_ENERGY_SURPLUS"].passed = surplus > 0
-        opt.tests["NET_ENERGY_SURPLUS"].result_data = {"surplus_w": surplus}
-        
-        # Test 2: Thermal Stability
-        opt.tests["THERMAL_STABILITY"].passed = True if key == "OPTION_A" else False 
-        
-        # Test 3: Environmental Impact (New)
-        # We pass if the carbon footprint is below a certain threshold (arbitrary 10kg for now)
-        opt.tests["ENVIRONMENTAL_IMPACT"].passed = impact_data["total_carbon_kg"] < 10.0
-        opt.tests["ENVIRONMENTAL_IMPACT"].result_data = impact_data
-        
+    for opt in architectures.values():
+        surplus = opt.tests["NET_ENERGY_SURPLUS"].result_data["surplus_w"]
         print(f"[{opt.id}] {opt.name}: Surplus={surplus:.2f}W | Stability={'PASS' if opt.tests['THERMAL_STABILITY'].passed else 'FAIL'} | Impact={'PASS' if opt.tests['ENVIRONMENTAL_IMPACT'].passed else 'FAIL'}")
+    return architectures
 
 if __name__ == "__main__":
     run_evaluation()
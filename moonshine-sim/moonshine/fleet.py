@@ -0,0 +1,182 @@
+from dataclasses import dataclass
+from typing import Dict, Iterator
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from moonshine.thermo import DEFAULT_TURBINE_EFFICIENCY, analyze_nodes
+
+DEFAULT_NODES_PER_RACK = 32
+DEFAULT_WINDOW_S = 300
+# Upper bound on trace samples (rows x nodes) held in memory at once
+DEFAULT_CHUNK_ELEMENTS = 8_000_000
+
+
+def open_trace(path, n_nodes=None, dtype=np.float32):
+    """
+    Memory-maps a per-node TDP trace (W) laid out as (time, node).
+
+    .npy files carry their own shape; raw binary files need n_nodes and
+    the sample dtype. Nothing is read until rows are sliced.
+    """
+    path = str(path)
+    if path.endswith(".npy"):
+        trace = np.load(path, mmap_mode="r")
+    else:
+        if n_nodes is None:
+            raise ValueError("n_nodes is required for raw binary traces")
+        trace = np.memmap(path, dtype=dtype, mode="r").reshape(-1, n_nodes)
+    if trace.ndim != 2:
+        raise ValueError("Trace must be a 2D (time, node) array")
+    return trace
+
+
+@dataclass
+class FleetWindow:
+    """
+    Aggregates over one time window [t_start_s, t_stop_s). nodes holds
+    (n_nodes,) arrays and racks (n_racks,) arrays, keyed by metric name.
+    """
+    t_start_s: float
+    t_stop_s: float
+    nodes: Dict[str, np.ndarray]
+    racks: Dict[str, np.ndarray]
+
+
+class _WindowAccumulator:
+    # Running sums/peaks for the window currently being filled; windows can
+    # span several chunks.
+    def __init__(self, n_nodes, n_racks):
+        self.count = 0
+        self.node_sum = np.zeros(n_nodes)
+        self.node_max = np.full(n_nodes, -np.inf)
+        self.rack_sum = np.zeros((3, n_racks))
+        self.rack_max = np.full((3, n_racks), -np.inf)
+
+    def add(self, count, node_sum, node_max, rack_sum, rack_max):
+        self.count += count
+        self.node_sum += node_sum
+        np.maximum(self.node_max, node_max, out=self.node_max)
+        self.rack_sum += rack_sum
+        np.maximum(self.rack_max, rack_max, out=self.rack_max)
+
+
+class FleetSimulator:
+    """
+    Streams per-node TDP traces through the Distiller model.
+
+    The trace is read in row chunks sized to chunk_elements, so peak memory
+    depends on the node count but not on the trace length. With a fixed mix
+    per node, vapor flow and recovered power are linear in TDP, so node
+    metrics are computed by analyze_nodes from per-window TDP sums and peaks,
+    and rack series are formed row by row as weighted sums over a sparse
+    node -> rack matrix.
+    """
+    def __init__(self, n_nodes, mix_ratio=0.60, turbine_efficiency=DEFAULT_TURBINE_EFFICIENCY,
+                 rack_of=None, nodes_per_rack=DEFAULT_NODES_PER_RACK):
+        self.n_nodes = n_nodes
+        if rack_of is None:
+            rack_of = np.arange(n_nodes) // nodes_per_rack
+        self.rack_of = np.asarray(rack_of, dtype=np.intp)
+        if self.rack_of.shape != (n_nodes,):
+            raise ValueError("rack_of must have one entry per node")
+        self.n_racks = int(self.rack_of.max()) + 1 if n_nodes else 0
+
+        # Per-watt metrics of each node's mix
+        unit = analyze_nodes(np.broadcast_to(mix_ratio, (n_nodes,)), 1.0,
+                             np.broadcast_to(turbine_efficiency, (n_nodes,)))
+        self.mix_ratio = np.broadcast_to(np.asarray(mix_ratio, dtype=float), (n_nodes,))
+        self.turbine_efficiency = np.broadcast_to(np.asarray(turbine_efficiency, dtype=float), (n_nodes,))
+        self.boiling_point_c = unit["boiling_point_c"]
+
+        # Columns: rack TDP, recovered power and vapor flow per watt of node TDP
+        weights = np.column_stack([np.ones(n_nodes), unit["recovered_power_w"], unit["vol_flow_ml_min"]])
+        rows = np.repeat(np.arange(n_nodes), 3)
+        cols = (np.arange(3)[None, :] * self.n_racks + self.rack_of[:, None]).ravel()
+        self._rack_weights = csr_matrix((weights.ravel(), (rows, cols)), shape=(n_nodes, 3 * self.n_racks))
+
+    def _node_metrics(self, mean_tdp, peak_tdp, count, sample_period_s):
+        mean = analyze_nodes(self.mix_ratio, mean_tdp, self.turbine_efficiency)
+        peak = analyze_nodes(self.mix_ratio, peak_tdp, self.turbine_efficiency)
+        return {
+            "mean_tdp_w": mean_tdp,
+            "peak_tdp_w": peak_tdp,
+            "mean_recovered_power_w": mean["recovered_power_w"],
+            "recovered_energy_j": mean["recovered_power_w"] * count * sample_period_s,
+            "mean_vol_flow_ml_min": mean["vol_flow_ml_min"],
+            "peak_vol_flow_ml_min": peak["vol_flow_ml_min"],
+            "mean_mass_flow_kg_s": mean["mass_flow_kg_s"],
+        }
+
+    def _rack_metrics(self, rack_sum, rack_max, count):
+        mean = rack_sum / count
+        return {
+            "mean_tdp_w": mean[0],
+            "peak_tdp_w": rack_max[0],
+            "mean_recovered_power_w": mean[1],
+            "peak_recovered_power_w": rack_max[1],
+            "mean_vol_flow_ml_min": mean[2],
+            "peak_vol_flow_ml_min": rack_max[2],
+        }
+
+    def run(self, trace, window_s=DEFAULT_WINDOW_S, sample_period_s=1.0,
+            chunk_elements=DEFAULT_CHUNK_ELEMENTS) -> Iterator[FleetWindow]:
+        """
+        Generator of FleetWindow aggregates over consecutive (tumbling)
+        windows of window_s. The final window may be shorter.
+        """
+        if trace.ndim != 2 or trace.shape[1] != self.n_nodes:
+            raise ValueError(f"Trace must have shape (time, {self.n_nodes})")
+        window_rows = max(1, int(round(window_s / sample_period_s)))
+        chunk_rows = max(1, chunk_elements // max(self.n_nodes, 1))
+        if chunk_rows >= window_rows:
+            # Keep chunks aligned to windows so most windows close in-chunk
+            chunk_rows -= chunk_rows % window_rows
+
+        n_rows = trace.shape[0]
+        acc = _WindowAccumulator(self.n_nodes, self.n_racks)
+        window_start = 0
+        for start in range(0, n_rows, chunk_rows):
+            stop = min(start + chunk_rows, n_rows)
+            chunk = np.asarray(trace[start:stop], dtype=float)
+            racks = (self._rack_weights.T @ chunk.T).T.reshape(len(chunk), 3, self.n_racks)
+
+            # Split the chunk where windows end and reduce every piece at once
+            first_edge = window_start + window_rows
+            edges = np.arange(first_edge, stop, window_rows) - start
+            cuts = np.concatenate([[0], edges[edges > 0]])
+            lengths = np.diff(np.append(cuts, len(chunk)))
+            node_sum = np.add.reduceat(chunk, cuts, axis=0)
+            node_max = np.maximum.reduceat(chunk, cuts, axis=0)
+            rack_sum = np.add.reduceat(racks, cuts, axis=0)
+            rack_max = np.maximum.reduceat(racks, cuts, axis=0)
+
+            for i, length in enumerate(lengths):
+                acc.add(length, node_sum[i], node_max[i], rack_sum[i], rack_max[i])
+                if acc.count == window_rows:
+                    yield self._emit(acc, window_start, sample_period_s)
+                    window_start += window_rows
+                    acc = _WindowAccumulator(self.n_nodes, self.n_racks)
+
+        if acc.count:
+            yield self._emit(acc, window_start, sample_period_s)
+
+    def _emit(self, acc, window_start, sample_period_s):
+        return FleetWindow(
+            t_start_s=window_start * sample_period_s,
+            t_stop_s=(window_start + acc.count) * sample_period_s,
+            nodes=self._node_metrics(acc.node_sum / acc.count, acc.node_max, acc.count, sample_period_s),
+            racks=self._rack_metrics(acc.rack_sum, acc.rack_max, acc.count),
+        )
+
+
+def stream_fleet(path, mix_ratio=0.60, turbine_efficiency=DEFAULT_TURBINE_EFFICIENCY, rack_of=None,
+                 nodes_per_rack=DEFAULT_NODES_PER_RACK, window_s=DEFAULT_WINDOW_S, sample_period_s=1.0,
+                 n_nodes=None, dtype=np.float32, chunk_elements=DEFAULT_CHUNK_ELEMENTS) -> Iterator[FleetWindow]:
+    """
+    Convenience wrapper: memory-map the trace at `path` and stream it
+    through a FleetSimulator.
+    """
+    trace = open_trace(path, n_nodes, dtype)
+    simulator = FleetSimulator(trace.shape[1], mix_ratio, turbine_efficiency, rack_of, nodes_per_rack)
+    return simulator.run(trace, window_s, sample_period_s, chunk_elements)
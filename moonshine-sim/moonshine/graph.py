@@ -0,0 +1,140 @@
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+
+def _same(a, b):
+    # Value equality that copes with numpy arrays nested in dicts/lists
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, np.ndarray):
+        return a.shape == b.shape and a.dtype == b.dtype and bool(np.array_equal(a, b, equal_nan=a.dtype.kind == "f"))
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+class _Node:
+    def __init__(self, name, func=None, deps=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.value = None
+        # Bumped only when the value actually changes
+        self.version = 0
+        # Dependency versions the current value was computed from
+        self.seen = None
+
+
+class DependencyGraph:
+    """
+    Memoizing dependency graph of named inputs and computed nodes.
+
+    Each node declares the inputs/nodes it depends on; its function is
+    called with their values in that order. Values are pulled on demand
+    and recomputed only when a dependency's version changed since the last
+    computation. A recomputed node whose value comes out equal keeps its
+    version, so nodes further downstream are reused (early cut-off).
+    After each evaluate(), `last_run` lists which nodes were recomputed and
+    which were reused.
+    """
+    def __init__(self):
+        self._nodes: Dict[str, _Node] = {}
+        self.last_run = {"recomputed": [], "reused": []}
+
+    def __contains__(self, name):
+        return name in self._nodes
+
+    def add_input(self, name, value=None):
+        if name in self._nodes:
+            raise ValueError(f"Duplicate graph node: {name}")
+        node = _Node(name)
+        node.value = value
+        self._nodes[name] = node
+
+    def add_node(self, name, func: Callable, deps: Sequence[str] = ()):
+        if name in self._nodes:
+            raise ValueError(f"Duplicate graph node: {name}")
+        for dep in deps:
+            if dep not in self._nodes:
+                raise ValueError(f"Node {name} depends on unknown node: {dep}")
+        self._nodes[name] = _Node(name, func, deps)
+
+    def set_inputs(self, **values):
+        """
+        Update input values. Inputs set to an equal value are not marked
+        as changed. Returns the names of inputs that did change.
+        """
+        changed = []
+        for name, value in values.items():
+            node = self._nodes.get(name)
+            if node is None or node.func is not None:
+                raise ValueError(f"Unknown graph input: {name}")
+            if not _same(node.value, value):
+                node.value = value
+                node.version += 1
+                changed.append(name)
+        return changed
+
+    def _pull(self, name, run):
+        node = self._nodes[name]
+        if node.func is None or name in run:
+            return node
+        versions = tuple(self._pull(dep, run).version for dep in node.deps)
+        if node.seen == versions:
+            run[name] = False
+            return node
+        value = node.func(*(self._nodes[dep].value for dep in node.deps))
+        if node.seen is None or not _same(node.value, value):
+            node.value = value
+            node.version += 1
+        node.seen = versions
+        run[name] = True
+        return node
+
+    def evaluate(self, names: Sequence[str] = None) -> Dict[str, object]:
+        """
+        Bring `names` (default: every computed node) up to date and return
+        their values.
+        """
+        if names is None:
+            names = [n for n, node in self._nodes.items() if node.func is not None]
+        run = {}
+        values = {name: self._pull(name, run).value for name in names}
+        self.last_run = {
+            "recomputed": [n for n, recomputed in run.items() if recomputed],
+            "reused": [n for n, recomputed in run.items() if not recomputed],
+        }
+        return values
+
+    def value(self, name):
+        return self.evaluate([name])[name]
+
+    def stored_value(self, name):
+        """
+        The value currently held by `name`, without evaluating anything or
+        touching `last_run`. Computed nodes may be stale.
+        """
+        if name not in self._nodes:
+            raise ValueError(f"Unknown graph node: {name}")
+        return self._nodes[name].value
+
+    def dependents(self, name) -> List[str]:
+        """
+        Every node that (transitively) depends on `name`.
+        """
+        found, frontier = [], [name]
+        while frontier:
+            current = frontier.pop()
+            for other, node in self._nodes.items():
+                if current in node.deps and other not in found:
+                    found.append(other)
+                    frontier.append(other)
+        return found
@@ -0,0 +1,273 @@
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+from scipy.sparse import csr_matrix, diags
+from scipy.sparse.linalg import spsolve
+
+from moonshine.data import DATA_DIR, load_yaml
+from moonshine.thermo import DEFAULT_TURBINE_EFFICIENCY, analyze_nodes, mix_properties
+
+MODELS_PATH = DATA_DIR / "hydraulic_models.yaml"
+
+G = 9.81
+LPM = 1e-3 / 60  # m3/s per L/min
+# Minimum turbine pressure drop for a self-starting Tesla turbine (bar)
+GRAVITY_HEAD_THRESHOLD_BAR = 0.1
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-10
+
+
+def _pipe(spec, rho, mu):
+    # Hagen-Poiseuille friction (linear) plus fitting losses (quadratic)
+    d = float(spec["diameter_m"])
+    area = np.pi * d * d / 4
+    r1 = 128 * mu * float(spec["length_m"]) / (np.pi * d ** 4)
+    r2 = float(spec.get("k_minor", 0.0)) * rho / (2 * area * area)
+    return r1, r2
+
+
+def _component(spec):
+    # Rated pressure drop split into laminar and quadratic parts
+    dp = float(spec["dp_kpa"]) * 1e3
+    q = float(spec["flow_lpm"]) * LPM
+    laminar = float(spec.get("laminar_fraction", 0.5))
+    return laminar * dp / q, (1 - laminar) * dp / (q * q)
+
+
+@dataclass
+class HydraulicSolution:
+    """
+    Converged loop state for a batch of rack layouts. Node arrays are flat
+    over every node of every layout, with `rack` giving the layout index
+    (as fleet.py does for racks). Pressures are gauge, in Pa.
+    """
+    nodes: Dict[str, np.ndarray]
+    racks: Dict[str, np.ndarray]
+    iterations: int
+
+    def node_parasitic_w(self):
+        """
+        Pump electrical power charged to each node in proportion to its flow.
+        """
+        rack = self.nodes["rack"]
+        share = self.nodes["flow_lpm"] / self.racks["total_flow_lpm"][rack]
+        return self.racks["pump_power_w"][rack] * np.nan_to_num(share)
+
+    def gravity_head_passed(self, threshold_bar=GRAVITY_HEAD_THRESHOLD_BAR):
+        return self.nodes["turbine_dp_pa"] / 1e5 > threshold_bar
+
+
+class HydraulicModel:
+    """
+    Liquid loop of one rack, declared in data/hydraulic_models.yaml.
+
+    solve() builds the pipe/cold plate/turbine/pump network of every layout
+    and solves the coupled pressure/flow balance with the global gradient
+    (Todini-Pilati) Newton method. Each step eliminates the link flows and
+    solves for the junction pressures only. The batch shares one
+    block-diagonal sparse system per iteration. Every element loses
+    r1*Q + r2*Q|Q|, and the pump adds shutoff * (1 - (Q/Q_max)^2).
+    Pressures are piezometric (p + rho*g*z), so gravity only enters
+    through the fixed pressures at the condenser and at each node's vapor
+    return.
+    """
+    def __init__(self, spec, fluid):
+        self.spec = spec
+        self.fluid = fluid
+
+    @classmethod
+    def from_yaml(cls, model, path=None):
+        models = load_yaml(path or MODELS_PATH)
+        if model not in models or model == "fluid":
+            raise ValueError(f"Unknown hydraulic model: {model}")
+        return cls(models[model], models.get("fluid", {}))
+
+    def _layouts(self, params):
+        n_layouts = max([np.size(v) for v in params.values()] + [1])
+        for name, value in params.items():
+            if np.size(value) not in (1, n_layouts):
+                raise ValueError(f"Hydraulic parameter {name} has {np.size(value)} values for {n_layouts} layouts")
+
+        def resolve(value, i):
+            if isinstance(value, dict):
+                return {k: resolve(v, i) for k, v in value.items()}
+            if isinstance(value, str) and value.startswith("$"):
+                name = value[1:]
+                if name not in params:
+                    raise ValueError(f"Missing hydraulic parameter: {name}")
+                return np.broadcast_to(np.asarray(params[name]), (n_layouts,))[i].item()
+            return value
+
+        return [{k: resolve(v, i) for k, v in self.spec.items()} for i in range(n_layouts)]
+
+    def _build(self, layout, rho, mu):
+        # Unknown junctions: D (manifold inlet), S_i (supply tees), C_i
+        # (cold plate -> turbine), plus P (pump outlet) if there is a pump.
+        # Fixed pressures: the condenser (RES) and each node's return (SINK_i).
+        n = int(layout["n_nodes"])
+        if n < 1:
+            raise ValueError("A rack needs at least one node")
+        pitch = float(layout["node_pitch_m"])
+        z = np.arange(n) * pitch
+        pump = layout.get("pump")
+        D, S, C = 0, 1 + np.arange(n), 1 + n + np.arange(n)
+        n_unknown = 1 + 2 * n + (1 if pump else 0)
+        P = n_unknown - 1
+        RES, SINK = n_unknown, n_unknown + 1 + np.arange(n)
+        fixed = np.concatenate([[rho * G * float(layout["condenser_height_m"])], rho * G * z])
+
+        links = []  # (from, to, r1, r2, shutoff_pa, pump_r)
+        down = _pipe(layout["downcomer"], rho, mu)
+        if pump:
+            shutoff = float(pump["shutoff_kpa"]) * 1e3
+            links.append((RES, P, 0.0, 0.0, shutoff, shutoff / (float(pump["max_flow_lpm"]) * LPM) ** 2))
+            links.append((P, D) + down + (0.0, 0.0))
+        else:
+            links.append((RES, D) + down + (0.0, 0.0))
+        segment = _pipe(dict(layout["manifold"], length_m=max(pitch, 1e-3)), rho, mu)
+        links.append((D, S[0]) + segment + (0.0, 0.0))
+        for i in range(n - 1):
+            links.append((S[i], S[i + 1]) + segment + (0.0, 0.0))
+        branch = tuple(np.add(_pipe(layout["branch_pipe"], rho, mu), _component(layout["cold_plate"])))
+        turbine = _component(layout["turbine"])
+        for i in range(n):
+            links.append((S[i], C[i]) + branch + (0.0, 0.0))
+            links.append((C[i], SINK[i]) + turbine + (0.0, 0.0))
+        return n_unknown, fixed, np.array(links, dtype=float), z
+
+    def solve(self, mix_ratio=0.60, **params) -> HydraulicSolution:
+        """
+        Steady flows and pressures for every layout. Parameters (and
+        mix_ratio) are scalars or one value per layout.
+        """
+        layouts = self._layouts(dict(params, mix_ratio=mix_ratio))
+        mix = np.broadcast_to(np.asarray(mix_ratio, dtype=float), (len(layouts),))
+        _, rho = mix_properties(mix)
+        mu = float(self.fluid.get("viscosity_pa_s", 1e-3))
+
+        from_, to, r1, r2, shutoff, pump_r, layout_of = [], [], [], [], [], [], []
+        fixed_values, built = [], []
+        n_unknown_total = n_fixed_total = 0
+        for i, layout in enumerate(layouts):
+            n_unknown, fixed, links, z = self._build(layout, float(rho[i]), mu)
+            ends = links[:, :2].astype(np.intp)
+            # Global numbering: unknowns first, then fixed nodes
+            ends = np.where(ends < n_unknown, ends + n_unknown_total, -1 - (ends - n_unknown + n_fixed_total))
+            from_.append(ends[:, 0])
+            to.append(ends[:, 1])
+            r1.append(links[:, 2])
+            r2.append(links[:, 3])
+            shutoff.append(links[:, 4])
+            pump_r.append(links[:, 5])
+            layout_of.append(np.full(len(links), i))
+            fixed_values.append(fixed)
+            built.append((n_unknown_total, n_unknown, len(links), z, layout))
+            n_unknown_total += n_unknown
+            n_fixed_total += len(fixed)
+
+        from_, to = np.concatenate(from_), np.concatenate(to)
+        r1, r2 = np.concatenate(r1), np.concatenate(r2)
+        shutoff, pump_r = np.concatenate(shutoff), np.concatenate(pump_r)
+        fixed_p = np.concatenate(fixed_values)
+        n_links = len(from_)
+
+        # Incidence of the unknown junctions (+1 at a link's start, -1 at its
+        # end) and the fixed-pressure difference each link sees
+        rows, cols, vals = [], [], []
+        for end, sign in ((from_, 1.0), (to, -1.0)):
+            unknown = end >= 0
+            rows.append(np.nonzero(unknown)[0])
+            cols.append(end[unknown])
+            vals.append(np.full(np.count_nonzero(unknown), sign))
+        B = csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                       shape=(n_links, n_unknown_total))
+        b = np.where(from_ < 0, fixed_p[-1 - np.minimum(from_, -1)], 0.0) \
+            - np.where(to < 0, fixed_p[-1 - np.minimum(to, -1)], 0.0)
+        is_pump = shutoff > 0
+        # Newton slope floor where the true slope vanishes (pumps at Q = 0)
+        slope_floor = np.where(is_pump, 1e-3 * np.sqrt(shutoff * pump_r), r1)
+
+        q = np.zeros(n_links)
+        for iteration in range(1, MAX_ITERATIONS + 1):
+            loss = r1 * q + (r2 + pump_r) * q * np.abs(q) - shutoff
+            slope = np.maximum(r1 + 2 * (r2 + pump_r) * np.abs(q), slope_floor)
+            inv = 1.0 / slope
+            M = (B.T @ diags(inv) @ B).tocsc()
+            rhs = -(B.T @ q) - B.T @ (inv * (b - loss))
+            p = spsolve(M, rhs)
+            q_new = q + inv * (B @ p + b - loss)
+            change = np.max(np.abs(q_new - q)) if n_links else 0.0
+            q = q_new
+            if change <= TOLERANCE * max(np.max(np.abs(q)), LPM * 1e-3):
+                break
+        else:
+            raise RuntimeError("Hydraulic solve did not converge")
+
+        nodes = {k: [] for k in ("rack", "node", "elevation_m", "flow_lpm", "turbine_dp_pa",
+                                 "supply_pressure_pa", "static_head_pa")}
+        racks = {k: [] for k in ("n_nodes", "total_flow_lpm", "pump_head_pa", "pump_hydraulic_w", "pump_power_w")}
+        link_start = 0
+        for i, (offset, n_unknown, n_layout_links, z, layout) in enumerate(built):
+            n = len(z)
+            lq = q[link_start:link_start + n_layout_links]
+            has_pump = bool(layout.get("pump"))
+            first_branch = 2 + has_pump + (n - 1)
+            turbine_q = lq[first_branch + 1::2]
+            t_r1, t_r2 = _component(layout["turbine"])
+            supply = p[offset + 1:offset + 1 + n] - rho[i] * G * z
+
+            nodes["rack"].append(np.full(n, i))
+            nodes["node"].append(np.arange(n))
+            nodes["elevation_m"].append(z)
+            nodes["flow_lpm"].append(turbine_q / LPM)
+            nodes["turbine_dp_pa"].append(t_r1 * turbine_q + t_r2 * turbine_q * np.abs(turbine_q))
+            nodes["supply_pressure_pa"].append(supply)
+            nodes["static_head_pa"].append(rho[i] * G * (float(layout["condenser_height_m"]) - z))
+
+            total = lq[0]
+            if has_pump:
+                spec = layout["pump"]
+                head = shutoff[link_start] - pump_r[link_start] * total * abs(total)
+                hydraulic = max(total * head, 0.0)
+                x = total / (float(spec["best_flow_lpm"]) * LPM)
+                efficiency = max(float(spec["best_efficiency"]) * x * (2 - x), 0.05)
+                power = hydraulic / efficiency + float(spec.get("idle_w", 0.0))
+            else:
+                head = hydraulic = power = 0.0
+            racks["n_nodes"].append(n)
+            racks["total_flow_lpm"].append(total / LPM)
+            racks["pump_head_pa"].append(head)
+            racks["pump_hydraulic_w"].append(hydraulic)
+            racks["pump_power_w"].append(power)
+            link_start += n_layout_links
+
+        return HydraulicSolution(
+            nodes={k: np.concatenate(v) for k, v in nodes.items()},
+            racks={k: np.array(v, dtype=float if k != "n_nodes" else np.intp) for k, v in racks.items()},
+            iterations=iteration,
+        )
+
+
+def evaluate_rack(model, tdp_watts=350, mix_ratio=0.60, turbine_efficiency=DEFAULT_TURBINE_EFFICIENCY,
+                  threshold_bar=GRAVITY_HEAD_THRESHOLD_BAR, **params):
+    """
+    Per-node GRAVITY_HEAD_PRESSURE result and pump parasitic load for a
+    batch of rack layouts of a data-defined model (name or HydraulicModel).
+
+    Returns a dict of flat per-node arrays: the solution's node arrays plus
+    required_flow_lpm (the vapor demand at tdp_watts), pump_parasitic_w,
+    net_surplus_w and gravity_head_passed.
+    """
+    if isinstance(model, str):
+        model = HydraulicModel.from_yaml(model)
+    solution = model.solve(mix_ratio=mix_ratio, **params)
+    result = dict(solution.nodes)
+    rack_mix = np.broadcast_to(np.asarray(mix_ratio, dtype=float), (len(solution.racks["n_nodes"]),))
+    demand = analyze_nodes(rack_mix[result["rack"]], tdp_watts, turbine_efficiency)
+    parasitic = solution.node_parasitic_w()
+    result["required_flow_lpm"] = demand["vol_flow_ml_min"] / 1000
+    result["pump_parasitic_w"] = parasitic
+    result["net_surplus_w"] = demand["recovered_power_w"] - parasitic
+    result["gravity_head_passed"] = solution.gravity_head_passed(threshold_bar)
+    return result
@@ -1,7 +1,9 @@
 from dataclasses import dataclass
 from typing import Dict
-import yaml
+import numpy as np
 from pathlib import Path
+from moonshine.data import DATA_DIR, load_yaml
+from moonshine.instrument import count, span
 
 @dataclass
 class Feedstock:
@@ -12,59 +14,176 @@ class Feedstock:
     typical_yield_l_per_hectare: float
     water_scarcity_index: float      # 1.0 = baseline, >1.0 = high stress region
 
-def load_data():
-    # Resolve path to data/feedstocks.yaml
-    # This file is in moonshine-sim/moonshine/impact.py
-    # We need to go up two levels to root, then into data/
-    current_dir = Path(__file__).parent
-    project_root = current_dir.parent.parent
-    yaml_path = project_root / "data" / "feedstocks.yaml"
-    
-    with open(yaml_path, "r") as f:
-        data = yaml.safe_load(f)
-    return data
-
-_YAML_DATA = load_data()
-
-# Load Feedstocks from YAML
-FEEDSTOCKS = {}
-for key, val in _YAML_DATA["feedstocks"].items():
-    FEEDSTOCKS[key] = Feedstock(
-        name=val["name"],
-        water_intensity_l_per_l=val["water_intensity_l_per_l"],
-        carbon_intensity_kg_per_l=val["carbon_intensity_kg_per_l"],
-        avg_price_usd_per_l=val["avg_price_usd_per_l"],
-        typical_yield_l_per_hectare=val["typical_yield_l_per_hectare"],
-        water_scarcity_index=val["water_scarcity_index"]
-    )
+DEFAULT_DATA_PATH = DATA_DIR / "feedstocks.yaml"
+
+# Feedstock and logistics data are loaded on first access, not at import time
+_data_path = DEFAULT_DATA_PATH
+_feedstocks = None
+_emission_factors = None
+_feedstock_table = None
+
+def load_data(path=None):
+    """
+    Returns the parsed feedstock/logistics data (cached, see moonshine.data).
+    """
+    return load_yaml(path or _data_path)
+
+def use_data_file(path=None):
+    """
+    Switch to an alternate feedstock data file (None restores the default).
+    Note that names bound earlier via `from moonshine.impact import FEEDSTOCKS`
+    keep pointing at the previous table; use get_feedstocks() instead.
+    """
+    global _data_path, _feedstocks, _emission_factors, _feedstock_table
+    _data_path = Path(path) if path is not None else DEFAULT_DATA_PATH
+    _feedstocks = None
+    _emission_factors = None
+    _feedstock_table = None
+
+def get_data_file() -> Path:
+    return _data_path
+
+def get_feedstocks() -> Dict[str, Feedstock]:
+    global _feedstocks
+    if _feedstocks is None:
+        count("impact.feedstock_tables_built")
+        feedstocks = {}
+        for key, val in load_data()["feedstocks"].items():
+            feedstocks[key] = Feedstock(
+                name=val["name"],
+                water_intensity_l_per_l=val["water_intensity_l_per_l"],
+                carbon_intensity_kg_per_l=val["carbon_intensity_kg_per_l"],
+                avg_price_usd_per_l=val["avg_price_usd_per_l"],
+                typical_yield_l_per_hectare=val["typical_yield_l_per_hectare"],
+                water_scarcity_index=val["water_scarcity_index"]
+            )
+        _feedstocks = feedstocks
+    return _feedstocks
+
+def get_emission_factors() -> Dict[str, float]:
+    global _emission_factors
+    if _emission_factors is None:
+        _emission_factors = dict(load_data()["logistics"]["emissions_per_kg_km"])
+    return _emission_factors
+
+def _lookup_codes(codes, index, label, default=None):
+    # Map an array of string codes (or ready-made integer indices) to row
+    # indices with a binary search against the (small) sorted code list.
+    codes = np.asarray(codes)
+    if np.issubdtype(codes.dtype, np.integer):
+        if codes.size and (codes.min() < 0 or codes.max() >= len(index)):
+            raise ValueError(f"Unknown {label} index: {codes.min()}..{codes.max()}")
+        return codes
+    known = np.array(sorted(index))
+    rows = np.array([index[code] for code in known.tolist()], dtype=np.intp)
+    pos = np.minimum(np.searchsorted(known, codes), len(known) - 1)
+    found = known[pos] == codes
+    if not found.all():
+        if default is None:
+            raise ValueError(f"Unknown {label}: {codes[~found].flat[0]}")
+        return np.where(found, rows[pos], default)
+    return rows[pos]
+
+class FeedstockTable:
+    """
+    Indexed numeric view of the feedstock data: one array entry per feedstock,
+    in the order they appear in the data file.
+    """
+    def __init__(self, feedstocks: Dict[str, Feedstock]):
+        self.codes = list(feedstocks)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.names = [f.name for f in feedstocks.values()]
+        values = list(feedstocks.values())
+        self.water_intensity_l_per_l = np.array([f.water_intensity_l_per_l for f in values], dtype=float)
+        self.carbon_intensity_kg_per_l = np.array([f.carbon_intensity_kg_per_l for f in values], dtype=float)
+        self.avg_price_usd_per_l = np.array([f.avg_price_usd_per_l for f in values], dtype=float)
+        self.typical_yield_l_per_hectare = np.array([f.typical_yield_l_per_hectare for f in values], dtype=float)
+        self.water_scarcity_index = np.array([f.water_scarcity_index for f in values], dtype=float)
+
+    def lookup(self, codes) -> np.ndarray:
+        """
+        Row indices for an array of feedstock codes (or pass-through indices).
+        """
+        return _lookup_codes(codes, self.index, "feedstock")
+
+def get_feedstock_table() -> FeedstockTable:
+    global _feedstock_table
+    if _feedstock_table is None:
+        _feedstock_table = FeedstockTable(get_feedstocks())
+    return _feedstock_table
+
+def __getattr__(name):
+    # Keeps `from moonshine.impact import FEEDSTOCKS` working without
+    # loading the data file at import time
+    if name == "FEEDSTOCKS":
+        return get_feedstocks()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class _EmissionFactor:
+    """
+    Class attribute that resolves to the current emission factor for a mode.
+    """
+    def __init__(self, mode: str):
+        self.mode = mode
+
+    def __get__(self, obj, owner):
+        return get_emission_factors()[self.mode]
 
 class Logistics:
-    # Load Logistics from YAML
-    _EMISSIONS = _YAML_DATA["logistics"]["emissions_per_kg_km"]
-    
-    EMISSIONS_TRUCK = _EMISSIONS["TRUCK"]
-    EMISSIONS_RAIL = _EMISSIONS["RAIL"]
-    EMISSIONS_SHIP = _EMISSIONS["SHIP"]
+    # Loaded from YAML on first access
+    EMISSIONS_TRUCK = _EmissionFactor("TRUCK")
+    EMISSIONS_RAIL = _EmissionFactor("RAIL")
+    EMISSIONS_SHIP = _EmissionFactor("SHIP")
+
+    DEFAULT_MODE = "TRUCK"
+
+    @staticmethod
+    def emission_factor(mode: str = "TRUCK") -> float:
+        # Unknown modes fall back to trucking
+        factors = get_emission_factors()
+        return factors.get(mode, factors[Logistics.DEFAULT_MODE])
+
+    @staticmethod
+    def emission_table():
+        """
+        Returns (mode codes, emission factor array) in data-file order.
+        """
+        factors = get_emission_factors()
+        return list(factors), np.array(list(factors.values()), dtype=float)
+
+    @staticmethod
+    def lookup_modes(modes) -> np.ndarray:
+        """
+        Row indices into emission_table() for an array of mode codes.
+        """
+        codes, _ = Logistics.emission_table()
+        index = {code: i for i, code in enumerate(codes)}
+        return _lookup_codes(modes, index, "mode", default=index[Logistics.DEFAULT_MODE])
+
+    @staticmethod
+    def cost_factor(mode: str = "TRUCK") -> float:
+        costs = load_data()["logistics"].get("cost_usd_per_l_km", {})
+        return costs.get(mode, costs.get(Logistics.DEFAULT_MODE, 0.0))
 
     @staticmethod
     def calculate_transport_impact(volume_l: float, distance_km: float, mode: str = "TRUCK"):
-        if mode == "TRUCK":
-            factor = Logistics.EMISSIONS_TRUCK
-        elif mode == "RAIL":
-            factor = Logistics.EMISSIONS_RAIL
-        elif mode == "SHIP":
-            factor = Logistics.EMISSIONS_SHIP
-        else:
-            factor = Logistics.EMISSIONS_TRUCK
-            
-        return volume_l * distance_km * factor
+        return volume_l * distance_km * Logistics.emission_factor(mode)
+
+    @staticmethod
+    def calculate_route_impact(volume_l: float, legs):
+        """
+        Transport carbon for a multi-leg route given as (distance_km, mode) pairs.
+        """
+        return sum(Logistics.calculate_transport_impact(volume_l, distance_km, mode) for distance_km, mode in legs)
 
 class ImpactAnalyzer:
     def __init__(self, volume_l: float):
+        count("impact.ImpactAnalyzer.created")
         self.volume_l = volume_l
 
+    @span("impact.ImpactAnalyzer.analyze_source")
     def analyze_source(self, feedstock_key: str, distance_km: float, mode: str = "TRUCK"):
-        feedstock = FEEDSTOCKS.get(feedstock_key)
+        feedstock = get_feedstocks().get(feedstock_key)
         if not feedstock:
             raise ValueError(f"Unknown feedstock: {feedstock_key}")
             
@@ -87,12 +206,77 @@ class ImpactAnalyzer:
             "carbon_per_l": total_carbon / self.volume_l
         }
 
+    @span("impact.ImpactAnalyzer.analyze_route")
+    def analyze_route(self, feedstock_key: str, legs):
+        """
+        analyze_source for a multi-leg route, e.g. [(8000, "SHIP"), (200, "TRUCK")].
+        """
+        legs = list(legs)
+        result = self.analyze_source(feedstock_key, 0.0)
+        transport_carbon = Logistics.calculate_route_impact(self.volume_l, legs)
+        total_carbon = result["production_carbon_kg"] + transport_carbon
+        result.update({
+            "total_carbon_kg": total_carbon,
+            "transport_carbon_kg": transport_carbon,
+            "carbon_per_l": total_carbon / self.volume_l
+        })
+        return result
+
+    @span("impact.ImpactAnalyzer.analyze_batch")
+    def analyze_batch(self, feedstocks, distances_km, modes="TRUCK", volumes_l=None,
+                      transport_carbon_kg_per_l=None, carbon_intensity_factor=1.0,
+                      water_intensity_factor=1.0, emission_factor_scale=1.0):
+        """
+        Columnar version of analyze_source for many supplier quotes at once.
+
+        feedstocks and modes are arrays of codes (or integer indices into
+        get_feedstock_table() / Logistics.emission_table()); distances_km and
+        volumes_l are numeric arrays. All inputs broadcast. volumes_l defaults
+        to this analyzer's volume. transport_carbon_kg_per_l, if given (e.g.
+        from moonshine.routes), replaces distance x mode for multi-leg routes.
+        carbon_intensity_factor, water_intensity_factor and
+        emission_factor_scale multiply the feedstock carbon and water
+        intensities and the transport carbon, e.g. per Monte Carlo sample.
+        Returns a dict of arrays; feedstock_index refers to rows of
+        get_feedstock_table().
+        """
+        table = get_feedstock_table()
+        _, mode_factors = Logistics.emission_table()
+
+        rows = table.lookup(feedstocks)
+        volume = np.asarray(self.volume_l if volumes_l is None else volumes_l, dtype=float)
+        if transport_carbon_kg_per_l is None:
+            factor = mode_factors[Logistics.lookup_modes(modes)]
+            per_l = np.asarray(distances_km, dtype=float) * factor
+        else:
+            per_l = np.asarray(transport_carbon_kg_per_l, dtype=float)
+        rows, volume, per_l, carbon_factor, water_factor, emission_scale = np.broadcast_arrays(
+            rows, volume, per_l, np.asarray(carbon_intensity_factor, dtype=float),
+            np.asarray(water_intensity_factor, dtype=float), np.asarray(emission_factor_scale, dtype=float))
+
+        production_carbon = table.carbon_intensity_kg_per_l[rows] * carbon_factor * volume
+        transport_carbon = volume * per_l * emission_scale
+        total_carbon = production_carbon + transport_carbon
+        total_water = table.water_intensity_l_per_l[rows] * water_factor * volume
+
+        return {
+            "feedstock_index": rows,
+            "total_carbon_kg": total_carbon,
+            "transport_carbon_kg": transport_carbon,
+            "production_carbon_kg": production_carbon,
+            "total_water_l": total_water,
+            "weighted_water_l": total_water * table.water_scarcity_index[rows],
+            "total_cost_usd": table.avg_price_usd_per_l[rows] * volume,
+            "carbon_per_l": total_carbon / volume
+        }
+
     def find_carbon_breakeven_distance(self, feedstock_a: str, feedstock_b: str, mode_a: str = "TRUCK", mode_b: str = "TRUCK"):
         """
         Finds the distance for feedstock_b that makes it equivalent in carbon to feedstock_a at 0km.
         """
-        fa = FEEDSTOCKS[feedstock_a]
-        fb = FEEDSTOCKS[feedstock_b]
+        feedstocks = get_feedstocks()
+        fa = feedstocks[feedstock_a]
+        fb = feedstocks[feedstock_b]
         
         diff_production = fa.carbon_intensity_kg_per_l - fb.carbon_intensity_kg_per_l
         
@@ -108,6 +292,7 @@ class ImpactAnalyzer:
         Compares water usage. Since shipping doesn't (usually) consume fresh water 
         in the same way farming does, this is a simpler direct comparison.
         """
-        fa = FEEDSTOCKS[feedstock_a]
-        fb = FEEDSTOCKS[feedstock_b]
+        feedstocks = get_feedstocks()
+        fa = feedstocks[feedstock_a]
+        fb = feedstocks[feedstock_b]
         return fa.water_intensity_l_per_l - fb.water_intensity_l_per_l
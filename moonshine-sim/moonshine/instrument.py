@@ -0,0 +1,323 @@
+import atexit
+import functools
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+# Set to 1 to print a report at exit, or to a path prefix to write
+# <prefix>.json and <prefix>.folded
+ENV_VAR = "MOONSHINE_PROFILE"
+_FORMAT_VERSION = 1
+# Latency histogram: log-spaced buckets, 4 per doubling, from 1 ns up
+BUCKETS_PER_OCTAVE = 4
+N_BUCKETS = 64 * BUCKETS_PER_OCTAVE
+REPORT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class SpanStats:
+    """
+    Call count, total/min/max time and a log-bucketed latency histogram
+    for one named span. Buckets are fixed, so stats from any number of
+    processes merge exactly by adding counts.
+    """
+    __slots__ = ("count", "total_ns", "min_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.buckets = np.zeros(N_BUCKETS, dtype=np.int64)
+
+    def record(self, ns):
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.buckets[int(math.log2(ns) * BUCKETS_PER_OCTAVE) if ns > 1 else 0] += 1
+
+    def merge(self, other: "SpanStats"):
+        if not other.count:
+            return
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.min_ns = other.min_ns if self.min_ns is None else min(self.min_ns, other.min_ns)
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.buckets += other.buckets
+
+    def quantile_ns(self, q):
+        """
+        Latency quantile (ns), accurate to one bucket (about 19%).
+        """
+        q = np.asarray(q, dtype=float)
+        if not self.count:
+            return np.full(q.shape, np.nan)
+        cumulative = np.cumsum(self.buckets)
+        index = np.minimum(np.searchsorted(cumulative, q * self.count), N_BUCKETS - 1)
+        # Geometric middle of the bucket, kept inside the observed range
+        middle = 2.0 ** ((index + 0.5) / BUCKETS_PER_OCTAVE)
+        return np.clip(middle, self.min_ns, self.max_ns)
+
+    def to_dict(self):
+        nonzero = np.nonzero(self.buckets)[0]
+        result = {
+            "count": self.count,
+            "total_ns": self.total_ns,
+            "mean_ns": self.total_ns / self.count if self.count else None,
+            "min_ns": self.min_ns,
+            "max_ns": self.max_ns,
+        }
+        for q, value in zip(REPORT_QUANTILES, np.atleast_1d(self.quantile_ns(REPORT_QUANTILES))):
+            result[f"p{q * 100:g}_ns"] = float(value)
+        result["histogram"] = {"buckets_per_octave": BUCKETS_PER_OCTAVE,
+                               "counts": {str(i): int(self.buckets[i]) for i in nonzero}}
+        return result
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.count = int(data["count"])
+        stats.total_ns = int(data["total_ns"])
+        stats.min_ns = data["min_ns"]
+        stats.max_ns = int(data["max_ns"])
+        if data["histogram"]["buckets_per_octave"] != BUCKETS_PER_OCTAVE:
+            raise ValueError("Profile histogram layout does not match")
+        for index, count in data["histogram"]["counts"].items():
+            stats.buckets[int(index)] = count
+        return stats
+
+
+class Profile:
+    """
+    Everything recorded while instrumentation is on: SpanStats per span
+    name, counters, and self time (ns) per call stack ("a;b;c") for flame
+    graphs. Profiles from worker processes combine with merge().
+    """
+    def __init__(self):
+        self.spans: Dict[str, SpanStats] = {}
+        self.counters: Dict[str, float] = {}
+        self.folded: Dict[str, int] = {}
+
+    def merge(self, other: "Profile"):
+        for name, stats in other.spans.items():
+            self.spans.setdefault(name, SpanStats()).merge(stats)
+        for name, value in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        for stack, ns in other.folded.items():
+            self.folded[stack] = self.folded.get(stack, 0) + ns
+
+    def to_dict(self):
+        return {
+            "version": _FORMAT_VERSION,
+            "spans": {name: self.spans[name].to_dict() for name in sorted(self.spans)},
+            "counters": dict(sorted(self.counters.items())),
+            "folded": dict(sorted(self.folded.items())),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported profile version: {data.get('version')!r}")
+        profile = cls()
+        profile.spans = {name: SpanStats.from_dict(s) for name, s in data["spans"].items()}
+        profile.counters = dict(data["counters"])
+        profile.folded = {stack: int(ns) for stack, ns in data["folded"].items()}
+        return profile
+
+    def write_json(self, path):
+        Path(path).write_text(json.dumps(self.to_dict(), indent=1))
+
+    def write_folded(self, path):
+        """
+        Collapsed-stack file ("outer;inner <self ns>" per line), as read by
+        flamegraph.pl, speedscope and inferno.
+        """
+        lines = [f"{stack} {ns}" for stack, ns in sorted(self.folded.items()) if ns > 0]
+        Path(path).write_text("\n".join(lines) + ("\n" if lines else ""))
+
+    def report(self):
+        """
+        Text table of spans by total time, then counters.
+        """
+        lines = [f"{'span':<48} {'calls':>9} {'total ms':>10} {'mean us':>10} {'p50 us':>9} {'p99 us':>9}"]
+        for name, stats in sorted(self.spans.items(), key=lambda item: -item[1].total_ns):
+            p50, p99 = stats.quantile_ns([0.5, 0.99]) / 1e3
+            lines.append(f"{name:<48} {stats.count:>9} {stats.total_ns / 1e6:>10.2f} "
+                         f"{stats.total_ns / stats.count / 1e3:>10.2f} {p50:>9.2f} {p99:>9.2f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<48} {value:>9g}")
+        return "\n".join(lines)
+
+
+def load_json(path) -> Profile:
+    return Profile.from_dict(json.loads(Path(path).read_text()))
+
+
+_enabled = False
+_profile = Profile()
+# Open spans of this process: [name, start_ns, child_ns]
+_stack = []
+# Stack of the parent process when running a work unit in a worker
+_prefix = ()
+
+
+def enable(reset=False):
+    """
+    Start recording spans and counters in this process. Instrumentation is
+    off by default. Spans assume a single thread.
+    """
+    global _enabled, _profile
+    if reset:
+        _profile = Profile()
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+def reset():
+    global _profile
+    _profile = Profile()
+
+
+def profile() -> Profile:
+    """
+    The Profile being recorded in this process.
+    """
+    return _profile
+
+
+def count(name, value=1):
+    """
+    Add value to a named counter (no-op when instrumentation is off).
+    """
+    if _enabled:
+        _profile.counters[name] = _profile.counters.get(name, 0) + value
+
+
+class span:
+    """
+    Named timing span, used as a context manager or decorator:
+
+        with span("impact.load"): ...
+
+        @span("thermo.analyze_nodes")
+        def analyze_nodes(...): ...
+
+    When instrumentation is off a decorated function costs one flag check
+    per call.
+    """
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        if _enabled:
+            _stack.append([self.name, time.perf_counter_ns(), 0])
+        return self
+
+    def __exit__(self, *exc):
+        if _enabled and _stack and _stack[-1][0] == self.name:
+            _close(_stack.pop())
+        return False
+
+    def __call__(self, func):
+        name = self.name
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            frame = [name, time.perf_counter_ns(), 0]
+            _stack.append(frame)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if _stack and _stack[-1] is frame:
+                    _stack.pop()
+                    _close(frame)
+        return wrapper
+
+
+def _close(frame):
+    name, start, child_ns = frame
+    elapsed = max(time.perf_counter_ns() - start, 0)
+    stats = _profile.spans.get(name)
+    if stats is None:
+        stats = _profile.spans[name] = SpanStats()
+    stats.record(elapsed)
+    stack = ";".join(_prefix + tuple(f[0] for f in _stack) + (name,))
+    _profile.folded[stack] = _profile.folded.get(stack, 0) + elapsed - child_ns
+    if _stack:
+        _stack[-1][2] += elapsed
+
+
+def _profiled_call(prefix, func, *args):
+    # Worker side of pool_map: record one work unit into a fresh profile
+    # and send it back with the result
+    global _prefix
+    was_enabled, saved_prefix, saved_stack = _enabled, _prefix, _stack[:]
+    # A forked worker starts with a copy of the parent's open spans
+    _stack.clear()
+    enable(reset=True)
+    _prefix = prefix
+    try:
+        result = func(*args)
+        return result, _profile
+    finally:
+        _prefix = saved_prefix
+        _stack[:] = saved_stack
+        if not was_enabled:
+            disable()
+
+
+def pool_imap(pool, func, *iterables):
+    """
+    pool.map(func, *iterables) that, when instrumentation is on, also
+    records inside the workers and merges their profiles into this one as
+    results arrive. Worker call stacks are nested under the spans open here.
+    """
+    if not _enabled:
+        yield from pool.map(func, *iterables)
+        return
+    prefix = _prefix + tuple(f[0] for f in _stack)
+    for result, part in pool.map(functools.partial(_profiled_call, prefix, func), *iterables):
+        _profile.merge(part)
+        yield result
+
+
+def pool_map(pool, func, *iterables):
+    """
+    list(pool_imap(pool, func, *iterables)).
+    """
+    return list(pool_imap(pool, func, *iterables))
+
+
+def _dump_at_exit(target):
+    if not _profile.spans and not _profile.counters:
+        return
+    if target.lower() in ("1", "true", "on", "yes"):
+        print(_profile.report(), file=sys.stderr)
+    else:
+        _profile.write_json(f"{target}.json")
+        _profile.write_folded(f"{target}.folded")
+
+
+if os.environ.get(ENV_VAR, "").lower() not in ("", "0", "false", "off", "no"):
+    enable()
+    atexit.register(_dump_at_exit, os.environ[ENV_VAR])
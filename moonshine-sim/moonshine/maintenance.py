@@ -0,0 +1,190 @@
+import heapq
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+from moonshine.fleet import DEFAULT_NODES_PER_RACK
+from moonshine.thermo import FLUSH_THRESHOLD_C, solve_flush_day
+
+DEFAULT_CREWS = 2
+# Crew time per rack visit (travel, draining the loop) and per node flushed
+DEFAULT_SETUP_HOURS = 1.0
+DEFAULT_HOURS_PER_NODE = 0.25
+# Nodes due within this many days of a visit are flushed on the same visit
+DEFAULT_BATCH_WINDOW_DAYS = 7.0
+DEFAULT_HORIZON_DAYS = 365.0
+
+
+@dataclass
+class MaintenanceReport:
+    """
+    Outcome of a FlushScheduler run. jobs holds one array entry per crew
+    visit (start_day, end_day, crew, rack, nodes_flushed). Per-node arrays
+    are flushes and overdue_days: the time each node spent with its boiling
+    point above the flush threshold before a crew got to it.
+    """
+    horizon_days: float
+    jobs: Dict[str, np.ndarray]
+    flushes: np.ndarray
+    overdue_days: np.ndarray
+    due_events: int
+    crew_utilisation: float
+
+    @property
+    def node_events(self):
+        # Threshold crossings plus flushes
+        return self.due_events + int(self.flushes.sum())
+
+    def summary(self):
+        overdue = self.overdue_days
+        return {
+            "jobs": len(self.jobs["rack"]),
+            "flushes": int(self.flushes.sum()),
+            "node_events": self.node_events,
+            "node_days_above_threshold": float(overdue.sum()),
+            "max_days_above_threshold": float(overdue.max()) if len(overdue) else 0.0,
+            "nodes_ever_above_threshold": int(np.count_nonzero(overdue)),
+            "crew_utilisation": self.crew_utilisation,
+        }
+
+
+class FlushScheduler:
+    """
+    Discrete-event flush planner with a limited number of crews.
+
+    Nodes are grouped by rack. A rack's key is the earliest due date among
+    its nodes, so one heap entry stands for every pending node event in
+    that rack. The planner pops the rack that has been due longest and
+    gives it to the crew that frees up first (a crew heap keyed on free
+    time). The visit flushes every node in the rack that is due within
+    batch_window_days, and each of those nodes gets a new due date one
+    flush cycle after the visit ends. Heap traffic grows with visits, not
+    with nodes; the per-rack work is a vectorized slice.
+    """
+    def __init__(self, rack_of, n_crews=DEFAULT_CREWS, setup_hours=DEFAULT_SETUP_HOURS,
+                 hours_per_node=DEFAULT_HOURS_PER_NODE, batch_window_days=DEFAULT_BATCH_WINDOW_DAYS):
+        rack_of = np.asarray(rack_of, dtype=np.intp)
+        if rack_of.ndim != 1 or (len(rack_of) and rack_of.min() < 0):
+            raise ValueError("rack_of must be a 1D array of non-negative rack ids")
+        if n_crews < 1:
+            raise ValueError("At least one crew is required")
+        self.rack_of = rack_of
+        self.n_crews = int(n_crews)
+        self.setup_days = setup_hours / 24.0
+        self.days_per_node = hours_per_node / 24.0
+        self.batch_window_days = batch_window_days
+        # Nodes sorted by rack so each rack is a contiguous slice
+        self._order = np.argsort(rack_of, kind="stable")
+        n_racks = int(rack_of.max()) + 1 if len(rack_of) else 0
+        counts = np.bincount(rack_of, minlength=n_racks)
+        self._bounds = np.concatenate([[0], np.cumsum(counts)])
+        self.n_racks = n_racks
+
+    def run(self, first_due_day, cycle_days, horizon_days=DEFAULT_HORIZON_DAYS) -> MaintenanceReport:
+        """
+        first_due_day: day each node first needs a flush (np.inf if never).
+        cycle_days: days from a flush until the node needs the next one.
+        Both are per node (or broadcast scalars).
+        """
+        n = len(self.rack_of)
+        first_due_day, cycle_days = (np.broadcast_to(np.asarray(a, dtype=float), (n,))
+                                     for a in (first_due_day, cycle_days))
+        if np.any(cycle_days <= 0):
+            raise ValueError("cycle_days must be positive (a fresh fill already needs a flush)")
+        order = self._order
+        due = first_due_day[order].copy()
+        cycle = cycle_days[order]
+        overdue = np.zeros(n)
+        flushes = np.zeros(n, dtype=np.int64)
+        bounds = self._bounds
+        window = self.batch_window_days
+        due_events = int(np.count_nonzero(due < horizon_days))
+
+        racks = []
+        for rack in range(self.n_racks):
+            lo, hi = bounds[rack], bounds[rack + 1]
+            if hi > lo:
+                first = due[lo:hi].min()
+                if first < horizon_days:
+                    racks.append((float(first), rack))
+        heapq.heapify(racks)
+        crews = [(0.0, crew) for crew in range(self.n_crews)]
+        jobs = {"start_day": [], "end_day": [], "crew": [], "rack": [], "nodes_flushed": []}
+        busy = 0.0
+
+        while racks:
+            rack_due, rack = heapq.heappop(racks)
+            free, crew = heapq.heappop(crews)
+            start = max(rack_due, free)
+            if start >= horizon_days:
+                heapq.heappush(crews, (free, crew))
+                break
+            lo, hi = bounds[rack], bounds[rack + 1]
+            seg = due[lo:hi]
+            # Whole-slice masked updates are cheaper than fancy indexing
+            # on rack-sized arrays
+            take = seg <= start + window
+            n_taken = int(np.count_nonzero(take))
+            end = start + self.setup_days + self.days_per_node * n_taken
+
+            late = np.maximum(min(end, horizon_days) - seg, 0.0)
+            late *= take
+            overdue[lo:hi] += late
+            np.copyto(seg, end + cycle[lo:hi], where=take)
+            flushes[lo:hi] += take
+            due_events += int(np.count_nonzero(take & (seg < horizon_days)))
+
+            jobs["start_day"].append(start)
+            jobs["end_day"].append(end)
+            jobs["crew"].append(crew)
+            jobs["rack"].append(rack)
+            jobs["nodes_flushed"].append(n_taken)
+            busy += min(end, horizon_days) - start
+            heapq.heappush(crews, (end, crew))
+
+            next_due = max(float(seg.min()), end)
+            if next_due < horizon_days:
+                heapq.heappush(racks, (next_due, rack))
+
+        # Nodes still waiting at the horizon stay above threshold until then
+        waiting = due < horizon_days
+        overdue[waiting] += horizon_days - due[waiting]
+
+        result_overdue = np.empty(n)
+        result_overdue[order] = overdue
+        result_flushes = np.empty(n, dtype=np.int64)
+        result_flushes[order] = flushes
+        return MaintenanceReport(
+            horizon_days=horizon_days,
+            jobs={
+                "start_day": np.array(jobs["start_day"], dtype=float),
+                "end_day": np.array(jobs["end_day"], dtype=float),
+                "crew": np.array(jobs["crew"], dtype=np.intp),
+                "rack": np.array(jobs["rack"], dtype=np.intp),
+                "nodes_flushed": np.array(jobs["nodes_flushed"], dtype=np.intp),
+            },
+            flushes=result_flushes,
+            overdue_days=result_overdue,
+            due_events=due_events,
+            crew_utilisation=busy / (self.n_crews * horizon_days) if horizon_days > 0 else 0.0,
+        )
+
+
+def plan_flushes(initial_mix, leak_rate_vol_pct_per_day, rack_of=None, nodes_per_rack=DEFAULT_NODES_PER_RACK,
+                 fill_mix=0.60, threshold_c=FLUSH_THRESHOLD_C, horizon_days=DEFAULT_HORIZON_DAYS,
+                 **scheduler_options) -> MaintenanceReport:
+    """
+    Flush schedule for a fleet from simulate_drift physics: each node's
+    first due day and its refill-to-flush cycle come from solve_flush_day
+    (whole days, as Distiller.simulate_drift reports them). A flush refills
+    the node at fill_mix. scheduler_options go to FlushScheduler.
+    """
+    initial_mix, leak = np.broadcast_arrays(np.asarray(initial_mix, dtype=float),
+                                            np.asarray(leak_rate_vol_pct_per_day, dtype=float))
+    initial_mix, leak = initial_mix.ravel(), leak.ravel()
+    if rack_of is None:
+        rack_of = np.arange(len(leak)) // nodes_per_rack
+    first_due = solve_flush_day(initial_mix, leak, threshold_c)
+    cycle = solve_flush_day(fill_mix, leak, threshold_c)
+    return FlushScheduler(rack_of, **scheduler_options).run(first_due, cycle, horizon_days)
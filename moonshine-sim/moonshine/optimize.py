@@ -0,0 +1,184 @@
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+from moonshine.evaluator import ARCHITECTURES, is_thermally_stable
+from moonshine.impact import ImpactAnalyzer, get_feedstock_table
+from moonshine.startup import DEFAULT_COPPER_MASS_G, solve_startup
+from moonshine.thermo import DEFAULT_TURBINE_EFFICIENCY, FLUSH_THRESHOLD_C, boiling_point, flash_point
+
+OBJECTIVES = ("surplus", "carbon_per_watt")
+
+DEFAULT_MIX_RATIOS = np.linspace(0.05, 0.95, 91)
+DEFAULT_FILL_VOLUMES_L = np.linspace(2.0, 10.0, 33)
+# A 5 L fill charges ten 500 ml node loops (moonshine_v1 thermal.fluid_volume_ml)
+DEFAULT_NODES_PER_FILL = 10
+# Keep the flash point above room temperature
+DEFAULT_MIN_FLASH_POINT_C = 20.0
+# Seconds between first vapor and chip overheat needed to spin up the fan
+DEFAULT_MIN_STARTUP_MARGIN_S = 60.0
+# (mix, fill) pairs scored per vectorized block
+DEFAULT_CHUNK_PAIRS = 4096
+
+
+@dataclass
+class OptimizationResult:
+    """
+    Outcome of optimize_design. best holds the top_k feasible candidates as
+    columns, best first. Counters describe the search: candidates is the
+    size of the full grid, and pruned maps each constraint stage to the
+    candidates it removed without scoring them. bounded counts feasible
+    candidates skipped because no member of their block could make the
+    top_k.
+    """
+    objective: str
+    best: Dict[str, np.ndarray]
+    candidates: int
+    feasible: int
+    scored: int
+    bounded: int
+    pruned: Dict[str, int]
+
+
+def _rank_keys(objective, surplus, carbon_per_w):
+    # Lexicographic sort keys, primary first, smaller is better. Each
+    # objective breaks ties with the other one.
+    if objective == "surplus":
+        return -surplus, carbon_per_w
+    return carbon_per_w, -surplus
+
+
+def _worse(a, b):
+    # True where key tuple a ranks strictly after key tuple b
+    return (a[0] > b[0]) | ((a[0] == b[0]) & (a[1] > b[1]))
+
+
+def optimize_design(mix_ratio=DEFAULT_MIX_RATIOS, fill_volume_l=DEFAULT_FILL_VOLUMES_L, feedstock=None,
+                    architectures=None, objective="surplus", tdp_watts=350, dist_km=100, mode="TRUCK",
+                    turbine_efficiency=DEFAULT_TURBINE_EFFICIENCY, ambient_temp=20, max_chip_temp=95,
+                    copper_mass_g=DEFAULT_COPPER_MASS_G, nodes_per_fill=DEFAULT_NODES_PER_FILL,
+                    max_boiling_point_c=FLUSH_THRESHOLD_C, min_flash_point_c=DEFAULT_MIN_FLASH_POINT_C,
+                    min_startup_margin_s=DEFAULT_MIN_STARTUP_MARGIN_S, require_thermal_stability=False, top_k=10,
+                    chunk_pairs=DEFAULT_CHUNK_PAIRS) -> OptimizationResult:
+    """
+    Best (mix ratio, fill volume, feedstock, architecture) designs over the
+    full grid of the given candidate values.
+
+    objective is "surplus" (maximise net surplus W) or "carbon_per_watt"
+    (minimise fill carbon kg per W of net surplus). A design is feasible
+    when its boiling point is at most max_boiling_point_c, its flash point
+    is at least min_flash_point_c, and the cold start (per-node charge of
+    fill_volume_l / nodes_per_fill) leaves at least min_startup_margin_s of
+    vapor buffer. It must also have a positive net surplus, and with
+    require_thermal_stability only architectures that pass the evaluator's
+    THERMAL_STABILITY test are considered.
+
+    Constraints are checked axis by axis, so infeasible regions are dropped
+    before the grid is ever formed. Mix limits are checked alone, the
+    architecture surplus alone, and startup margin on (mix, fill) pairs.
+    The surviving pairs are scored in blocks of ascending fill volume.
+    Carbon grows with fill volume, so once a block's best possible key
+    cannot reach the current top_k the rest of the grid is skipped.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective} (expected one of {OBJECTIVES})")
+    architectures = architectures if architectures is not None else ARCHITECTURES
+    table = get_feedstock_table()
+    mix = np.unique(np.asarray(mix_ratio, dtype=float).ravel())
+    fill = np.unique(np.asarray(fill_volume_l, dtype=float).ravel())
+    feed_codes = np.asarray(table.codes if feedstock is None else feedstock).ravel()
+    keys = list(architectures)
+    if np.any((mix <= 0) | (mix > 1)) or np.any(fill <= 0):
+        raise ValueError("mix_ratio must be in (0, 1] and fill_volume_l positive")
+    candidates = len(mix) * len(fill) * len(feed_codes) * len(keys)
+    pruned = {}
+
+    # Mix-only limits
+    bp = boiling_point(mix)
+    fp = flash_point(mix)
+    mix_ok = (bp <= max_boiling_point_c) & (fp >= min_flash_point_c)
+    pruned["boiling_flash_point"] = int(np.count_nonzero(~mix_ok)) * len(fill) * len(feed_codes) * len(keys)
+    mix_idx = np.nonzero(mix_ok)[0]
+
+    # Architectures that cannot run a net surplus (or are not stable enough)
+    recovered = float(tdp_watts) * turbine_efficiency
+    surplus = recovered - np.array([architectures[k].parasitic_load_w for k in keys], dtype=float)
+    opt_ok = surplus > 0
+    if require_thermal_stability:
+        opt_ok &= np.array([is_thermally_stable(k) for k in keys])
+    opt_idx = np.nonzero(opt_ok)[0]
+    pruned["architecture"] = len(mix_idx) * len(fill) * len(feed_codes) * (len(keys) - len(opt_idx))
+
+    # Cold start margin on the surviving (mix, fill) pairs
+    startup = solve_startup(tdp_watts=tdp_watts, fluid_volume_ml=fill[None, :] * 1000 / nodes_per_fill,
+                            ambient_temp=ambient_temp, max_chip_temp=max_chip_temp,
+                            mix_ratio=mix[mix_idx][:, None], copper_mass_g=copper_mass_g)
+    buffer = startup["vapor_buffer_s"]
+    pair_ok = np.nan_to_num(buffer, nan=-np.inf) >= min_startup_margin_s
+    pruned["startup_margin"] = int(np.count_nonzero(~pair_ok)) * len(feed_codes) * len(opt_idx)
+    pair_mix, pair_fill = np.nonzero(pair_ok)
+    # Ascending fill so carbon, and with it the rank bound, only gets worse
+    order = np.lexsort((pair_mix, pair_fill))
+    pair_mix, pair_fill = pair_mix[order], pair_fill[order]
+
+    # Carbon per litre of each feedstock (production + transport), per W of surplus
+    carbon_per_l = ImpactAnalyzer(volume_l=1.0).analyze_batch(feed_codes, dist_km, mode)["total_carbon_kg"]
+    feed_rows = table.lookup(feed_codes)
+    opt_surplus = surplus[opt_idx]
+    n_feed, n_opt = len(feed_codes), len(opt_idx)
+    best_surplus = opt_surplus.max() if n_opt else np.nan
+
+    best = np.empty(0, dtype=np.intp), (np.empty(0), np.empty(0))  # flat candidate ids, keys
+    scored = bounded = 0
+    for start in range(0, len(pair_mix), chunk_pairs):
+        stop = min(start + chunk_pairs, len(pair_mix))
+        block_fill = fill[pair_fill[start:stop]]
+        if len(best[0]) >= top_k:
+            lowest = block_fill[0] * carbon_per_l.min() / best_surplus
+            bound = _rank_keys(objective, best_surplus, lowest)
+            kth = tuple(k[-1] for k in best[1])
+            if _worse(bound, kth) or (bound[0] == kth[0] and bound[1] == kth[1]):
+                bounded = (len(pair_mix) - start) * n_feed * n_opt
+                break
+        # (pair, feedstock, option) block
+        carbon = np.broadcast_to(block_fill[:, None, None] * carbon_per_l[None, :, None], (stop - start, n_feed, n_opt))
+        block_surplus = np.broadcast_to(opt_surplus, carbon.shape)
+        keys_block = _rank_keys(objective, block_surplus.ravel(), (carbon / block_surplus).ravel())
+        ids = np.arange(start * n_feed * n_opt, stop * n_feed * n_opt)
+        ids = np.concatenate([best[0], ids])
+        k0 = np.concatenate([best[1][0], keys_block[0]])
+        k1 = np.concatenate([best[1][1], keys_block[1]])
+        # Stable sort over (previous best, block) keeps earlier ids first on ties
+        keep = np.lexsort((k1, k0))[:top_k]
+        best = ids[keep], (k0[keep], k1[keep])
+        scored += stop - start
+
+    pair, rest = np.divmod(best[0], n_feed * n_opt)
+    f, o = np.divmod(rest, n_opt)
+    m, v = mix_idx[pair_mix[pair]], pair_fill[pair]
+    chosen_surplus = opt_surplus[o]
+    carbon = fill[v] * carbon_per_l[f]
+    row_of_mix = np.searchsorted(mix_idx, m)
+    result = {
+        "mix_ratio": mix[m],
+        "fill_volume_l": fill[v],
+        "feedstock": feed_codes[f],
+        "feedstock_index": feed_rows[f],
+        "option": np.array([keys[i] for i in opt_idx[o]], dtype=object),
+        "surplus_w": chosen_surplus,
+        "total_carbon_kg": carbon,
+        "carbon_per_w": carbon / chosen_surplus,
+        "boiling_point_c": bp[m],
+        "flash_point_c": fp[m],
+        "vapor_buffer_s": buffer[row_of_mix, v],
+    }
+    return OptimizationResult(
+        objective=objective,
+        best=result,
+        candidates=candidates,
+        feasible=len(pair_mix) * n_feed * n_opt,
+        scored=scored * n_feed * n_opt,
+        bounded=bounded,
+        pruned=pruned,
+    )
@@ -0,0 +1,233 @@
+import numpy as np
+
+# Upper bound on pairwise comparisons materialised at once (points x front)
+_BLOCK = 1 << 20
+# Rows used to pre-filter the input before the skyline pass
+_N_PIVOTS = 32
+
+# ImpactAnalyzer columns traded off by the sourcing selector (all minimised)
+SOURCING_OBJECTIVES = ("total_carbon_kg", "weighted_water_l", "total_cost_usd")
+# Layers peeled by default; each layer costs one pareto_front pass
+DEFAULT_MAX_LAYERS = 3
+
+
+def _as_objectives(objectives):
+    objectives = np.asarray(objectives, dtype=float)
+    if objectives.ndim != 2:
+        raise ValueError("objectives must be a 2D (n_points, n_objectives) array")
+    return objectives
+
+
+def dominated_by(points, front):
+    """
+    Boolean mask of `points` dominated by at least one row of `front`.
+    All objectives are minimised; a dominator is <= everywhere and < somewhere.
+    """
+    points = _as_objectives(points)
+    front = _as_objectives(front)
+    mask = np.zeros(len(points), dtype=bool)
+    if not len(front) or not len(points):
+        return mask
+    step = max(1, _BLOCK // len(front))
+    for start in range(0, len(points), step):
+        p = points[start:start + step]
+        # One (points x front) plane per objective keeps the reductions on
+        # the long axis, which is much faster than reducing a length-k axis.
+        le = front[None, :, 0] <= p[:, None, 0]
+        lt = front[None, :, 0] < p[:, None, 0]
+        for i in range(1, points.shape[1]):
+            le &= front[None, :, i] <= p[:, None, i]
+            lt |= front[None, :, i] < p[:, None, i]
+        mask[start:start + step] = (le & lt).any(axis=1)
+    return mask
+
+
+def _sort_order(objectives):
+    # Visiting rows by the sum of min-max normalised objectives means a
+    # dominator (almost) always comes before the rows it dominates, which
+    # keeps the running front small while filtering.
+    lo = objectives.min(axis=0)
+    span = objectives.max(axis=0) - lo
+    span[span == 0] = 1.0
+    return np.argsort(((objectives - lo) / span).sum(axis=1))
+
+
+def _dense_rank(values):
+    return np.unique(values, return_inverse=True)[1].ravel().astype(np.int64)
+
+
+def _sweep_front(objectives):
+    # Exact non-dominated mask for 2 or 3 objectives in O(n log^2 n),
+    # independent of the front size.
+    #
+    # Rows are deduplicated and put in lexicographic order, so a row can only
+    # be dominated by an earlier row, and any earlier row that is <= in the
+    # last two objectives does dominate it. For two objectives that is a
+    # running minimum. For three, a bottom-up divide and conquer pairs every
+    # block's left half with its right half: within a block ordered by the
+    # second objective, a running minimum of the third objective over the
+    # left half answers "is there an earlier row <= me in both" for every
+    # right-half row at once.
+    n_rows, k = objectives.shape
+    ranks = [_dense_rank(objectives[:, i]) for i in range(k)]
+    if n_rows ** k < 2 ** 62:
+        key = ranks[0]
+        for r in ranks[1:]:
+            key = key * n_rows + r
+        _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    else:
+        order = np.lexsort(ranks[::-1])
+        stacked = np.column_stack(ranks)[order]
+        new = np.ones(n_rows, dtype=bool)
+        new[1:] = (stacked[1:] != stacked[:-1]).any(axis=1)
+        first = order[new]
+        inverse = np.empty(n_rows, dtype=np.intp)
+        inverse[order] = np.cumsum(new) - 1
+    inverse = inverse.ravel()
+    n = len(first)
+
+    dominated = np.zeros(n, dtype=bool)
+    if k == 2:
+        r1 = ranks[1][first]
+        dominated[1:] = np.minimum.accumulate(r1)[:-1] <= r1[1:]
+        return ~dominated[inverse]
+
+    r1 = ranks[1][first]
+    r2 = ranks[2][first]
+    # Position of each row when ordered by (r1, lexicographic position)
+    pos_by_r1 = np.empty(n, dtype=np.int64)
+    pos_by_r1[np.argsort(r1, kind="stable")] = np.arange(n)
+    position = np.arange(n)
+    order = np.arange(n)
+    offset = n + 1
+    width = 1
+    while width < n:
+        block_of = position // (2 * width)
+        order = order[np.argsort(block_of[order] * n + pos_by_r1[order], kind="stable")]
+        block = block_of[order]
+        right = (order // width) % 2 == 1
+        # Segmented running minimum: shifting each block down by `offset`
+        # makes every block restart the minimum from its own values.
+        left_r2 = np.where(right, n, r2[order]) - block * offset
+        best_left = np.minimum.accumulate(left_r2) + block * offset
+        dominated[order] |= right & (best_left <= r2[order])
+        width *= 2
+    return ~dominated[inverse]
+
+
+def pareto_front(objectives, chunk_size=1024):
+    """
+    Indices of the non-dominated rows of `objectives` (minimisation).
+
+    A cheap pass against a few low-score rows first removes most dominated
+    rows (being dominated by *any* row rules a row out). For two or three
+    objectives the remainder is resolved exactly by a sort-based sweep
+    whose cost does not depend on the front size. For more objectives a
+    sort-filter skyline visits rows in an order where dominators come first,
+    in chunks filtered against the running front and then against
+    themselves, costing O(n * front size).
+    """
+    objectives = _as_objectives(objectives)
+    if not len(objectives):
+        return np.empty(0, dtype=np.intp)
+    order = _sort_order(objectives)
+    pivots = objectives[order[:_N_PIVOTS]]
+    order = order[~dominated_by(objectives[order], pivots)]
+
+    if objectives.shape[1] in (2, 3):
+        return np.sort(order[_sweep_front(objectives[order])])
+
+    sorted_objs = objectives[order]
+    front_idx = np.empty(0, dtype=np.intp)
+    front = np.empty((0, objectives.shape[1]))
+    for start in range(0, len(order), chunk_size):
+        chunk = sorted_objs[start:start + chunk_size]
+        idx = np.arange(start, start + len(chunk))
+        keep = ~dominated_by(chunk, front)
+        chunk, idx = chunk[keep], idx[keep]
+        keep = ~dominated_by(chunk, chunk)
+        chunk, idx = chunk[keep], idx[keep]
+        if len(idx):
+            # Rounding ties in the sort key can let a dominator arrive late
+            survivors = ~dominated_by(front, chunk)
+            front = np.vstack([front[survivors], chunk])
+            front_idx = np.concatenate([front_idx[survivors], idx])
+
+    return np.sort(order[front_idx])
+
+
+def dominance_layers(objectives, max_layers=DEFAULT_MAX_LAYERS, chunk_size=1024):
+    """
+    Non-dominated sorting rank per row: 0 for the Pareto front, 1 for the
+    front of what remains, and so on. Rows beyond max_layers get max_layers.
+    Every layer is one pareto_front pass over the remaining rows, so
+    max_layers=None (rank every row) can take hundreds of passes on large
+    inputs.
+    """
+    objectives = _as_objectives(objectives)
+    layers = np.full(len(objectives), -1 if max_layers is None else max_layers, dtype=np.intp)
+    remaining = np.arange(len(objectives))
+    layer = 0
+    while len(remaining) and (max_layers is None or layer < max_layers):
+        front = remaining[pareto_front(objectives[remaining], chunk_size)]
+        layers[front] = layer
+        remaining = np.setdiff1d(remaining, front, assume_unique=True)
+        layer += 1
+    return layers
+
+
+class ParetoFront:
+    """
+    Pareto front that can be updated incrementally as new quotes arrive.
+
+    Points are stored with integer ids (assigned sequentially unless given),
+    so front members can be traced back to the scenario that produced them.
+    """
+    def __init__(self, n_objectives, names=None):
+        self.names = tuple(names) if names is not None else None
+        self.points = np.empty((0, n_objectives))
+        self.ids = np.empty(0, dtype=np.int64)
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def insert(self, objectives, ids=None):
+        """
+        Add a batch of points. Returns a mask over the batch of the points
+        that entered the front; front members they dominate are removed.
+        """
+        objectives = np.atleast_2d(np.asarray(objectives, dtype=float))
+        if ids is None:
+            ids = np.arange(self._next_id, self._next_id + len(objectives))
+        ids = np.asarray(ids, dtype=np.int64)
+        self._next_id = max(self._next_id, int(ids.max()) + 1) if len(ids) else self._next_id
+
+        accepted = np.zeros(len(objectives), dtype=bool)
+        candidates = pareto_front(objectives) if len(objectives) else np.empty(0, dtype=np.intp)
+        candidates = candidates[~dominated_by(objectives[candidates], self.points)]
+        accepted[candidates] = True
+
+        if len(candidates):
+            survivors = ~dominated_by(self.points, objectives[candidates])
+            self.points = np.vstack([self.points[survivors], objectives[candidates]])
+            self.ids = np.concatenate([self.ids[survivors], ids[candidates]])
+        return accepted
+
+
+def sourcing_objectives(results, objectives=SOURCING_OBJECTIVES):
+    """
+    Stack ImpactAnalyzer columns (dict of arrays) into an (n, k) array.
+    """
+    return np.column_stack([np.asarray(results[name], dtype=float) for name in objectives])
+
+
+def select_sourcing(results, objectives=SOURCING_OBJECTIVES, max_layers=DEFAULT_MAX_LAYERS):
+    """
+    Pareto set and dominance layers over ImpactAnalyzer.analyze_batch output.
+    Returns (front indices, layer per row); rows past the first max_layers
+    layers get max_layers.
+    """
+    objs = sourcing_objectives(results, objectives)
+    layers = dominance_layers(objs, max_layers=max_layers)
+    return np.nonzero(layers == 0)[0], layers
@@ -0,0 +1,140 @@
+from typing import Dict
+
+import numpy as np
+
+from moonshine.data import DATA_DIR, load_yaml
+from moonshine.designs import Dimensions
+from moonshine.pareto import pareto_front
+
+PCM_PATH = DATA_DIR / "pcm_materials.yaml"
+
+# Candidate canister radii (m), 1-7 cm in 5 mm steps
+DEFAULT_RADII_M = np.arange(0.010, 0.0701, 0.005)
+# Objectives traded off by the sizing optimizer (all minimised)
+SIZING_OBJECTIVES = ("mass_kg", "volume_l", "length_m")
+
+_FIELDS = ("melting_point_c", "latent_heat_kj_kg", "density_kg_m3", "cp_kj_kgk")
+
+
+def load_pcm_catalogue(path=None) -> Dict[str, np.ndarray]:
+    """
+    PCM catalogue from data/pcm_materials.yaml as columns: "code" and
+    "name" (lists) plus one float array per property.
+    """
+    materials = load_yaml(path or PCM_PATH)["pcm_materials"]
+    catalogue = {"code": list(materials), "name": [m["name"] for m in materials.values()]}
+    for field in _FIELDS:
+        catalogue[field] = np.array([float(m[field]) for m in materials.values()])
+    return catalogue
+
+
+def canister_envelope(sku=None):
+    """
+    Largest canister (diameter_mm, length_mm) that fits a hardware track
+    (default Dimensions.TOWER_V1).
+    The tower stands the canister upright inside its footprint; the 2U
+    Rickhouse lays it along the rack depth under the height limit.
+    """
+    sku = Dimensions.TOWER_V1 if sku is None else sku
+    if "max_footprint_mm" in sku:
+        return float(min(sku["max_footprint_mm"])), float(sku["max_height_mm"])
+    return float(sku["max_height_mm"]), float(sku["rack_depth_mm"])
+
+
+def size_grid(runtime_min, thermal_load_w, radius_m=DEFAULT_RADII_M, catalogue=None,
+              sensible_swing_c=0.0, fill_fraction=1.0):
+    """
+    Vectorized PCM sizing over material x radius x runtime x load.
+
+    Every result array has shape (n_materials, n_radii, n_runtimes, n_loads).
+    The stored energy is thermal_load_w over runtime_min. It comes from the
+    heat of fusion plus sensible heat over sensible_swing_c. fill_fraction
+    is the share of the canister volume taken by PCM, leaving the rest for
+    expansion.
+    """
+    catalogue = catalogue if catalogue is not None else load_pcm_catalogue()
+    radius = np.atleast_1d(np.asarray(radius_m, dtype=float))[None, :, None, None]
+    runtime = np.atleast_1d(np.asarray(runtime_min, dtype=float))[None, None, :, None]
+    load = np.atleast_1d(np.asarray(thermal_load_w, dtype=float))[None, None, None, :]
+    latent = catalogue["latent_heat_kj_kg"][:, None, None, None]
+    cp = catalogue["cp_kj_kgk"][:, None, None, None]
+    density = catalogue["density_kg_m3"][:, None, None, None]
+
+    energy_j = load * runtime * 60
+    mass_kg = energy_j / ((latent + cp * sensible_swing_c) * 1000)
+    pcm_volume_m3 = mass_kg / density
+    canister_volume_m3 = pcm_volume_m3 / fill_fraction
+    length_m = canister_volume_m3 / (np.pi * radius ** 2)
+
+    shape = np.broadcast_shapes(mass_kg.shape, length_m.shape)
+    return {
+        "energy_j": np.broadcast_to(energy_j, shape),
+        "mass_kg": np.broadcast_to(mass_kg, shape),
+        "volume_l": np.broadcast_to(canister_volume_m3 * 1000, shape),
+        "length_m": length_m,
+        "radius_m": np.broadcast_to(radius, shape),
+    }
+
+
+def feasible_mask(grid, catalogue=None, sku=None, min_melting_point_c=None,
+                  max_melting_point_c=None, max_volume_l=None):
+    """
+    Candidates of a size_grid result that fit the canister envelope of
+    `sku`, and the optional melting point window and volume cap.
+    """
+    catalogue = catalogue if catalogue is not None else load_pcm_catalogue()
+    max_diameter_mm, max_length_mm = canister_envelope(sku)
+    ok = (grid["radius_m"] * 2000 <= max_diameter_mm) & (grid["length_m"] * 1000 <= max_length_mm)
+    melt = catalogue["melting_point_c"][:, None, None, None]
+    if min_melting_point_c is not None:
+        ok &= melt >= min_melting_point_c
+    if max_melting_point_c is not None:
+        ok &= melt <= max_melting_point_c
+    if max_volume_l is not None:
+        ok &= grid["volume_l"] <= max_volume_l
+    return ok
+
+
+def optimize_thermal_battery(runtime_min, thermal_load_w, radius_m=DEFAULT_RADII_M, sku=None,
+                             catalogue=None, min_melting_point_c=None, max_melting_point_c=None,
+                             max_volume_l=None, sensible_swing_c=0.0, fill_fraction=1.0):
+    """
+    Feasible Pareto set (mass, volume, length) of thermal battery designs.
+
+    The full material x radius x runtime x load grid is sized at once and
+    candidates outside the envelope are pruned. Each (runtime, load)
+    requirement then gets its own front over the remaining material and
+    radius choices. A light design for a 1 minute buffer does not compete
+    with one for 10 minutes. Returns a dict of flat arrays, one row per
+    front member: "material" (codes), "melting_point_c", "radius_m",
+    "runtime_min", "thermal_load_w" and the SIZING_OBJECTIVES.
+    """
+    catalogue = catalogue if catalogue is not None else load_pcm_catalogue()
+    grid = size_grid(runtime_min, thermal_load_w, radius_m, catalogue, sensible_swing_c, fill_fraction)
+    ok = feasible_mask(grid, catalogue, sku, min_melting_point_c, max_melting_point_c, max_volume_l)
+
+    runtimes = np.atleast_1d(np.asarray(runtime_min, dtype=float))
+    loads = np.atleast_1d(np.asarray(thermal_load_w, dtype=float))
+    objectives = np.stack([grid[name] for name in SIZING_OBJECTIVES], axis=-1)
+    rows = []
+    for t in range(len(runtimes)):
+        for w in range(len(loads)):
+            material, radius = np.nonzero(ok[:, :, t, w])
+            if not len(material):
+                continue
+            front = pareto_front(objectives[material, radius, t, w])
+            rows.append(np.column_stack([material[front], radius[front],
+                                         np.full(len(front), t), np.full(len(front), w)]))
+    index = np.vstack(rows) if rows else np.empty((0, 4), dtype=np.intp)
+    m, r, t, w = index.T
+
+    result = {
+        "material": [catalogue["code"][i] for i in m],
+        "melting_point_c": catalogue["melting_point_c"][m],
+        "radius_m": grid["radius_m"][m, r, t, w],
+        "runtime_min": runtimes[t],
+        "thermal_load_w": loads[w],
+    }
+    for name in SIZING_OBJECTIVES:
+        result[name] = grid[name][m, r, t, w]
+    return result
@@ -0,0 +1,284 @@
+import hashlib
+import io
+from pathlib import Path
+
+import numpy as np
+
+from moonshine.data import DATA_DIR, atomic_write_bytes, cache_dir, file_digest, load_yaml
+
+DEFAULT_PROPERTIES_PATH = DATA_DIR / "properties.yaml"
+
+P_ATM = 101325.0
+_MMHG = 133.322
+_R_CAL = 1.98721
+_TABLE_VERSION = 1
+
+_table = None
+_data_path = DEFAULT_PROPERTIES_PATH
+
+
+class VLETable:
+    """
+    Dense ethanol/water property tables over (liquid mole fraction, pressure).
+
+    Axes are uniform in mole fraction and in ln(pressure), so lookups are
+    plain index arithmetic plus bilinear interpolation. All methods take
+    mole fractions and pressures in Pa and broadcast over arrays.
+    """
+    def __init__(self, x, ln_p, bubble_t_c, vapor_y, h_vap_kj_kg, dew_t_c, molar_mass, rho_molar):
+        self.x = x
+        self.ln_p = ln_p
+        self.bubble_t_c = bubble_t_c
+        self.vapor_y = vapor_y
+        self.h_vap_kj_kg = h_vap_kj_kg
+        self.dew_t_c = dew_t_c  # indexed by vapor mole fraction on the same grid as x
+        self.molar_mass = molar_mass  # g/mol (ethanol, water)
+        self.rho_molar = rho_molar  # mol/L of each pure liquid
+        self._atm_column = int(np.argmin(np.abs(ln_p - np.log(P_ATM))))
+        if not np.isclose(np.exp(ln_p[self._atm_column]), P_ATM):
+            raise ValueError("VLE pressure grid must include 1 atm")
+
+        # 1 atm curves on a volume-fraction grid: the common case is a
+        # single np.interp with no unit conversion
+        self.atm_mix = np.linspace(0.0, 1.0, len(x))
+        atm_x = self.volume_to_mole(self.atm_mix)
+        self.atm_bubble_t_c = np.interp(atm_x, x, bubble_t_c[:, self._atm_column])
+        self.atm_vapor_mix = self.mole_to_volume(np.interp(atm_x, x, vapor_y[:, self._atm_column]))
+        self.atm_h_vap_kj_kg = np.interp(atm_x, x, h_vap_kj_kg[:, self._atm_column])
+
+    def volume_to_mole(self, mix_ratio):
+        mix_ratio = np.asarray(mix_ratio, dtype=float)
+        n_e = mix_ratio * self.rho_molar[0]
+        n_w = (1 - mix_ratio) * self.rho_molar[1]
+        return n_e / (n_e + n_w)
+
+    def mole_to_volume(self, x):
+        x = np.asarray(x, dtype=float)
+        v_e = x / self.rho_molar[0]
+        v_w = (1 - x) / self.rho_molar[1]
+        return v_e / (v_e + v_w)
+
+    def _lookup(self, table, x, pressure_pa):
+        x, pressure_pa = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(pressure_pa, dtype=float))
+        ln_p = np.log(pressure_pa)
+        lo, hi = self.ln_p[0], self.ln_p[-1]
+        if np.any((ln_p < lo - 1e-12) | (ln_p > hi + 1e-12)):
+            raise ValueError(f"Pressure outside VLE table range "
+                             f"({np.exp(lo):.0f}-{np.exp(hi):.0f} Pa)")
+        nx, n_p = table.shape
+        fx = np.clip(x, 0.0, 1.0) * (nx - 1)
+        fp = (np.clip(ln_p, lo, hi) - lo) / (hi - lo) * (n_p - 1)
+        i = np.minimum(fx.astype(np.intp), nx - 2)
+        j = np.minimum(fp.astype(np.intp), n_p - 2)
+        tx = fx - i
+        tp = fp - j
+        return ((1 - tx) * (1 - tp) * table[i, j] + tx * (1 - tp) * table[i + 1, j]
+                + (1 - tx) * tp * table[i, j + 1] + tx * tp * table[i + 1, j + 1])
+
+    def bubble_point(self, x, pressure_pa=P_ATM):
+        return self._lookup(self.bubble_t_c, x, pressure_pa)
+
+    def vapor_composition(self, x, pressure_pa=P_ATM):
+        return self._lookup(self.vapor_y, x, pressure_pa)
+
+    def dew_point(self, y, pressure_pa=P_ATM):
+        return self._lookup(self.dew_t_c, y, pressure_pa)
+
+    def latent_heat(self, x, pressure_pa=P_ATM):
+        return self._lookup(self.h_vap_kj_kg, x, pressure_pa)
+
+    def to_npz(self):
+        buffer = io.BytesIO()
+        np.savez(buffer, version=_TABLE_VERSION, x=self.x, ln_p=self.ln_p, bubble_t_c=self.bubble_t_c,
+                 vapor_y=self.vapor_y, h_vap_kj_kg=self.h_vap_kj_kg, dew_t_c=self.dew_t_c,
+                 molar_mass=self.molar_mass, rho_molar=self.rho_molar)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_npz(cls, source):
+        with np.load(source) as f:
+            if int(f["version"]) != _TABLE_VERSION:
+                raise ValueError("Stale VLE table")
+            return cls(f["x"], f["ln_p"], f["bubble_t_c"], f["vapor_y"], f["h_vap_kj_kg"], f["dew_t_c"],
+                       f["molar_mass"], f["rho_molar"])
+
+
+def _psat_pa(antoine, t_c):
+    return 10 ** (antoine["A"] - antoine["B"] / (antoine["C"] + t_c)) * _MMHG
+
+
+def _wilson_gammas(x, t_c, spec):
+    eth, wat = spec["components"]["ETHANOL"], spec["components"]["WATER"]
+    rt = _R_CAL * (t_c + 273.15)
+    v1, v2 = eth["molar_volume_cm3_mol"], wat["molar_volume_cm3_mol"]
+    l12 = v2 / v1 * np.exp(-spec["wilson"]["a12_cal_mol"] / rt)
+    l21 = v1 / v2 * np.exp(-spec["wilson"]["a21_cal_mol"] / rt)
+    x2 = 1 - x
+    d1 = x + x2 * l12
+    d2 = x2 + x * l21
+    term = l12 / d1 - l21 / d2
+    return np.exp(-np.log(d1) + x2 * term), np.exp(-np.log(d2) - x * term)
+
+
+def _watson_kj_mol(component, t_c, exponent):
+    t_k = t_c + 273.15
+    tc = component["critical_temperature_k"]
+    ratio = np.clip(1 - t_k / tc, 0.0, None) / (1 - component["normal_boiling_point_k"] / tc)
+    return component["h_vap_nbp_kj_mol"] * ratio ** exponent
+
+
+def solve_bubble_point(x, pressure_pa, spec):
+    """
+    Rigorous bubble temperature (C) and vapor mole fraction for liquid mole
+    fraction x at pressure_pa, by Newton iteration on ln(sum x*gamma*Psat / P).
+    Used to generate the tables; too slow for per-call use.
+    """
+    x, pressure_pa = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(pressure_pa, dtype=float))
+    eth, wat = spec["components"]["ETHANOL"], spec["components"]["WATER"]
+
+    def residual(t_c):
+        g1, g2 = _wilson_gammas(x, t_c, spec)
+        p1 = x * g1 * _psat_pa(eth["antoine"], t_c)
+        p2 = (1 - x) * g2 * _psat_pa(wat["antoine"], t_c)
+        return np.log((p1 + p2) / pressure_pa), p1
+
+    t_c = np.full(x.shape, 90.0)
+    for _ in range(50):
+        f, _ = residual(t_c)
+        step = f / ((residual(t_c + 1e-4)[0] - f) / 1e-4)
+        t_c = t_c - np.clip(step, -25, 25)
+        if np.max(np.abs(step)) < 1e-10:
+            break
+    _, p1 = residual(t_c)
+    return t_c, p1 / pressure_pa
+
+
+def build_vle_table(spec) -> VLETable:
+    """
+    Generate the (composition x pressure) tables from a properties spec
+    (see data/properties.yaml).
+    """
+    grid = spec["grid"]
+    eth, wat = spec["components"]["ETHANOL"], spec["components"]["WATER"]
+    x = np.linspace(0.0, 1.0, grid["composition_points"])
+    ln_p = np.linspace(np.log(grid["pressure_min_atm"] * P_ATM), np.log(grid["pressure_max_atm"] * P_ATM),
+                       grid["pressure_points"])
+    xx, pp = np.meshgrid(x, np.exp(ln_p), indexing="ij")
+    bubble_t, vapor_y = solve_bubble_point(xx, pp, spec)
+    vapor_y = np.clip(vapor_y, 0.0, 1.0)
+
+    # Latent heat of the liquid at its bubble point, per kg of mixture
+    exponent = spec["watson_exponent"]
+    molar_mass = np.array([eth["molar_mass_g_mol"], wat["molar_mass_g_mol"]])
+    h_molar = xx * _watson_kj_mol(eth, bubble_t, exponent) + (1 - xx) * _watson_kj_mol(wat, bubble_t, exponent)
+    h_vap = h_molar / (xx * molar_mass[0] + (1 - xx) * molar_mass[1]) * 1000
+
+    # Vapor composition rises monotonically with x, so the dew point at
+    # vapor composition y is the bubble point of the liquid in equilibrium
+    dew_t = np.empty_like(bubble_t)
+    for j in range(len(ln_p)):
+        y_col, order = np.unique(vapor_y[:, j], return_index=True)
+        dew_t[:, j] = np.interp(x, y_col, bubble_t[order, j])
+
+    rho_molar = np.array([eth["density_kg_m3"] / eth["molar_mass_g_mol"],
+                          wat["density_kg_m3"] / wat["molar_mass_g_mol"]])
+    return VLETable(x, ln_p, bubble_t, vapor_y, h_vap, dew_t, molar_mass, rho_molar)
+
+
+def _table_cache_path(path):
+    key = hashlib.sha256(f"{_TABLE_VERSION}:{file_digest(path)}".encode()).hexdigest()[:24]
+    return cache_dir() / "properties" / f"vle-{key}.npz"
+
+
+def load_vle_table(path=None) -> VLETable:
+    """
+    Load the tables for `path`, generating and persisting them as .npz in
+    cache_dir() on first use. The cache file name includes the spec's
+    content hash, so editing data/properties.yaml rebuilds the tables.
+    """
+    path = path or DEFAULT_PROPERTIES_PATH
+    cache_path = _table_cache_path(path)
+    try:
+        return VLETable.from_npz(cache_path)
+    except (OSError, ValueError, KeyError):
+        pass
+    table = build_vle_table(load_yaml(path))
+    try:
+        atomic_write_bytes(cache_path, table.to_npz())
+    except OSError:
+        # A read-only cache directory should not break the simulation
+        pass
+    return table
+
+
+def get_vle_table() -> VLETable:
+    global _table
+    if _table is None:
+        _table = load_vle_table()
+    return _table
+
+
+def get_data_file() -> Path:
+    return Path(_data_path)
+
+
+def use_properties_file(path=None):
+    """
+    Switch the active property tables (e.g. to a refitted model).
+    """
+    global _table, _data_path
+    _table = load_vle_table(path)
+    _data_path = path or DEFAULT_PROPERTIES_PATH
+
+
+def boiling_point(mix_ratio, pressure_pa=None):
+    """
+    Bubble point (C) of a liquid with ethanol volume fraction mix_ratio.
+    pressure_pa defaults to 1 atm.
+    """
+    table = get_vle_table()
+    if pressure_pa is None:
+        return np.interp(mix_ratio, table.atm_mix, table.atm_bubble_t_c)
+    return table.bubble_point(table.volume_to_mole(mix_ratio), pressure_pa)
+
+
+def vapor_mix_ratio(mix_ratio, pressure_pa=None):
+    """
+    Ethanol volume fraction of the (condensed) vapor in equilibrium with a
+    liquid of volume fraction mix_ratio.
+    """
+    table = get_vle_table()
+    if pressure_pa is None:
+        return np.interp(mix_ratio, table.atm_mix, table.atm_vapor_mix)
+    y = table.vapor_composition(table.volume_to_mole(mix_ratio), pressure_pa)
+    return table.mole_to_volume(y)
+
+
+def dew_point(vapor_mix, pressure_pa=P_ATM):
+    """
+    Dew point (C) of a vapor whose condensate has ethanol volume fraction vapor_mix.
+    """
+    table = get_vle_table()
+    return table.dew_point(table.volume_to_mole(vapor_mix), pressure_pa)
+
+
+def latent_heat(mix_ratio, pressure_pa=None):
+    """
+    Latent heat of vaporisation (kJ/kg) of the liquid at its bubble point.
+    """
+    table = get_vle_table()
+    if pressure_pa is None:
+        return np.interp(mix_ratio, table.atm_mix, table.atm_h_vap_kj_kg)
+    return table.latent_heat(table.volume_to_mole(mix_ratio), pressure_pa)
+
+
+def mix_ratio_at_boiling_point(t_c):
+    """
+    Liquid volume fraction whose 1 atm bubble point is t_c, on the
+    water-rich side of the azeotrope (where the curve is monotonic).
+    """
+    table = get_vle_table()
+    azeotrope = int(np.argmin(table.atm_bubble_t_c))
+    curve_t = table.atm_bubble_t_c[:azeotrope + 1]
+    curve_mix = table.atm_mix[:azeotrope + 1]
+    return np.interp(t_c, curve_t[::-1], curve_mix[::-1])
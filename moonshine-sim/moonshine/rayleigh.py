@@ -0,0 +1,183 @@
+import os
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from moonshine.properties import boiling_point, vapor_mix_ratio
+
+# Initial conditions integrated together in one adaptive solve
+DEFAULT_CHUNK_SIZE = 4096
+# The evaporated fractions the original 1%-step demo printed (every 10 steps)
+DEMO_FRACTIONS = 1.0 - 0.99 ** np.arange(0, 100, 10)
+
+_GAUSS_NODES, _GAUSS_WEIGHTS = np.polynomial.legendre.leggauss(64)
+
+
+@dataclass
+class EvaporationChunk:
+    """
+    Rayleigh trajectories for initial conditions [start, start + n).
+    volume_ml, mix_ratio and boiling_point_c are (n, n_fractions), one
+    column per entry of evaporated_fraction.
+    """
+    start: int
+    evaporated_fraction: np.ndarray
+    initial_volume_ml: np.ndarray
+    initial_mix: np.ndarray
+    volume_ml: np.ndarray
+    mix_ratio: np.ndarray
+    boiling_point_c: np.ndarray
+
+
+def rayleigh_rate(mix_ratio, pressure_pa=None):
+    """
+    d(mix)/d(ln V) of the liquid: the Rayleigh equation in volume terms.
+    Positive on the water-rich side of the azeotrope, so the liquid gets
+    leaner as it evaporates (ln V falls).
+    """
+    mix_ratio = np.clip(mix_ratio, 0.0, 1.0)
+    return vapor_mix_ratio(mix_ratio, pressure_pa) - mix_ratio
+
+
+def _broadcast_conditions(initial_volume_ml, initial_mix):
+    initial_volume_ml, initial_mix = np.broadcast_arrays(
+        np.asarray(initial_volume_ml, dtype=float), np.asarray(initial_mix, dtype=float))
+    return initial_volume_ml.ravel(), initial_mix.ravel()
+
+
+def _check_fractions(evaporated_fraction):
+    fractions = np.atleast_1d(np.asarray(evaporated_fraction, dtype=float))
+    if fractions.ndim != 1 or np.any(np.diff(fractions) <= 0):
+        raise ValueError("evaporated_fraction must be a strictly increasing 1D sequence")
+    if fractions[0] < 0 or fractions[-1] >= 1:
+        raise ValueError("evaporated_fraction must lie in [0, 1)")
+    return fractions
+
+
+def _solve_chunk(initial_mix, ln_remaining, pressure_pa, rtol, atol):
+    # Integrate every initial mix at once along s = ln(V / V0) (0 down to
+    # ln_remaining[-1]); the step size adapts to the whole batch.
+    def rhs(_, mix):
+        return rayleigh_rate(mix, pressure_pa)
+
+    if ln_remaining[-1] == 0.0:
+        return np.repeat(initial_mix[:, None], len(ln_remaining), axis=1)
+    solution = solve_ivp(rhs, (0.0, ln_remaining[-1]), initial_mix, t_eval=ln_remaining,
+                         rtol=rtol, atol=atol)
+    if not solution.success:
+        raise RuntimeError(f"Rayleigh integration failed: {solution.message}")
+    return np.clip(solution.y, 0.0, 1.0)
+
+
+def iter_evaporation(initial_volume_ml, initial_mix, evaporated_fraction=DEMO_FRACTIONS, pressure_pa=None,
+                     chunk_size=DEFAULT_CHUNK_SIZE, rtol=1e-6, atol=1e-9) -> Iterator[EvaporationChunk]:
+    """
+    Batched Rayleigh (open, differential) distillation of ethanol/water charges.
+
+    initial_volume_ml and initial_mix broadcast against each other and are
+    flattened into N initial conditions. Each chunk of up to chunk_size
+    conditions is integrated in one adaptive solve_ivp call and yielded as
+    an EvaporationChunk, so N is not limited by memory. Results are sampled
+    at the given evaporated (volume) fractions.
+    """
+    volumes, mixes = _broadcast_conditions(initial_volume_ml, initial_mix)
+    fractions = _check_fractions(evaporated_fraction)
+    ln_remaining = np.log1p(-fractions)
+    for start in range(0, len(mixes), chunk_size):
+        v0 = volumes[start:start + chunk_size]
+        m0 = mixes[start:start + chunk_size]
+        mix = _solve_chunk(m0, ln_remaining, pressure_pa, rtol, atol)
+        yield EvaporationChunk(
+            start=start,
+            evaporated_fraction=fractions,
+            initial_volume_ml=v0,
+            initial_mix=m0,
+            volume_ml=v0[:, None] * (1.0 - fractions)[None, :],
+            mix_ratio=mix,
+            boiling_point_c=boiling_point(mix, pressure_pa),
+        )
+
+
+def write_evaporation(directory, initial_volume_ml, initial_mix, evaporated_fraction=DEMO_FRACTIONS,
+                      pressure_pa=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Runs iter_evaporation and writes columnar .npy files into directory:
+    evaporated_fraction (F,), initial_volume_ml and initial_mix (N,), and
+    volume_ml, mix_ratio and boiling_point_c (N, F). Large outputs are
+    filled chunk by chunk through memory maps. Returns the file paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    volumes, mixes = _broadcast_conditions(initial_volume_ml, initial_mix)
+    fractions = _check_fractions(evaporated_fraction)
+    paths = {name: os.path.join(directory, f"{name}.npy") for name in
+             ("evaporated_fraction", "initial_volume_ml", "initial_mix", "volume_ml", "mix_ratio", "boiling_point_c")}
+    np.save(paths["evaporated_fraction"], fractions)
+    np.save(paths["initial_volume_ml"], volumes)
+    np.save(paths["initial_mix"], mixes)
+    columns = {name: np.lib.format.open_memmap(paths[name], mode="w+", dtype=np.float64,
+                                               shape=(len(mixes), len(fractions)))
+               for name in ("volume_ml", "mix_ratio", "boiling_point_c")}
+    for chunk in iter_evaporation(volumes, mixes, fractions, pressure_pa, chunk_size):
+        rows = slice(chunk.start, chunk.start + len(chunk.initial_mix))
+        for name, column in columns.items():
+            column[rows] = getattr(chunk, name)
+    for column in columns.values():
+        column.flush()
+    return paths
+
+
+def _azeotrope_mix(pressure_pa=None, samples=2001):
+    mix = np.linspace(0.0, 1.0, samples)
+    return mix[int(np.argmin(boiling_point(mix, pressure_pa)))]
+
+
+def _mix_at_boiling_point(target_c, pressure_pa=None, samples=2001):
+    # Invert the bubble curve on the water-rich side of the azeotrope,
+    # where it falls monotonically with mix
+    mix = np.linspace(0.0, _azeotrope_mix(pressure_pa, samples), samples)
+    curve_t = boiling_point(mix, pressure_pa)
+    return np.interp(target_c, curve_t[::-1], mix[::-1], left=np.nan, right=np.nan)
+
+
+def evaporated_fraction_at_boiling_point(initial_mix, target_c, pressure_pa=None):
+    """
+    Fraction of the charge (by volume) that must evaporate before the liquid's
+    boiling point reaches target_c, solved without time stepping:
+
+        ln(V / V0) = integral from m0 to m* of dm / (y(m) - m)
+
+    evaluated by Gauss-Legendre quadrature for every initial mix at once,
+    where m* is the mix whose bubble point is target_c. Charges that already
+    boil above target_c return 0. Charges that never get there return np.inf.
+    These are ethanol-rich mixes past the azeotrope, or targets above the
+    boiling point of water.
+
+    initial_mix and target_c broadcast against each other; pressure_pa is a
+    single pressure (default 1 atm).
+    """
+    initial_mix, target_c = np.broadcast_arrays(np.asarray(initial_mix, dtype=float),
+                                                np.asarray(target_c, dtype=float))
+    target_mix = _mix_at_boiling_point(target_c, pressure_pa)
+    reachable = np.isfinite(target_mix) & (initial_mix < _azeotrope_mix(pressure_pa))
+    already = boiling_point(initial_mix, pressure_pa) >= target_c
+
+    m0 = np.where(reachable, initial_mix, 0.5)[..., None]
+    m1 = np.where(reachable, target_mix, 0.5)[..., None]
+    half = 0.5 * (m1 - m0)
+    nodes = m0 + half * (_GAUSS_NODES + 1.0)
+    with np.errstate(divide="ignore"):
+        ln_remaining = np.sum(_GAUSS_WEIGHTS * half / rayleigh_rate(nodes, pressure_pa), axis=-1)
+    fraction = -np.expm1(ln_remaining)
+    fraction = np.where(reachable, fraction, np.inf)
+    return np.where(already, 0.0, fraction)
+
+
+def volume_at_boiling_point(initial_volume_ml, initial_mix, target_c, pressure_pa=None):
+    """
+    Liquid volume (mL) left when the boiling point reaches target_c
+    (0 for charges that never get there).
+    """
+    fraction = evaporated_fraction_at_boiling_point(initial_mix, target_c, pressure_pa)
+    return np.asarray(initial_volume_ml, dtype=float) * np.where(np.isfinite(fraction), 1.0 - fraction, 0.0)
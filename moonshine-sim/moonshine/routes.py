@@ -0,0 +1,233 @@
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from moonshine.data import DATA_DIR, load_yaml
+from moonshine.impact import ImpactAnalyzer, Logistics
+
+DEFAULT_NETWORK_PATH = DATA_DIR / "logistics_network.yaml"
+
+OBJECTIVES = ("carbon", "cost")
+
+
+@dataclass
+class Route:
+    origin: str
+    site: str
+    feedstock: str
+    legs: List[Tuple[str, str, str, float]]  # (from, to, mode, distance_km)
+    carbon_kg_per_l: float
+    cost_usd_per_l: float
+
+    @property
+    def transport_legs(self) -> List[Tuple[float, str]]:
+        """
+        Legs in the (distance_km, mode) form used by ImpactAnalyzer.analyze_route.
+        """
+        return [(distance, mode) for _, _, mode, distance in self.legs]
+
+    @property
+    def distance_km(self) -> float:
+        return sum(leg[3] for leg in self.legs)
+
+
+class RouteSolution:
+    """
+    Shortest routes from a set of origins to a set of sites.
+
+    carbon_kg_per_l and cost_usd_per_l are (n_origins, n_sites) matrices
+    evaluated along the route chosen for `objective`; unreachable pairs
+    are np.inf.
+    """
+    def __init__(self, network, objective, origins, sites, predecessors, carbon, cost):
+        self.network = network
+        self.objective = objective
+        self.origins = origins
+        self.sites = sites
+        self.predecessors = predecessors
+        self.carbon_kg_per_l = carbon
+        self.cost_usd_per_l = cost
+
+    def route(self, origin: str, site: str) -> Route:
+        i = self.origins.index(origin)
+        j = self.sites.index(site)
+        if not np.isfinite(self.carbon_kg_per_l[i, j]):
+            raise ValueError(f"No route from {origin} to {site}")
+
+        net = self.network
+        target = net.index[site]
+        source = net.index[origin]
+        legs = []
+        node = target
+        while node != source:
+            prev = self.predecessors[i, node]
+            edge = net.edge_between(prev, node, self.objective)
+            legs.append((net.node_ids[prev], net.node_ids[node], net.mode_codes[net.edge_mode[edge]],
+                         float(net.edge_distance[edge])))
+            node = prev
+        legs.reverse()
+        return Route(origin, site, net.nodes[origin].get("feedstock"), legs,
+                     float(self.carbon_kg_per_l[i, j]), float(self.cost_usd_per_l[i, j]))
+
+    def best_sites(self) -> Dict[str, str]:
+        """
+        Best site per origin under this solution's objective.
+        """
+        metric = self.carbon_kg_per_l if self.objective == "carbon" else self.cost_usd_per_l
+        return {origin: self.sites[j] for origin, j in zip(self.origins, metric.argmin(axis=1))}
+
+    def analyze(self, analyzer: ImpactAnalyzer):
+        """
+        Columnar ImpactAnalyzer results for every reachable (origin, site)
+        pair whose origin has a feedstock. Adds origin/site name columns.
+        """
+        rows, cols = np.nonzero(np.isfinite(self.carbon_kg_per_l))
+        feedstocks = [self.network.nodes[self.origins[i]].get("feedstock") for i in rows]
+        keep = np.array([f is not None for f in feedstocks], dtype=bool)
+        rows, cols = rows[keep], cols[keep]
+        feedstocks = np.array([f for f in feedstocks if f is not None], dtype=str)
+
+        result = analyzer.analyze_batch(feedstocks, 0.0,
+                                        transport_carbon_kg_per_l=self.carbon_kg_per_l[rows, cols])
+        result["origin"] = np.array(self.origins)[rows]
+        result["site"] = np.array(self.sites)[cols]
+        result["transport_cost_usd"] = self.cost_usd_per_l[rows, cols] * analyzer.volume_l
+        result["total_cost_usd"] = result["total_cost_usd"] + result["transport_cost_usd"]
+        return result
+
+
+class LogisticsNetwork:
+    """
+    Multi-modal sourcing graph of origins, ports, rail heads and sites.
+
+    Edges are stored as flat arrays (source, target, mode, distance) so
+    graphs with tens of thousands of edges stay cheap to build and solve.
+    """
+    def __init__(self, nodes: Dict[str, dict], edge_source, edge_target, edge_mode, edge_distance,
+                 mode_codes=None):
+        self.nodes = nodes
+        self.node_ids = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.node_ids)}
+
+        if mode_codes is None:
+            mode_codes, _ = Logistics.emission_table()
+        self.mode_codes = list(mode_codes)
+        self.edge_source = np.asarray(edge_source, dtype=np.intp)
+        self.edge_target = np.asarray(edge_target, dtype=np.intp)
+        self.edge_mode = np.asarray(edge_mode, dtype=np.intp)
+        self.edge_distance = np.asarray(edge_distance, dtype=float)
+
+        per_l_carbon = np.array([Logistics.emission_factor(m) for m in self.mode_codes])
+        per_l_cost = np.array([Logistics.cost_factor(m) for m in self.mode_codes])
+        self.edge_carbon = self.edge_distance * per_l_carbon[self.edge_mode]
+        self.edge_cost = self.edge_distance * per_l_cost[self.edge_mode]
+        self._graphs = {}
+
+    @classmethod
+    def from_yaml(cls, path=None):
+        spec = load_yaml(path or DEFAULT_NETWORK_PATH)
+        nodes = spec["nodes"]
+        index = {node: i for i, node in enumerate(nodes)}
+        mode_codes, _ = Logistics.emission_table()
+        mode_index = {mode: i for i, mode in enumerate(mode_codes)}
+
+        source, target, mode, distance = [], [], [], []
+        for key, directed in (("edges", False), ("directed_edges", True)):
+            for edge in spec.get(key) or []:
+                a, b, m, km = edge
+                for node in (a, b):
+                    if node not in index:
+                        raise ValueError(f"Edge references unknown node: {node}")
+                if m not in mode_index:
+                    raise ValueError(f"Unknown transport mode: {m}")
+                pairs = [(a, b)] if directed else [(a, b), (b, a)]
+                for u, v in pairs:
+                    source.append(index[u])
+                    target.append(index[v])
+                    mode.append(mode_index[m])
+                    distance.append(float(km))
+        return cls(nodes, source, target, mode, distance, mode_codes)
+
+    def nodes_of_type(self, node_type: str) -> List[str]:
+        return [node for node, attrs in self.nodes.items() if attrs.get("type") == node_type]
+
+    def _graph(self, objective):
+        # Collapse parallel edges (e.g. truck and rail between the same two
+        # nodes) to the cheapest one for this objective, and remember which
+        # edge won so routes can be reported leg by leg.
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective: {objective}")
+        if objective not in self._graphs:
+            weight = self.edge_carbon if objective == "carbon" else self.edge_cost
+            n = len(self.node_ids)
+            key = self.edge_source * n + self.edge_target
+            order = np.lexsort((weight, key))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = key[order][1:] != key[order][:-1]
+            chosen = order[first]
+            # csgraph ignores explicit zeros, so keep zero-length legs as edges
+            data = np.maximum(weight[chosen], np.finfo(float).tiny)
+            graph = csr_matrix((data, (self.edge_source[chosen], self.edge_target[chosen])), shape=(n, n))
+            self._graphs[objective] = (graph, key[chosen], chosen)
+        return self._graphs[objective]
+
+    def edge_between(self, u, v, objective="carbon"):
+        """
+        Index of the edge used between nodes u and v (integer indices).
+        """
+        u, v = np.asarray(u), np.asarray(v)
+        _, keys, chosen = self._graph(objective)
+        pos = np.searchsorted(keys, u * len(self.node_ids) + v)
+        return chosen[pos]
+
+    def shortest_routes(self, objective="carbon", origins=None, sites=None) -> RouteSolution:
+        """
+        Minimum-carbon (or minimum-cost) multi-leg routes from every origin
+        to every site, via Dijkstra from each origin.
+        """
+        origins = list(origins) if origins is not None else self.nodes_of_type("origin")
+        sites = list(sites) if sites is not None else self.nodes_of_type("site")
+        graph, _, _ = self._graph(objective)
+
+        source_idx = np.array([self.index[o] for o in origins], dtype=np.intp)
+        site_idx = np.array([self.index[s] for s in sites], dtype=np.intp)
+        _, predecessors = dijkstra(graph, directed=True, indices=source_idx, return_predecessors=True)
+
+        carbon, cost = self._accumulate(predecessors, source_idx, objective,
+                                        (self.edge_carbon, self.edge_cost))
+        return RouteSolution(self, objective, origins, sites, predecessors,
+                             carbon[:, site_idx], cost[:, site_idx])
+
+    def _accumulate(self, predecessors, source_idx, objective, edge_values):
+        # Sum each of edge_values along every shortest-path tree at once by
+        # pointer jumping: each pass doubles the number of hops already summed.
+        n_sources, n = predecessors.shape
+        reachable = predecessors >= 0
+        totals = np.zeros((len(edge_values),) + predecessors.shape)
+        rows, cols = np.nonzero(reachable)
+        if len(rows):
+            edges = self.edge_between(predecessors[rows, cols], cols, objective)
+            for total, values in zip(totals, edge_values):
+                total[rows, cols] = values[edges]
+
+        pointer = np.where(reachable, predecessors + np.arange(n_sources)[:, None] * n, -1).ravel()
+        flat = totals.reshape(len(edge_values), -1)
+        while True:
+            valid = np.nonzero(pointer >= 0)[0]
+            if not len(valid):
+                break
+            parent = pointer[valid]
+            flat[:, valid] += flat[:, parent]
+            pointer[valid] = pointer[parent]
+
+        unreachable = ~reachable
+        unreachable[np.arange(n_sources), source_idx] = False
+        totals[:, unreachable] = np.inf
+        return totals
+
+
+def load_network(path=None) -> LogisticsNetwork:
+    return LogisticsNetwork.from_yaml(path)
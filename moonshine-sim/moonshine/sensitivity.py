@@ -0,0 +1,371 @@
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+
+import numpy as np
+from scipy.special import ndtri
+from scipy.stats import qmc
+
+from moonshine import impact, instrument
+from moonshine.data import DATA_DIR, load_yaml
+from moonshine.impact import ImpactAnalyzer
+from moonshine.thermo import FLUSH_THRESHOLD_C, analyze_nodes, boiling_point, drift_mix, solve_flush_day
+
+DEFAULT_MODELS_PATH = DATA_DIR / "sensitivity.yaml"
+
+# Base samples per batch; a Sobol batch evaluates (n_factors + 2) times this
+DEFAULT_BATCH_SIZE = 1 << 15
+# Independent sample streams; fixed so results do not depend on worker count
+DEFAULT_STREAMS = 16
+DEFAULT_MORRIS_LEVELS = 4
+# Unbounded distributions are truncated to these quantiles
+_TAIL = 1e-3
+
+
+def load_models(path=None) -> Dict[str, dict]:
+    return dict(load_yaml(path or DEFAULT_MODELS_PATH)["models"])
+
+
+def ppf(spec, u):
+    """
+    Map unit-interval values u to one declared distribution (inverse CDF),
+    in the format of data/sensitivity.yaml.
+    """
+    kind = spec.get("dist", "fixed")
+    u = np.asarray(u, dtype=float)
+    if kind == "uniform":
+        return spec["low"] + (spec["high"] - spec["low"]) * u
+    if kind == "triangular":
+        low, mode, high = spec["low"], spec["mode"], spec["high"]
+        split = (mode - low) / (high - low)
+        with np.errstate(invalid="ignore"):
+            left = low + np.sqrt(u * (high - low) * (mode - low))
+            right = high - np.sqrt((1 - u) * (high - low) * (high - mode))
+        return np.where(u < split, left, right)
+    if kind in ("normal", "lognormal"):
+        z = ndtri(np.clip(u, _TAIL, 1 - _TAIL))
+        if kind == "normal":
+            return spec["mean"] + spec["std"] * z
+        return spec["median"] * np.exp(spec["sigma"] * z)
+    if kind == "choice":
+        values = np.asarray(spec["values"])
+        return values[np.minimum((u * len(values)).astype(np.intp), len(values) - 1)]
+    raise ValueError(f"Unknown distribution: {kind}")
+
+
+def _node_model(p):
+    return analyze_nodes(p["mix_ratio"], p["tdp_watts"], p["turbine_efficiency"])
+
+
+def _drift_model(p):
+    # Distiller.simulate_drift, batched
+    new_mix = drift_mix(p["mix_ratio"], p["leak_rate_vol_pct_per_day"], p["days"])
+    return {
+        "new_mix_ratio": new_mix,
+        "new_boiling_point_c": boiling_point(new_mix),
+        "flush_day": solve_flush_day(p["mix_ratio"], p["leak_rate_vol_pct_per_day"],
+                                     p.get("threshold_c", FLUSH_THRESHOLD_C)),
+    }
+
+
+def _impact_model(p):
+    # ImpactAnalyzer.analyze_source for 1 L, with multipliers on the
+    # production, transport and water factors
+    result = ImpactAnalyzer(volume_l=1.0).analyze_batch(
+        p["feedstock"], p["distance_km"], p.get("mode", "TRUCK"),
+        carbon_intensity_factor=p.get("carbon_intensity_factor", 1.0),
+        water_intensity_factor=p.get("water_intensity_factor", 1.0),
+        emission_factor_scale=p.get("emission_factor_scale", 1.0))
+    return {"carbon_per_l": result["carbon_per_l"], "weighted_water_l": result["weighted_water_l"]}
+
+
+MODELS = {"node": _node_model, "drift": _drift_model, "impact": _impact_model}
+
+
+def _split_factors(spec):
+    # (varied factor names, their distributions, fixed values)
+    varied = {name: f for name, f in spec["factors"].items() if f.get("dist", "fixed") != "fixed"}
+    fixed = {name: f["value"] for name, f in spec["factors"].items() if f.get("dist", "fixed") == "fixed"}
+    return list(varied), varied, fixed
+
+
+def evaluate_unit(model, spec, unit):
+    """
+    Run `model` (a MODELS key) on points of the unit hypercube, shape
+    (n, n_varied_factors) in the factor order of `spec`. Returns one
+    output array per name in spec["outputs"].
+    """
+    names, varied, fixed = _split_factors(spec)
+    params = dict(fixed)
+    for j, name in enumerate(names):
+        params[name] = ppf(varied[name], unit[:, j])
+    outputs = MODELS[model](params)
+    result = {}
+    for name in spec["outputs"]:
+        if name not in outputs:
+            raise ValueError(f"{model} has no output {name}")
+        values = np.broadcast_to(np.asarray(outputs[name], dtype=float), (len(unit),))
+        if not np.all(np.isfinite(values)):
+            raise ValueError(f"{model}.{name} is not finite over the factor ranges")
+        result[name] = values
+    return result
+
+
+class SobolAccumulator:
+    """
+    Streaming Saltelli/Jansen estimators of first-order and total Sobol
+    indices for one output.
+
+    Each update takes f(A), f(B) and f(A_B^i) (A with column i from B) for
+    a batch of base samples. Only shifted sums are kept: O(n_factors)
+    floats however many samples are seen. Partial results from different
+    streams or workers combine exactly with merge(). The shift (the first
+    batch mean) keeps the variance sums well conditioned.
+    """
+    def __init__(self, n_factors):
+        self.n_factors = n_factors
+        self.count = 0
+        self.shift = None
+        self.sum_a = 0.0
+        self.sum_b = 0.0
+        self.sum_sq = 0.0
+        self.diff = np.zeros(n_factors)
+        self.cross = np.zeros(n_factors)
+        self.jansen = np.zeros(n_factors)
+
+    def update(self, f_a, f_b, f_ab):
+        """
+        f_a, f_b: (n,) arrays; f_ab: (n_factors, n).
+        """
+        if not len(f_a):
+            return
+        if self.shift is None:
+            self.shift = float(f_a.mean())
+        a, b = f_a - self.shift, f_b - self.shift
+        step = f_ab - f_a
+        self.count += len(f_a)
+        self.sum_a += float(a.sum())
+        self.sum_b += float(b.sum())
+        self.sum_sq += float(a @ a + b @ b)
+        self.diff += step.sum(axis=1)
+        self.cross += step @ b
+        self.jansen += np.einsum("ij,ij->i", step, step)
+
+    def merge(self, other: "SobolAccumulator"):
+        if not other.count:
+            return
+        if self.shift is None:
+            self.shift = other.shift
+        delta = other.shift - self.shift
+        self.sum_sq += other.sum_sq + 2 * delta * (other.sum_a + other.sum_b) + 2 * other.count * delta * delta
+        self.sum_a += other.sum_a + other.count * delta
+        self.sum_b += other.sum_b + other.count * delta
+        self.cross += other.cross + delta * other.diff
+        self.diff += other.diff
+        self.jansen += other.jansen
+        self.count += other.count
+
+    @property
+    def variance(self):
+        n = 2 * self.count
+        if not n:
+            return np.nan
+        mean = (self.sum_a + self.sum_b) / n
+        return self.sum_sq / n - mean * mean
+
+    @property
+    def first_order(self):
+        # Saltelli (2010): S_i = E[f(B) (f(A_B^i) - f(A))] / V
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.cross / self.count / self.variance
+
+    @property
+    def total(self):
+        # Jansen (1999): ST_i = E[(f(A) - f(A_B^i))^2] / 2V
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.jansen / (2 * self.count) / self.variance
+
+
+class MorrisAccumulator:
+    """
+    Streaming Morris elementary-effect statistics for one output: per
+    factor mu (mean effect), mu_star (mean absolute effect) and sigma
+    (spread, a sign of interactions or nonlinearity). Effects are per unit
+    step in the factor's quantile space.
+    """
+    def __init__(self, n_factors):
+        self.n_factors = n_factors
+        self.count = np.zeros(n_factors, dtype=np.int64)
+        self.sum = np.zeros(n_factors)
+        self.sum_abs = np.zeros(n_factors)
+        self.sum_sq = np.zeros(n_factors)
+
+    def update(self, factor, effect):
+        """
+        factor: (m,) factor index of each elementary effect; effect: (m,).
+        """
+        k = self.n_factors
+        self.count += np.bincount(factor, minlength=k)
+        self.sum += np.bincount(factor, effect, minlength=k)
+        self.sum_abs += np.bincount(factor, np.abs(effect), minlength=k)
+        self.sum_sq += np.bincount(factor, effect * effect, minlength=k)
+
+    def merge(self, other: "MorrisAccumulator"):
+        self.count += other.count
+        self.sum += other.sum
+        self.sum_abs += other.sum_abs
+        self.sum_sq += other.sum_sq
+
+    @property
+    def mu(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.sum / self.count
+
+    @property
+    def mu_star(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.sum_abs / self.count
+
+    @property
+    def sigma(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var = (self.sum_sq - self.count * self.mu ** 2) / (self.count - 1)
+        return np.sqrt(np.maximum(var, 0.0))
+
+
+@instrument.span("sensitivity.sobol_stream")
+def _sobol_stream(model, spec, seed, n_samples, batch_size):
+    # Work unit: one independently scrambled Sobol sequence over (A, B).
+    # Pure function of its arguments, so the result does not depend on
+    # where it ran.
+    names, _, _ = _split_factors(spec)
+    k = len(names)
+    sampler = qmc.Sobol(2 * k, scramble=True, seed=np.random.default_rng(seed))
+    stats = {name: SobolAccumulator(k) for name in spec["outputs"]}
+    for start in range(0, n_samples, batch_size):
+        n = min(batch_size, n_samples - start)
+        with warnings.catch_warnings():
+            # A short final batch breaks the power-of-two balance; harmless here
+            warnings.simplefilter("ignore", UserWarning)
+            ab = sampler.random(n)
+        a, b = ab[:, :k], ab[:, k:]
+        # One model call for A, B and every A_B^i
+        mixed = np.repeat(a[None], k, axis=0)
+        mixed[np.arange(k), :, np.arange(k)] = b.T
+        outputs = evaluate_unit(model, spec, np.concatenate([a, b, mixed.reshape(-1, k)]))
+        for name in spec["outputs"]:
+            y = outputs[name]
+            stats[name].update(y[:n], y[n:2 * n], y[2 * n:].reshape(k, n))
+    return stats
+
+
+@instrument.span("sensitivity.morris_stream")
+def _morris_stream(model, spec, seed, n_trajectories, batch_size, levels):
+    # Work unit: one stream of one-at-a-time trajectories
+    names, _, _ = _split_factors(spec)
+    k = len(names)
+    rng = np.random.default_rng(seed)
+    delta = levels / (2.0 * (levels - 1))
+    stats = {name: MorrisAccumulator(k) for name in spec["outputs"]}
+    for start in range(0, n_trajectories, batch_size):
+        r = min(batch_size, n_trajectories - start)
+        # Random grid start, then each factor in a random order takes one
+        # step of delta (down where a step up would leave the unit cube)
+        x = rng.integers(0, levels, (r, k)) / (levels - 1)
+        order = np.argsort(rng.random((r, k)), axis=1)
+        points = np.empty((r, k + 1, k))
+        points[:, 0] = x
+        steps = np.empty((r, k))
+        rows = np.arange(r)
+        for j in range(k):
+            factor = order[:, j]
+            current = x[rows, factor]
+            step = np.where(current + delta <= 1 + 1e-12, delta, -delta)
+            x[rows, factor] = current + step
+            steps[:, j] = step
+            points[:, j + 1] = x
+        outputs = evaluate_unit(model, spec, points.reshape(-1, k))
+        for name in spec["outputs"]:
+            y = outputs[name].reshape(r, k + 1)
+            effect = np.diff(y, axis=1) / steps
+            stats[name].update(order.ravel(), effect.ravel())
+    return stats
+
+
+def _init_worker(data_path):
+    # Workers must see the same feedstock data as the parent process
+    impact.use_data_file(data_path)
+
+
+def _run_streams(worker, model, spec, n, seed, workers, streams, extra=()):
+    if model not in MODELS:
+        raise ValueError(f"Unknown sensitivity model: {model}")
+    names, varied, _ = _split_factors(spec)
+    if not names:
+        raise ValueError(f"{model} has no varied factors")
+    # Fail fast on bad specs before any work is shipped to workers
+    evaluate_unit(model, spec, np.full((1, len(names)), 0.5))
+
+    streams = max(1, min(streams, n))
+    seeds = np.random.SeedSequence(seed).spawn(streams)
+    counts = [n // streams + (i < n % streams) for i in range(streams)]
+    workers = workers or os.cpu_count() or 1
+    args = ([model] * streams, [spec] * streams, seeds, counts) + tuple([value] * streams for value in extra)
+    if workers == 1:
+        parts = list(map(worker, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(impact.get_data_file(),)) as pool:
+            parts = instrument.pool_map(pool, worker, *args)
+
+    stats = parts[0]
+    for part in parts[1:]:
+        for name in stats:
+            stats[name].merge(part[name])
+    return names, stats
+
+
+def _model_spec(model, models, outputs):
+    models = load_models() if models is None else models
+    if model not in models:
+        raise ValueError(f"Unknown sensitivity model: {model}")
+    spec = dict(models[model])
+    if outputs is not None:
+        spec["outputs"] = list(outputs)
+    return spec
+
+
+@instrument.span("sensitivity.run_sobol")
+def run_sobol(model, n_samples, outputs=None, models=None, seed=0, workers=None, streams=DEFAULT_STREAMS,
+              batch_size=DEFAULT_BATCH_SIZE):
+    """
+    First-order and total Sobol indices of a model from
+    data/sensitivity.yaml ("node", "drift" or "impact").
+
+    n_samples base points (A and B rows) are drawn from scrambled Sobol
+    sequences. Each point costs n_factors + 2 model evaluations. Streams
+    run on a process pool (workers=None uses all cores, workers=1 runs
+    in-process) and are merged in stream order, so a seed gives the same
+    indices for any worker count. Memory is bounded by batch_size, not
+    n_samples. Returns (factor_names, {output: SobolAccumulator}).
+    """
+    spec = _model_spec(model, models, outputs)
+    return _run_streams(_sobol_stream, model, spec, n_samples, seed, workers, streams, (batch_size,))
+
+
+@instrument.span("sensitivity.run_morris")
+def run_morris(model, n_trajectories, levels=DEFAULT_MORRIS_LEVELS, outputs=None, models=None, seed=0,
+               workers=None, streams=DEFAULT_STREAMS, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Morris elementary effects (mu, mu_star, sigma per factor) from
+    n_trajectories one-at-a-time trajectories on a `levels` grid. Each
+    trajectory costs n_factors + 1 model evaluations. Streams, workers and
+    memory behave as in run_sobol. Returns (factor_names,
+    {output: MorrisAccumulator}).
+    """
+    if levels < 2:
+        raise ValueError("Morris needs at least two levels")
+    spec = _model_spec(model, models, outputs)
+    return _run_streams(_morris_stream, model, spec, n_trajectories, seed, workers, streams,
+                        (batch_size, levels))
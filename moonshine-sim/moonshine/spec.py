@@ -0,0 +1,307 @@
+import keyword
+import os
+import pickle
+
+from moonshine.data import DATA_DIR, atomic_write_bytes, cache_dir, file_digest, load_yaml
+
+DEFAULT_SPEC_PATH = DATA_DIR / "moonshine_v1.yaml"
+
+SPEC_VERSION = 1
+_COMPILED_VERSION = 1
+REQUIRED_SECTIONS = ("tracks", "drivetrain", "thermal")
+REQUIRED_TRACK_FIELDS = ("name", "max_height_mm")
+
+# Key suffix -> (SI suffix, scale to SI)
+UNIT_SUFFIXES = {
+    "mm": ("m", 1e-3),
+    "cm": ("m", 1e-2),
+    "m": ("m", 1.0),
+    "m2": ("m2", 1.0),
+    "g": ("kg", 1e-3),
+    "kg": ("kg", 1.0),
+    "ml": ("m3", 1e-6),
+    "l": ("m3", 1e-3),
+    "bar": ("pa", 1e5),
+    "kpa": ("pa", 1e3),
+    "pa": ("pa", 1.0),
+    "w": ("w", 1.0),
+    "kw": ("w", 1e3),
+    "kj_kg": ("j_kg", 1e3),
+    "c": ("c", 1.0),
+}
+
+_classes = {}
+_memory = {}
+
+
+class ParamSet:
+    """
+    Immutable parameter group compiled from the spec.
+
+    Each distinct field layout gets its own class with matching __slots__,
+    so attribute access is a slot lookup and instances carry no __dict__.
+    Values are already in SI units. Instances pickle through __reduce__
+    because the generated classes are not importable by name.
+    """
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values.pop(name))
+        if values:
+            raise TypeError(f"Unexpected fields: {sorted(values)}")
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return _rebuild, (type(self).__name__, self.__slots__, tuple(getattr(self, n) for n in self.__slots__))
+
+    def __eq__(self, other):
+        return (isinstance(other, ParamSet) and self.__slots__ == other.__slots__
+                and all(getattr(self, n) == getattr(other, n) for n in self.__slots__))
+
+    def __hash__(self):
+        return hash((self.__slots__, tuple(getattr(self, n) for n in self.__slots__)))
+
+    def __repr__(self):
+        fields = ", ".join(f"{n}={getattr(self, n)!r}" for n in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def fields(self):
+        return self.__slots__
+
+    def to_dict(self):
+        return {n: (v.to_dict() if isinstance(v, ParamSet) else v)
+                for n, v in ((n, getattr(self, n)) for n in self.__slots__)}
+
+
+def param_class(name, fields):
+    """
+    The ParamSet subclass for a given name and field layout (cached).
+    """
+    fields = tuple(fields)
+    cls = _classes.get((name, fields))
+    if cls is None:
+        cls = type(name, (ParamSet,), {"__slots__": fields})
+        _classes[(name, fields)] = cls
+    return cls
+
+
+def _rebuild(name, fields, values):
+    cls = param_class(name, fields)
+    obj = cls.__new__(cls)
+    for field, value in zip(fields, values):
+        object.__setattr__(obj, field, value)
+    return obj
+
+
+class HardwareSpec:
+    """
+    A compiled moonshine_v1 spec: one ParamSet per section, plus the
+    design variants as HardwareSpecs of their own. Sections a variant does
+    not override are shared with the base spec.
+    """
+    __slots__ = ("name", "version", "tracks", "drivetrain", "thermal", "variants", "sha256")
+
+    def __init__(self, name, version, tracks, drivetrain, thermal, variants=(), sha256=None):
+        for field, value in zip(self.__slots__, (name, version, tracks, drivetrain, thermal, tuple(variants), sha256)):
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("HardwareSpec is immutable")
+
+    def __reduce__(self):
+        return HardwareSpec, tuple(getattr(self, n) for n in self.__slots__)
+
+    def __repr__(self):
+        return f"HardwareSpec({self.name!r}, {len(self.variants)} variants)"
+
+    def variant(self, name):
+        for variant in self.variants:
+            if variant.name == name:
+                return variant
+        raise ValueError(f"Unknown spec variant: {name}")
+
+    def variant_names(self):
+        return [variant.name for variant in self.variants]
+
+    def track(self, code):
+        if code not in self.tracks.fields():
+            raise ValueError(f"Unknown hardware track: {code}")
+        return getattr(self.tracks, code)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _split_unit(key):
+    # Longest matching suffix wins (kj_kg before kg, kpa before pa)
+    for suffix in sorted(UNIT_SUFFIXES, key=len, reverse=True):
+        if key.endswith("_" + suffix) and len(key) > len(suffix) + 1:
+            return key[:-len(suffix) - 1], suffix
+    return key, None
+
+
+def _convert(where, key, value):
+    stem, suffix = _split_unit(key)
+    if suffix is None:
+        if isinstance(value, list):
+            return key, tuple(value)
+        return key, value
+    si_suffix, scale = UNIT_SUFFIXES[suffix]
+    values = value if isinstance(value, list) else [value]
+    if not values or not all(_is_number(v) for v in values):
+        raise ValueError(f"{where}.{key} must be a number or a list of numbers")
+    if suffix != "c" and any(v < 0 for v in values):
+        raise ValueError(f"{where}.{key} must not be negative")
+    converted = tuple(float(v) * scale for v in values)
+    return f"{stem}_{si_suffix}", converted if isinstance(value, list) else converted[0]
+
+
+def _compile_section(where, class_name, section):
+    if not isinstance(section, dict):
+        raise ValueError(f"{where} must be a mapping")
+    values = {}
+    for key, value in section.items():
+        if not isinstance(key, str) or not key.isidentifier() or keyword.iskeyword(key):
+            raise ValueError(f"{where}: invalid field name {key!r}")
+        if isinstance(value, dict):
+            name, value = key, _compile_section(f"{where}.{key}", "Params", value)
+        else:
+            name, value = _convert(where, key, value)
+        if name in values:
+            raise ValueError(f"{where}: {key} clashes with another field after unit conversion")
+        values[name] = value
+    return param_class(class_name, values)(**values)
+
+
+def validate_spec(raw):
+    """
+    Structural checks on a parsed spec. Raises ValueError naming the
+    offending field. Unit-bearing values are checked during compilation.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("Spec must be a mapping")
+    if raw.get("version") != SPEC_VERSION:
+        raise ValueError(f"Unsupported spec version: {raw.get('version')!r} (expected {SPEC_VERSION})")
+    for section in REQUIRED_SECTIONS:
+        if not isinstance(raw.get(section), dict):
+            raise ValueError(f"Spec is missing the {section} section")
+    for code, track in raw["tracks"].items():
+        if not isinstance(track, dict):
+            raise ValueError(f"tracks.{code} must be a mapping")
+        for field in REQUIRED_TRACK_FIELDS:
+            if field not in track:
+                raise ValueError(f"tracks.{code} is missing {field}")
+
+    names = set()
+    for i, variant in enumerate(raw.get("variants") or []):
+        if not isinstance(variant, dict) or not variant.get("name"):
+            raise ValueError(f"variants[{i}] needs a name")
+        if variant["name"] in names:
+            raise ValueError(f"Duplicate spec variant: {variant['name']}")
+        names.add(variant["name"])
+        for path, value in variant.items():
+            if path == "name":
+                continue
+            parts = path.split(".")
+            if parts[0] not in REQUIRED_SECTIONS or len(parts) < 2:
+                raise ValueError(f"variants.{variant['name']}: cannot override {path}")
+            target = raw
+            for part in parts[:-1]:
+                target = target.get(part) if isinstance(target, dict) else None
+            if not isinstance(target, dict) or parts[-1] not in target:
+                raise ValueError(f"variants.{variant['name']}: {path} is not in the base spec")
+            if _is_number(target[parts[-1]]) and not _is_number(value):
+                raise ValueError(f"variants.{variant['name']}: {path} must be a number")
+
+
+def _override(section, parts, value):
+    if len(parts) == 1:
+        return dict(section, **{parts[0]: value})
+    return dict(section, **{parts[0]: _override(section[parts[0]], parts[1:], value)})
+
+
+def compile_spec(raw, name="base", sha256=None) -> HardwareSpec:
+    """
+    Validate a parsed spec and compile it (and its variants) into
+    immutable, SI-converted parameter objects.
+    """
+    validate_spec(raw)
+    sections = {s: _compile_section(s, s.capitalize() + "Params", raw[s]) for s in REQUIRED_SECTIONS}
+    tracks = {code: _compile_section(f"tracks.{code}", "TrackParams", track) for code, track in raw["tracks"].items()}
+    sections["tracks"] = param_class("Tracks", tracks)(**tracks)
+
+    variants = []
+    for variant in raw.get("variants") or []:
+        overrides = {}
+        for path, value in variant.items():
+            if path != "name":
+                parts = path.split(".")
+                overrides.setdefault(parts[0], []).append((parts[1:], value))
+        compiled = dict(sections)
+        for section, changes in overrides.items():
+            edited = raw[section]
+            for parts, value in changes:
+                edited = _override(edited, parts, value)
+            if section == "tracks":
+                tracks = {code: _compile_section(f"tracks.{code}", "TrackParams", track)
+                          for code, track in edited.items()}
+                compiled["tracks"] = param_class("Tracks", tracks)(**tracks)
+            else:
+                compiled[section] = _compile_section(section, section.capitalize() + "Params", edited)
+        variants.append(HardwareSpec(variant["name"], raw["version"], compiled["tracks"],
+                                     compiled["drivetrain"], compiled["thermal"], sha256=sha256))
+
+    return HardwareSpec(name, raw["version"], sections["tracks"], sections["drivetrain"], sections["thermal"],
+                        variants, sha256)
+
+
+def _compiled_cache_path(digest):
+    return cache_dir() / "spec" / f"{digest}.pickle"
+
+
+def load_spec(path=None, use_disk_cache=True) -> HardwareSpec:
+    """
+    Load and compile a hardware spec (default data/moonshine_v1.yaml).
+
+    Compiled specs are cached per content hash, in memory and pickled to
+    cache_dir()/spec, so an unchanged spec (however many variants it has)
+    loads without parsing or validating the YAML again.
+    """
+    path = os.path.abspath(path or DEFAULT_SPEC_PATH)
+    digest = file_digest(path)
+    spec = _memory.get(digest)
+    if spec is not None:
+        return spec
+
+    cache_path = _compiled_cache_path(digest)
+    if use_disk_cache:
+        try:
+            with open(cache_path, "rb") as f:
+                version, spec = pickle.load(f)
+            if version != _COMPILED_VERSION:
+                spec = None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError, TypeError):
+            spec = None
+
+    if spec is None:
+        spec = compile_spec(load_yaml(path, use_disk_cache=use_disk_cache), sha256=digest)
+        if use_disk_cache:
+            try:
+                atomic_write_bytes(cache_path, pickle.dumps((_COMPILED_VERSION, spec), protocol=pickle.HIGHEST_PROTOCOL))
+            except OSError:
+                # A read-only cache directory should not break the simulation
+                pass
+
+    _memory[digest] = spec
+    return spec
+
+
+def clear_memory_cache():
+    _memory.clear()
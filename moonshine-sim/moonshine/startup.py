@@ -0,0 +1,83 @@
+import numpy as np
+from moonshine.thermo import boiling_point, mix_properties
+
+# Specific Heat Capacities (J/g*K)
+CP_WATER = 4.18
+CP_ETHANOL = 2.44
+CP_COPPER = 0.385
+
+# Placeholder copper mass for the cold plate/condenser (g)
+DEFAULT_COPPER_MASS_G = 500
+# Chip temp is slightly higher than fluid temp (assumed 5 degree gradient)
+CHIP_GRADIENT_C = 5.0
+# Cold start window considered before giving up (s)
+MAX_STARTUP_S = 3600
+
+
+def system_heat_capacity(fluid_volume_ml, mix_ratio=0.60, copper_mass_g=DEFAULT_COPPER_MASS_G):
+    """
+    Heat capacity (J/K) of the fluid charge plus the copper cold plate/condenser.
+    """
+    mix_ratio = np.asarray(mix_ratio, dtype=float)
+    cp_mix = (mix_ratio * CP_ETHANOL) + ((1 - mix_ratio) * CP_WATER)
+    _, rho_mix = mix_properties(mix_ratio)
+    mass_fluid_g = np.asarray(fluid_volume_ml, dtype=float) * (rho_mix / 1000)  # kg/m3 to g/ml
+    return (mass_fluid_g * cp_mix) + (np.asarray(copper_mass_g, dtype=float) * CP_COPPER)
+
+
+def time_to_temperature(delta_t, tdp_watts, heat_capacity, loss_w_per_k=0.0):
+    """
+    Time (s) for a lumped mass to warm by delta_t under constant power.
+
+    Without losses the warm-up is linear, dT/dt = P / C. With an ambient
+    loss conductance G it follows T = (P/G) * (1 - exp(-G t / C)), which is
+    inverted directly. Targets the system can never reach return np.inf.
+    """
+    delta_t, tdp_watts, heat_capacity, loss_w_per_k = np.broadcast_arrays(
+        np.asarray(delta_t, dtype=float),
+        np.asarray(tdp_watts, dtype=float),
+        np.asarray(heat_capacity, dtype=float),
+        np.asarray(loss_w_per_k, dtype=float),
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lossless = heat_capacity * delta_t / tdp_watts
+        fraction = loss_w_per_k * delta_t / tdp_watts
+        lossy = -(heat_capacity / loss_w_per_k) * np.log1p(-fraction)
+    t = np.where(loss_w_per_k > 0, np.where(fraction < 1, lossy, np.inf), lossless)
+    t = np.where(tdp_watts > 0, t, np.inf)
+    return np.where(delta_t <= 0, 0.0, t)
+
+
+def solve_startup(tdp_watts=350, fluid_volume_ml=500, ambient_temp=20, max_chip_temp=95,
+                  mix_ratio=0.60, copper_mass_g=DEFAULT_COPPER_MASS_G, loss_w_per_k=0.0,
+                  horizon_s=MAX_STARTUP_S):
+    """
+    Event times for the 'Cold Start' phase, solved analytically.
+
+    Every argument may be an array; they are broadcast into one grid
+    (e.g. TDP x fluid volume x ambient x copper mass). Events later than
+    horizon_s are reported as np.inf. Returns a dict of arrays:
+    boil_time_s, meltdown_time_s and vapor_buffer_s (meltdown - boil).
+    """
+    heat_capacity = system_heat_capacity(fluid_volume_ml, mix_ratio, copper_mass_g)
+    bp = boiling_point(mix_ratio)
+    ambient_temp = np.asarray(ambient_temp, dtype=float)
+
+    boil_time = time_to_temperature(bp - ambient_temp, tdp_watts, heat_capacity, loss_w_per_k)
+    meltdown_time = time_to_temperature(np.asarray(max_chip_temp, dtype=float) - CHIP_GRADIENT_C - ambient_temp,
+                                        tdp_watts, heat_capacity, loss_w_per_k)
+    boil_time = np.where(boil_time <= horizon_s, boil_time, np.inf)
+    meltdown_time = np.where(meltdown_time <= horizon_s, meltdown_time, np.inf)
+
+    with np.errstate(invalid="ignore"):
+        margin = meltdown_time - boil_time
+
+    boil_time, meltdown_time, margin, bp, heat_capacity = np.broadcast_arrays(
+        boil_time, meltdown_time, margin, bp, heat_capacity)
+    return {
+        "boil_time_s": boil_time,
+        "meltdown_time_s": meltdown_time,
+        "vapor_buffer_s": margin,
+        "boiling_point_c": bp,
+        "heat_capacity_j_k": heat_capacity,
+    }
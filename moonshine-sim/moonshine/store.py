@@ -0,0 +1,317 @@
+import json
+import numbers
+import operator
+from pathlib import Path
+
+import numpy as np
+
+from moonshine.data import atomic_write_bytes
+from moonshine.instrument import count, span
+
+MANIFEST = "manifest.json"
+_FORMAT_VERSION = 1
+DEFAULT_CHUNK_ROWS = 1 << 16
+
+# Row filters for query(where=...): (column, op, value) triples
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "in": lambda values, options: np.isin(values, list(options)),
+}
+AGGREGATES = ("count", "sum", "mean", "min", "max")
+
+
+def _chunk_may_match(stats, column, op, value):
+    # Whether any row of a chunk with the given [min, max] of column can
+    # satisfy the predicate. NaN never compares true, so an all-NaN chunk
+    # (no range) only matches "!=", which never prunes.
+    if op == "!=":
+        return True
+    if column not in stats:
+        return False
+    lo, hi = stats[column]
+    if op == "<":
+        return lo < value
+    if op == "<=":
+        return lo <= value
+    if op == ">":
+        return hi > value
+    if op == ">=":
+        return hi >= value
+    if op == "==":
+        return lo <= value <= hi
+    return any(lo <= option <= hi for option in value)
+
+
+def _range(values):
+    # [min, max] of a chunk column as JSON scalars, or None if all NaN
+    if values.dtype.kind == "U":
+        ordered = np.sort(values)
+        return [str(ordered[0]), str(ordered[-1])]
+    if values.dtype.kind == "f":
+        finite = values[~np.isnan(values)]
+        if not len(finite):
+            return None
+        return [float(finite.min()), float(finite.max())]
+    return [values.min().item(), values.max().item()]
+
+
+def _check_where(where):
+    if not where:
+        return []
+    if isinstance(where[0], str):
+        where = [where]
+    checked = []
+    for column, op, value in where:
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator {op!r}; expected one of {sorted(OPERATORS)}")
+        checked.append((column, op, value))
+    return checked
+
+
+class ResultStore:
+    """
+    Append-only columnar result table on local disk. Each append is split
+    into chunks of at most chunk_rows rows; every column of a chunk is one
+    .npy file (<directory>/<column>/<chunk>.npy) written and read through
+    memory maps. manifest.json holds the schema, free-form attrs and, per
+    chunk, the row count and [min, max] of every column, so queries open
+    only the chunks and columns they need.
+
+    The manifest is replaced atomically after a chunk's files are written,
+    so readers never see a partial chunk.
+    """
+    def __init__(self, directory, attrs=None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / MANIFEST
+        if path.exists():
+            manifest = json.loads(path.read_text())
+            if manifest.get("version") != _FORMAT_VERSION:
+                raise ValueError(f"Unsupported result store version: {manifest.get('version')!r}")
+        else:
+            manifest = {"version": _FORMAT_VERSION, "schema": {}, "attrs": {}, "chunks": []}
+        self.schema = manifest["schema"]
+        self.attrs = manifest["attrs"]
+        self.chunks = manifest["chunks"]
+        if attrs:
+            self.update_attrs(**attrs)
+
+    def __len__(self):
+        return sum(chunk["rows"] for chunk in self.chunks)
+
+    @property
+    def columns(self):
+        return list(self.schema)
+
+    def _write_manifest(self):
+        manifest = {"version": _FORMAT_VERSION, "schema": self.schema, "attrs": self.attrs, "chunks": self.chunks}
+        atomic_write_bytes(self.directory / MANIFEST, json.dumps(manifest, indent=1).encode())
+
+    def update_attrs(self, **attrs):
+        """
+        Store JSON-serialisable metadata with the table, e.g. the option
+        keys that an option_index column refers to.
+        """
+        self.attrs.update(attrs)
+        self._write_manifest()
+
+    def _prepare(self, columns):
+        if not columns:
+            raise ValueError("No columns to append")
+        if self.schema and set(columns) != set(self.schema):
+            raise ValueError(f"Columns {sorted(columns)} do not match the store schema {sorted(self.schema)}")
+        arrays = {}
+        for name, values in columns.items():
+            if not name or name.startswith(".") or "/" in name or "\\" in name:
+                raise ValueError(f"Invalid column name: {name!r}")
+            values = np.asarray(values)
+            if values.ndim != 1:
+                raise ValueError(f"Column {name!r} must be 1-D, got shape {values.shape}")
+            if values.dtype.kind not in "biufU":
+                raise ValueError(f"Column {name!r} has unsupported dtype {values.dtype}")
+            if name in self.schema:
+                stored = np.dtype(self.schema[name])
+                if stored.kind == "U" or values.dtype.kind == "U":
+                    if stored.kind != values.dtype.kind:
+                        raise ValueError(f"Column {name!r} is {stored}, got {values.dtype}")
+                elif not np.can_cast(values.dtype, stored, casting="same_kind"):
+                    raise ValueError(f"Column {name!r} is {stored}, got {values.dtype}")
+                else:
+                    values = values.astype(stored, copy=False)
+            arrays[name] = values
+        lengths = {len(values) for values in arrays.values()}
+        if len(lengths) != 1:
+            raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+        return arrays, lengths.pop()
+
+    @span("store.ResultStore.append")
+    def append(self, columns, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Append rows given as {column: 1-D array}. The first append fixes the
+        column names and dtypes; later appends must supply the same columns
+        and are cast to the stored dtypes (string columns may change width).
+        """
+        arrays, n_rows = self._prepare(columns)
+        if not self.schema:
+            self.schema = {name: ("<U" if values.dtype.kind == "U" else values.dtype.str)
+                           for name, values in arrays.items()}
+        for start in range(0, n_rows, chunk_rows):
+            rows = slice(start, min(start + chunk_rows, n_rows))
+            chunk_id = len(self.chunks)
+            stats = {}
+            for name, values in arrays.items():
+                part = values[rows]
+                path = self.directory / name / f"{chunk_id:06d}.npy"
+                path.parent.mkdir(exist_ok=True)
+                column = np.lib.format.open_memmap(path, mode="w+", dtype=part.dtype, shape=part.shape)
+                column[:] = part
+                column.flush()
+                del column
+                value_range = _range(part)
+                if value_range is not None:
+                    stats[name] = value_range
+            self.chunks.append({"id": chunk_id, "rows": rows.stop - rows.start, "range": stats})
+            self._write_manifest()
+            count("store.chunks_written")
+            count("store.rows_written", rows.stop - rows.start)
+        return n_rows
+
+    def append_records(self, records, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Append a list of flat dicts with the same keys, such as the results
+        of Distiller.analyze_node or ImpactAnalyzer.analyze_source.
+        """
+        records = list(records)
+        if not records:
+            return 0
+        keys = list(records[0])
+        for record in records:
+            if list(record) != keys:
+                raise ValueError(f"Record keys {sorted(record)} differ from {sorted(keys)}")
+        return self.append({key: [record[key] for record in records] for key in keys}, chunk_rows)
+
+    def load_column(self, name, chunk):
+        """
+        Memory-mapped, read-only view of one column of one chunk.
+        """
+        if name not in self.schema:
+            raise ValueError(f"Unknown column: {name!r}")
+        return np.load(self.directory / name / f"{chunk['id']:06d}.npy", mmap_mode="r")
+
+    def chunks_matching(self, where=None):
+        """
+        Chunks whose min/max index does not rule out the filter.
+        """
+        where = _check_where(where)
+        for column, _, _ in where:
+            if column not in self.schema:
+                raise ValueError(f"Unknown column: {column!r}")
+        return [chunk for chunk in self.chunks
+                if all(_chunk_may_match(chunk["range"], column, op, value) for column, op, value in where)]
+
+    def iter_query(self, where=None, columns=None):
+        """
+        Yields {column: array} with the matching rows of each chunk that has
+        any. where is a (column, op, value) triple or a list of them, all of
+        which must hold; op is one of OPERATORS. Only the filter columns of
+        candidate chunks are read before the row mask is known.
+        """
+        where = _check_where(where)
+        columns = self.columns if columns is None else list(columns)
+        for name in columns:
+            if name not in self.schema:
+                raise ValueError(f"Unknown column: {name!r}")
+        candidates = self.chunks_matching(where)
+        count("store.chunks_skipped", len(self.chunks) - len(candidates))
+        for chunk in candidates:
+            count("store.chunks_scanned")
+            mask = np.ones(chunk["rows"], dtype=bool)
+            for column, op, value in where:
+                mask &= OPERATORS[op](self.load_column(column, chunk), value)
+            if not mask.any():
+                continue
+            yield {name: np.asarray(self.load_column(name, chunk)[mask]) for name in columns}
+
+    @span("store.ResultStore.query")
+    def query(self, where=None, columns=None):
+        """
+        Matching rows as a columnar dict of in-memory arrays; see iter_query.
+        """
+        columns = self.columns if columns is None else list(columns)
+        parts = list(self.iter_query(where, columns))
+        if not parts:
+            return {name: np.empty(0, dtype=np.dtype(self.schema[name])) for name in columns}
+        return {name: np.concatenate([part[name] for part in parts]) for name in columns}
+
+    @span("store.ResultStore.aggregate")
+    def aggregate(self, column, where=None, by=None):
+        """
+        count, sum, mean, min and max of a numeric column over the matching
+        rows, streamed chunk by chunk. NaN values are left out. With by=<column>
+        each statistic is an array over the sorted distinct values of that
+        column, returned under "keys".
+        """
+        if column not in self.schema or np.dtype(self.schema[column]).kind == "U":
+            raise ValueError(f"Cannot aggregate column: {column!r}")
+        groups = {}
+        columns = [column] if by is None else [column, by]
+        for part in self.iter_query(where, columns):
+            values = part[column].astype(float)
+            keep = ~np.isnan(values)
+            keys = np.zeros(len(values), dtype=int) if by is None else part[by]
+            distinct, inverse = np.unique(keys[keep], return_inverse=True)
+            values = values[keep]
+            counts = np.bincount(inverse, minlength=len(distinct))
+            sums = np.bincount(inverse, weights=values, minlength=len(distinct))
+            lows = np.full(len(distinct), np.inf)
+            highs = np.full(len(distinct), -np.inf)
+            np.minimum.at(lows, inverse, values)
+            np.maximum.at(highs, inverse, values)
+            for i, key in enumerate(distinct.tolist()):
+                n, total, low, high = groups.get(key, (0, 0.0, np.inf, -np.inf))
+                groups[key] = (n + int(counts[i]), total + float(sums[i]), min(low, lows[i]), max(high, highs[i]))
+
+        keys = sorted(groups)
+        stats = np.array([groups[key] for key in keys], dtype=float).reshape(-1, 4)
+        n, total = stats[:, 0], stats[:, 1]
+        result = {
+            "count": n.astype(np.int64),
+            "sum": total,
+            "mean": total / np.where(n > 0, n, np.nan),
+            "min": stats[:, 2],
+            "max": stats[:, 3],
+        }
+        if by is not None:
+            result["keys"] = np.array(keys)
+            return result
+        if not keys:
+            return {"count": 0, "sum": 0.0, "mean": np.nan, "min": np.nan, "max": np.nan}
+        return {name: values[0].item() for name, values in result.items()}
+
+
+def design_records(options, **point):
+    """
+    Flattens a run_evaluation / DesignEvaluator.evaluate result into one
+    record per option: the option key, the design point, <test>_passed for
+    every test of any option (False where an option lacks it) and the
+    scalar result_data values (NaN where missing).
+    """
+    tests = list(dict.fromkeys(test for opt in options.values() for test in opt.tests))
+    fields = list(dict.fromkeys(
+        name for opt in options.values() for metrics in opt.tests.values()
+        for name, value in metrics.result_data.items() if isinstance(value, numbers.Number)))
+    records = []
+    for key, opt in options.items():
+        record = {"option": key, **point}
+        for test in tests:
+            record[f"{test.lower()}_passed"] = bool(test in opt.tests and opt.tests[test].passed)
+        values = {name: value for metrics in opt.tests.values() for name, value in metrics.result_data.items()}
+        for name in fields:
+            record[name] = float(values.get(name, np.nan))
+        records.append(record)
+    return records
@@ -0,0 +1,101 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from moonshine import impact, instrument
+from moonshine.store import ResultStore
+from moonshine.evaluator import ARCHITECTURES, evaluate_designs
+
+# Order of the grid axes; the last axis varies fastest
+GRID_AXES = ("tdp_watts", "fill_volume_l", "feedstock", "dist_km")
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def _grid_shape(axes):
+    return tuple(len(axes[name]) for name in GRID_AXES)
+
+
+@instrument.span("sweep.chunk")
+def _evaluate_chunk(axes, start, stop):
+    # Work unit: design points [start, stop) of the flattened grid. Pure
+    # function of its arguments, so chunk results do not depend on which
+    # worker ran them or in what order.
+    idx = np.unravel_index(np.arange(start, stop), _grid_shape(axes))
+    point = {name: np.asarray(axes[name])[i] for name, i in zip(GRID_AXES, idx)}
+    results = evaluate_designs(point["tdp_watts"], point["fill_volume_l"], point["feedstock"], point["dist_km"])
+
+    n_points, n_options = results["surplus_w"].shape
+    columns = {
+        "point_index": np.repeat(np.arange(start, stop), n_options),
+        "option_index": np.tile(np.arange(n_options), n_points),
+        "tdp_watts": np.repeat(point["tdp_watts"], n_options),
+        "fill_volume_l": np.repeat(point["fill_volume_l"], n_options),
+        "feedstock_index": np.repeat(results["impact"]["feedstock_index"], n_options),
+        "dist_km": np.repeat(point["dist_km"], n_options),
+    }
+    for name in ("recovered_power_w", "surplus_w", "net_energy_passed", "thermal_stability_passed",
+                 "total_carbon_kg", "environmental_passed", "gravity_head_passed", "pressure_bar"):
+        columns[name] = np.ascontiguousarray(results[name]).ravel()
+    return columns
+
+
+def _init_worker(data_path):
+    # Workers must see the same feedstock data as the parent process
+    impact.use_data_file(data_path)
+
+
+@instrument.span("sweep.run_sweep")
+def run_sweep(tdp_watts, fill_volume_l, feedstock, dist_km, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+              store=None):
+    """
+    Evaluates every DesignOption over the full grid
+    tdp_watts x fill_volume_l x feedstock x dist_km.
+
+    The grid is split into chunks of chunk_size design points and fanned
+    out over a process pool (workers=None uses all cores, workers=1 runs
+    in-process). Returns a columnar dict with one row per (design point,
+    option), ordered by point then option, so output is identical for any
+    worker count. option_index refers to "option_keys" and feedstock_index
+    to impact.get_feedstock_table().
+
+    With store (a ResultStore or a directory) chunk results are appended
+    to the store as they arrive instead of being kept in memory, and the
+    store is returned, with option_keys and feedstock_codes in its attrs.
+    """
+    axes = {
+        "tdp_watts": np.asarray(tdp_watts, dtype=float).ravel(),
+        "fill_volume_l": np.asarray(fill_volume_l, dtype=float).ravel(),
+        "feedstock": np.asarray(feedstock).ravel(),
+        "dist_km": np.asarray(dist_km, dtype=float).ravel(),
+    }
+    # Fail fast on bad codes before any work is shipped to workers
+    impact.get_feedstock_table().lookup(axes["feedstock"])
+
+    n_points = int(np.prod(_grid_shape(axes)))
+    bounds = [(start, min(start + chunk_size, n_points)) for start in range(0, n_points, chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    if store is not None and not isinstance(store, ResultStore):
+        store = ResultStore(store)
+
+    if workers == 1 or len(bounds) <= 1:
+        parts = (_evaluate_chunk(axes, start, stop) for start, stop in bounds)
+        return _collect(parts, store)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(impact.get_data_file(),)) as pool:
+        return _collect(instrument.pool_imap(pool, _evaluate_chunk, [axes] * len(bounds), *zip(*bounds)), store)
+
+
+def _collect(parts, store):
+    # Chunk results arrive in grid order
+    if store is not None:
+        for part in parts:
+            store.append(part)
+        store.update_attrs(option_keys=list(ARCHITECTURES), feedstock_codes=list(impact.get_feedstock_table().codes))
+        return store
+    parts = list(parts)
+    table = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]} if parts else {}
+    table["option_keys"] = list(ARCHITECTURES)
+    return table
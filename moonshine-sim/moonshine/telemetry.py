@@ -0,0 +1,323 @@
+import asyncio
+import os
+import warnings
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+from moonshine import properties
+from moonshine.thermo import ETHANOL_LOSS_FACTOR, FLUSH_THRESHOLD_C, flush_mix_threshold
+
+DAY_S = 86400.0
+# Readings are applied at least this often (bounds ingest-to-estimate latency)
+DEFAULT_MAX_LATENCY_S = 0.05
+# ...or as soon as this many readings are waiting
+DEFAULT_MAX_BATCH = 65536
+# Smallest mix ratio accepted before taking logs
+_MIN_MIX = 1e-6
+
+FIELDS = ("mix", "temp_c")
+
+
+def _parse_fast(lines):
+    # Whole-batch parse with one np.fromstring call. Returns None unless
+    # every line is well formed, so callers can fall back to _parse_slow.
+    blob = b"\n".join(lines)
+    if not lines or blob.count(b",") != 3 * len(lines):
+        return None
+    blob = blob.replace(b",mix,", b",0,").replace(b",temp_c,", b",1,").replace(b"\n", b",")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        try:
+            values = np.fromstring(blob, sep=",")
+        except (ValueError, DeprecationWarning):
+            return None
+    if len(values) != 4 * len(lines):
+        return None
+    values = values.reshape(-1, 4)
+    node, code = values[:, 0], values[:, 2]
+    if not (np.all((code == 0) | (code == 1)) and np.all(node == np.floor(node))):
+        return None
+    return node.astype(np.int64), values[:, 1].copy(), values[:, 3].copy(), code == 1
+
+
+def _parse_slow(lines):
+    node, t_s, value, is_temp = [], [], [], []
+    for line in lines:
+        parts = line.split(b",")
+        if len(parts) != 4:
+            continue
+        try:
+            n, t, v = int(parts[0]), float(parts[1]), float(parts[3])
+        except ValueError:
+            continue
+        field = parts[2].strip()
+        if field == b"mix":
+            is_temp.append(False)
+        elif field == b"temp_c":
+            is_temp.append(True)
+        else:
+            continue
+        node.append(n)
+        t_s.append(t)
+        value.append(v)
+    return (np.array(node, dtype=np.int64), np.array(t_s, dtype=float),
+            np.array(value, dtype=float), np.array(is_temp, dtype=bool))
+
+
+def parse_lines(lines: Iterable[bytes]):
+    """
+    Parse telemetry lines of the form `node_id,timestamp_s,field,value`,
+    where field is "mix" (ethanol volume fraction) or "temp_c" (measured
+    boiling point). Temperatures are converted to a mix ratio through the
+    water-rich branch of the VLE tables. Blank and malformed lines are
+    skipped. Returns (node, t_s, mix) arrays.
+    """
+    lines = [line for line in lines if line.strip()]
+    parsed = _parse_fast(lines)
+    node, t_s, value, is_temp = parsed if parsed is not None else _parse_slow(lines)
+    if is_temp.any():
+        value[is_temp] = properties.mix_ratio_at_boiling_point(value[is_temp])
+    return node, t_s, value
+
+
+class DriftEstimator:
+    """
+    Online per-node estimate of mix ratio and leak rate from telemetry.
+
+    The drift model of thermo.drift_mix is linear in log space,
+    ln(mix) = ln(mix_0) + t * ln(decay), so each node keeps the five
+    weighted least-squares sums of (t, ln mix) in flat arrays: O(1) state
+    per node, and a batch of readings is folded in with np.bincount no
+    matter how many nodes it touches. With half_life_days set, older
+    readings are down-weighted exponentially (by timestamp, so the result
+    does not depend on arrival order) and the fit tracks changing leaks.
+    """
+    def __init__(self, n_nodes, half_life_days=None):
+        self.n_nodes = int(n_nodes)
+        self.half_life_days = half_life_days
+        self.origin_s = np.full(self.n_nodes, np.nan)  # first reading (t = 0 of the fit)
+        self.ref_days = np.zeros(self.n_nodes)  # time the weights are referenced to
+        self.last_s = np.full(self.n_nodes, np.nan)
+        self.count = np.zeros(self.n_nodes, dtype=np.int64)
+        self.w = np.zeros(self.n_nodes)
+        self.st = np.zeros(self.n_nodes)
+        self.sy = np.zeros(self.n_nodes)
+        self.stt = np.zeros(self.n_nodes)
+        self.sty = np.zeros(self.n_nodes)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.origin_s, self.ref_days, self.last_s, self.count,
+                                      self.w, self.st, self.sy, self.stt, self.sty))
+
+    def update(self, node, t_s, mix):
+        """
+        Fold a batch of readings into the estimates. Readings for unknown
+        nodes or with a mix outside (0, 1] are dropped. Returns the unique
+        node ids that were updated.
+        """
+        node = np.asarray(node, dtype=np.int64)
+        t_s = np.asarray(t_s, dtype=float)
+        mix = np.asarray(mix, dtype=float)
+        ok = (node >= 0) & (node < self.n_nodes) & np.isfinite(t_s) & (mix > 0) & (mix <= 1)
+        node, t_s, mix = node[ok], t_s[ok], mix[ok]
+        if not len(node):
+            return node
+
+        new = np.isnan(self.origin_s)
+        first = np.full(self.n_nodes, np.inf)
+        np.minimum.at(first, node, t_s)
+        start = new & np.isfinite(first)
+        self.origin_s[start] = first[start]
+        last = np.full(self.n_nodes, -np.inf)
+        np.maximum.at(last, node, t_s)
+        self.last_s = np.fmax(self.last_s, np.where(np.isfinite(last), last, np.nan))
+
+        t_days = (t_s - self.origin_s[node]) / DAY_S
+        y = np.log(np.maximum(mix, _MIN_MIX))
+        if self.half_life_days is None:
+            weight = np.ones(len(node))
+        else:
+            rate = np.log(2) / self.half_life_days
+            ref = self.ref_days.copy()
+            np.maximum.at(ref, node, t_days)
+            scale = np.exp(-rate * (ref - self.ref_days))
+            for total in (self.w, self.st, self.sy, self.stt, self.sty):
+                total *= scale
+            self.ref_days = ref
+            weight = np.exp(-rate * (ref[node] - t_days))
+
+        n = self.n_nodes
+        self.count += np.bincount(node, minlength=n)
+        self.w += np.bincount(node, weight, minlength=n)
+        self.st += np.bincount(node, weight * t_days, minlength=n)
+        self.sy += np.bincount(node, weight * y, minlength=n)
+        self.stt += np.bincount(node, weight * t_days * t_days, minlength=n)
+        self.sty += np.bincount(node, weight * t_days * y, minlength=n)
+        return np.unique(node)
+
+    def estimates(self, nodes=None, threshold_c=FLUSH_THRESHOLD_C) -> Dict[str, np.ndarray]:
+        """
+        Current fit for every node (or the given node ids), as arrays:
+        samples, mix_ratio (fitted, at the latest reading), leak rate
+        (vol %/day, as used by Distiller.simulate_drift), boiling_point_c,
+        requires_flush, flush_time_s (timestamp at which the boiling point
+        is predicted to pass threshold_c) and days_to_flush (from the latest
+        reading). Nodes without two distinct reading times have NaN fits;
+        nodes that are not drifting towards a flush get np.inf.
+        """
+        idx = np.arange(self.n_nodes) if nodes is None else np.asarray(nodes, dtype=np.int64)
+        w, st, sy, stt, sty = (a[idx] for a in (self.w, self.st, self.sy, self.stt, self.sty))
+        denom = w * stt - st * st
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fitted = denom > 1e-12 * np.maximum(w * stt, 1e-300)
+            slope = np.where(fitted, (w * sty - st * sy) / denom, np.nan)
+            intercept = np.where(fitted, (sy - slope * st) / w, np.nan)
+            t_last = (self.last_s[idx] - self.origin_s[idx]) / DAY_S
+            mix = np.minimum(np.exp(intercept + slope * t_last), 1.0)
+            leak = (1.0 - np.exp(slope)) / ETHANOL_LOSS_FACTOR * 100.0
+
+            x_flush = flush_mix_threshold(threshold_c)
+            # Treat round-off slopes as no drift rather than a flush in 1e15 days
+            t_flush = np.where(slope < -1e-12, (np.log(x_flush) - intercept) / slope, np.inf)
+            t_flush = np.where(fitted, t_flush, np.nan)
+            days_to_flush = np.maximum(t_flush - t_last, 0.0)
+            flush_time_s = self.last_s[idx] + days_to_flush * DAY_S
+        bp = np.full(len(idx), np.nan)
+        bp[fitted] = properties.boiling_point(mix[fitted])
+        return {
+            "samples": self.count[idx],
+            "mix_ratio": mix,
+            "leak_rate_vol_pct_per_day": leak,
+            "boiling_point_c": bp,
+            "requires_flush": fitted & (bp > threshold_c),
+            "flush_time_s": flush_time_s,
+            "days_to_flush": days_to_flush,
+        }
+
+
+class TelemetryIngest:
+    """
+    asyncio front end that feeds many concurrent sensor streams into a
+    DriftEstimator.
+
+    Streams (local socket connections, tailed files) only split their input
+    into lines and queue them. run() applies the queue in vectorized
+    batches whenever max_batch lines are waiting, and at least every
+    max_latency_s, so a reading is reflected in the estimates within that
+    bound. on_batch(updated_node_ids) is called after each batch.
+    """
+    def __init__(self, estimator: DriftEstimator, max_latency_s=DEFAULT_MAX_LATENCY_S,
+                 max_batch=DEFAULT_MAX_BATCH, on_batch: Optional[Callable] = None):
+        self.estimator = estimator
+        self.max_latency_s = max_latency_s
+        self.max_batch = max_batch
+        self.on_batch = on_batch
+        self.readings = 0
+        self.batches = 0
+        self._pending = []
+        self._wakeup = None
+        self._stopping = None
+
+    def _events(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._stopping = asyncio.Event()
+
+    def submit(self, lines):
+        self._pending.extend(lines)
+        if len(self._pending) >= self.max_batch and self._wakeup is not None:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        Apply every queued line now. Returns the updated node ids.
+        """
+        lines, self._pending = self._pending, []
+        if not lines:
+            return np.empty(0, dtype=np.int64)
+        node, t_s, mix = parse_lines(lines)
+        updated = self.estimator.update(node, t_s, mix)
+        self.readings += len(node)
+        self.batches += 1
+        if self.on_batch is not None:
+            self.on_batch(updated)
+        return updated
+
+    async def run(self):
+        """
+        Batch-apply queued readings until stop() is called.
+        """
+        self._events()
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.max_latency_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            self.flush()
+        self.flush()
+
+    def stop(self):
+        self._events()
+        self._stopping.set()
+        self._wakeup.set()
+
+    async def _consume(self, reader: asyncio.StreamReader):
+        carry = b""
+        while True:
+            data = await reader.read(1 << 16)
+            if not data:
+                break
+            lines = (carry + data).split(b"\n")
+            carry = lines.pop()
+            self.submit(lines)
+        if carry:
+            self.submit([carry])
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            await self._consume(reader)
+        finally:
+            writer.close()
+
+    async def serve_unix(self, path):
+        """
+        Accept any number of sensor connections on a Unix domain socket.
+        Returns the asyncio server.
+        """
+        self._events()
+        return await asyncio.start_unix_server(self._handle_connection, path=path)
+
+    async def serve_tcp(self, host="127.0.0.1", port=0):
+        self._events()
+        return await asyncio.start_server(self._handle_connection, host=host, port=port)
+
+    async def tail_file(self, path, poll_interval_s=0.1, from_start=True):
+        """
+        Follow a growing telemetry file (a stand-in for a socket feed) until
+        stop() is called.
+        """
+        self._events()
+        with open(path, "rb") as f:
+            if not from_start:
+                f.seek(0, os.SEEK_END)
+            carry = b""
+            while True:
+                data = f.read(1 << 20)
+                if data:
+                    lines = (carry + data).split(b"\n")
+                    carry = lines.pop()
+                    self.submit(lines)
+                    # Let the batcher and other streams run between reads
+                    await asyncio.sleep(0)
+                    continue
+                if self._stopping.is_set():
+                    break
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), poll_interval_s)
+                except asyncio.TimeoutError:
+                    pass
+            if carry:
+                self.submit([carry])
@@ -0,0 +1,209 @@
+from typing import Dict, List
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.linalg import spsolve
+
+from moonshine.data import DATA_DIR, load_yaml
+
+MATERIALS_PATH = DATA_DIR / "materials.yaml"
+MODELS_PATH = DATA_DIR / "thermal_models.yaml"
+
+LINK_TYPES = ("conduction", "convection", "resistance")
+
+
+def load_conductivities(path=None) -> Dict[str, float]:
+    """
+    Thermal conductivity (W/m*K) per material code from data/materials.yaml.
+    """
+    catalogue = load_yaml(path or MATERIALS_PATH)["thermal_conductivity_w_mk"]
+    return {code: float(entry["k"]) for code, entry in catalogue.items()}
+
+
+class ThermalSolution:
+    """
+    Steady-state result for every variant: temperatures_c is
+    (n_variants, n_nodes) and heat_flow_w is (n_variants, n_links), with
+    positive flow running from a link's `from` node to its `to` node.
+    """
+    def __init__(self, network, temperatures_c, heat_flow_w, conductance_w_k):
+        self.network = network
+        self.temperatures_c = temperatures_c
+        self.heat_flow_w = heat_flow_w
+        self.conductance_w_k = conductance_w_k
+
+    def temperature(self, node):
+        return self.temperatures_c[:, self.network.node_index[node]]
+
+    def flow(self, from_node, to_node):
+        """
+        Net heat flow (W) from from_node to to_node summed over direct links.
+        """
+        total = np.zeros(self.heat_flow_w.shape[0])
+        for i, link in enumerate(self.network.links):
+            if (link["from"], link["to"]) == (from_node, to_node):
+                total += self.heat_flow_w[:, i]
+            elif (link["from"], link["to"]) == (to_node, from_node):
+                total -= self.heat_flow_w[:, i]
+        return total
+
+
+class ThermalNetwork:
+    """
+    Lumped thermal-resistance network declared as data.
+
+    Nodes either float or are held at a boundary temperature_c. Links are
+    conduction (length_m, area_m2, material), convection (h_w_m2k, area_m2)
+    or a plain resistance (r_k_w). Any numeric field, material or boundary
+    temperature may be a "$param" reference resolved at solve time, which is
+    how material/geometry variants are batched into one sparse solve.
+    """
+    def __init__(self, nodes: Dict[str, dict], links: List[dict], conductivities=None):
+        self.nodes = nodes
+        self.node_names = list(nodes)
+        self.node_index = {name: i for i, name in enumerate(self.node_names)}
+        self.links = links
+        self.conductivities = conductivities if conductivities is not None else load_conductivities()
+
+        for link in links:
+            if link["type"] not in LINK_TYPES:
+                raise ValueError(f"Unknown link type: {link['type']}")
+            for end in ("from", "to"):
+                if link[end] not in self.node_index:
+                    raise ValueError(f"Link references unknown node: {link[end]}")
+
+        self.fixed = np.array(["temperature_c" in self.nodes[n] for n in self.node_names])
+        if not self.fixed.any():
+            raise ValueError("Thermal network needs at least one boundary temperature")
+
+    @classmethod
+    def from_yaml(cls, model, path=None, conductivities=None):
+        spec = load_yaml(path or MODELS_PATH)
+        if model not in spec:
+            raise ValueError(f"Unknown thermal model: {model}")
+        return cls(spec[model]["nodes"], spec[model]["links"], conductivities)
+
+    def _resolve(self, value, params):
+        if isinstance(value, str) and value.startswith("$"):
+            name = value[1:]
+            if name not in params:
+                raise ValueError(f"Missing thermal network parameter: {name}")
+            return params[name]
+        return value
+
+    def _conductivity(self, material):
+        material = np.asarray(material)
+        if material.dtype.kind in "US":
+            lookup = np.vectorize(self.conductivities.__getitem__, otypes=[float])
+            try:
+                return lookup(material)
+            except KeyError as exc:
+                raise ValueError(f"Unknown material: {exc.args[0]}") from None
+        return material.astype(float)
+
+    def conductances(self, **params):
+        """
+        (n_variants, n_links) conductance matrix (W/K) for the given params.
+        """
+        columns = []
+        for link in self.links:
+            get = lambda key: self._resolve(link[key], params)
+            if link["type"] == "conduction":
+                g = self._conductivity(get("material")) * np.asarray(get("area_m2"), dtype=float) \
+                    / np.asarray(get("length_m"), dtype=float)
+            elif link["type"] == "convection":
+                g = np.asarray(get("h_w_m2k"), dtype=float) * np.asarray(get("area_m2"), dtype=float)
+            else:
+                g = 1.0 / np.asarray(get("r_k_w"), dtype=float)
+            columns.append(g)
+        return np.column_stack(np.broadcast_arrays(*[np.atleast_1d(c) for c in columns]))
+
+    def boundary_temperatures(self, n_variants, **params):
+        temps = np.zeros((n_variants, len(self.node_names)))
+        for i, name in enumerate(self.node_names):
+            if self.fixed[i]:
+                temps[:, i] = self._resolve(self.nodes[name]["temperature_c"], params)
+        return temps
+
+    def solve(self, **params) -> ThermalSolution:
+        """
+        Solve steady state for every variant at once.
+
+        Parameters broadcast to a common number of variants; the free-node
+        conductance matrices of all variants are assembled into one
+        block-diagonal sparse system and solved in a single factorisation.
+        """
+        conductance = self.conductances(**params)
+        sizes = [np.size(v) for v in params.values() if not isinstance(v, str)]
+        n_variants = max([conductance.shape[0]] + sizes)
+        conductance = np.broadcast_to(conductance, (n_variants, len(self.links)))
+        temps = self.boundary_temperatures(n_variants, **params)
+
+        free = np.nonzero(~self.fixed)[0]
+        free_pos = np.full(len(self.node_names), -1)
+        free_pos[free] = np.arange(len(free))
+        n_free = len(free)
+
+        a = np.array([self.node_index[link["from"]] for link in self.links])
+        b = np.array([self.node_index[link["to"]] for link in self.links])
+
+        if n_free:
+            offset = (np.arange(n_variants) * n_free)[:, None]
+            rows, cols, vals = [], [], []
+            rhs = np.zeros(n_variants * n_free)
+            for u, v in ((a, b), (b, a)):
+                u_free = ~self.fixed[u]
+                # Diagonal: every link adds its conductance to a free end
+                rows.append((offset + free_pos[u][u_free]).ravel())
+                cols.append((offset + free_pos[u][u_free]).ravel())
+                vals.append(conductance[:, u_free].ravel())
+                # Off-diagonal between two free nodes
+                both = u_free & ~self.fixed[v]
+                rows.append((offset + free_pos[u][both]).ravel())
+                cols.append((offset + free_pos[v][both]).ravel())
+                vals.append(-conductance[:, both].ravel())
+                # Fixed neighbour moves to the right-hand side
+                to_fixed = u_free & self.fixed[v]
+                np.add.at(rhs, (offset + free_pos[u][to_fixed]).ravel(),
+                          (conductance[:, to_fixed] * temps[:, v[to_fixed]]).ravel())
+
+            size = n_variants * n_free
+            matrix = coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                                shape=(size, size)).tocsc()
+            temps[:, free] = np.atleast_1d(spsolve(matrix, rhs)).reshape(n_variants, n_free)
+
+        heat_flow = conductance * (temps[:, a] - temps[:, b])
+        return ThermalSolution(self, temps, heat_flow, np.asarray(conductance))
+
+
+def material_grid(**slots):
+    """
+    Cartesian product of material choices, e.g.
+    material_grid(shaft=["STAINLESS_STEEL", "INVAR"], gears=[...]).
+    Returns a dict of equally long arrays usable as solve() params.
+    """
+    names = list(slots)
+    mesh = np.meshgrid(*[np.asarray(slots[n]) for n in names], indexing="ij")
+    return {name: m.ravel() for name, m in zip(names, mesh)}
+
+
+def drivetrain_params(spec=None):
+    """
+    Geometry and default materials of the drivetrain models from a compiled
+    hardware spec (default moonshine.spec.load_spec(); pass a variant to
+    compare designs). Scenario-specific params (shaft, gears, ...) given to
+    solve() after these override the spec materials.
+    """
+    if spec is None:
+        from moonshine.spec import load_spec
+        spec = load_spec()
+    drivetrain = spec.drivetrain
+    return {
+        "shaft_length": drivetrain.shaft_length_m,
+        "gear_interface": drivetrain.gear_interface_m,
+        "break_shaft_hot": drivetrain.break_shaft_hot_m,
+        "break_shaft_cold": drivetrain.break_shaft_cold_m,
+        "shaft_area": np.pi * drivetrain.shaft_radius_m ** 2,
+        "shaft": drivetrain.shaft_material,
+        "gears": drivetrain.gear_material,
+    }
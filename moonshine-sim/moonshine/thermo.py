@@ -1,89 +1,258 @@
+import numbers
+
 import numpy as np
 
+from moonshine import properties
+from moonshine.instrument import count, span
+
+# Latent Heat (kJ/kg) approx
+H_VAP_ETHANOL = 841
+H_VAP_WATER = 2260
+# Density (kg/m3)
+RHO_ETHANOL = 789
+RHO_WATER = 997
+
+DEFAULT_TURBINE_EFFICIENCY = 0.15
+
+# Boiling point above which the loop needs 'The Wash'
+FLUSH_THRESHOLD_C = 85.0
+# Vapor leaks are ethanol-rich, so ethanol is lost faster than water
+ETHANOL_LOSS_FACTOR = 1.5
+
+# Flash point curve (x: Ethanol volume fraction, y: Flash point (C))
+FLASH_CURVE_X = np.array([0.05, 0.10, 0.20, 0.30, 0.40, 0.60, 0.80, 0.96, 1.0])
+FLASH_CURVE_Y = np.array([62, 49, 36, 29, 26, 22, 19, 17, 13], dtype=float)
+
+
+@span("thermo.boiling_point")
+def boiling_point(mix_ratio, pressure_pa=None):
+    """
+    Boiling (bubble) point in Celsius for an array (or scalar) of mix ratios
+    (ethanol volume fraction), from the VLE tables in moonshine.properties.
+    pressure_pa defaults to 1 atm.
+    """
+    return properties.boiling_point(mix_ratio, pressure_pa)
+
+
+@span("thermo.flash_point")
+def flash_point(mix_ratio):
+    """
+    Flash point in Celsius for an array (or scalar) of mix ratios.
+    Mixes below 1% ethanol are treated as effectively non-flammable (100 C).
+    """
+    if isinstance(mix_ratio, numbers.Real):
+        count("thermo.flash_point.values")
+        return 100.0 if mix_ratio < 0.01 else float(np.interp(mix_ratio, FLASH_CURVE_X, FLASH_CURVE_Y))
+    mix_ratio = np.asarray(mix_ratio, dtype=float)
+    count("thermo.flash_point.values", mix_ratio.size)
+    fp = np.interp(mix_ratio, FLASH_CURVE_X, FLASH_CURVE_Y)
+    return np.where(mix_ratio < 0.01, 100.0, fp)
+
+
+def mix_properties(mix_ratio, h_vap_ethanol=H_VAP_ETHANOL, h_vap_water=H_VAP_WATER,
+                   rho_ethanol=RHO_ETHANOL, rho_water=RHO_WATER):
+    """
+    Weighted-average latent heat (kJ/kg) and density (kg/m3) of the mix.
+    The pure-component properties default to the module constants and may
+    be arrays (e.g. Monte Carlo samples) that broadcast with mix_ratio.
+    """
+    if not isinstance(mix_ratio, numbers.Real):
+        mix_ratio = np.asarray(mix_ratio, dtype=float)
+    h_vap_mix = (mix_ratio * h_vap_ethanol) + ((1 - mix_ratio) * h_vap_water)
+    rho_mix = (mix_ratio * rho_ethanol) + ((1 - mix_ratio) * rho_water)
+    return h_vap_mix, rho_mix
+
+
+@span("thermo.analyze_nodes")
+def analyze_nodes(mix_ratio, tdp_watts, turbine_efficiency=DEFAULT_TURBINE_EFFICIENCY,
+                  h_vap_ethanol=H_VAP_ETHANOL, h_vap_water=H_VAP_WATER,
+                  rho_ethanol=RHO_ETHANOL, rho_water=RHO_WATER):
+    """
+    Batched version of Distiller.analyze_node.
+
+    mix_ratio, tdp_watts and turbine_efficiency may be scalars or arrays and
+    are broadcast against each other, as are the pure-component properties
+    passed on to mix_properties (e.g. Monte Carlo samples). Returns a dict of
+    equally shaped arrays (of scalars when every input is a scalar).
+    """
+    inputs = (mix_ratio, tdp_watts, turbine_efficiency, h_vap_ethanol, h_vap_water, rho_ethanol, rho_water)
+    scalar = (isinstance(mix_ratio, numbers.Real) and isinstance(tdp_watts, numbers.Real)
+              and isinstance(turbine_efficiency, numbers.Real) and isinstance(h_vap_ethanol, numbers.Real)
+              and isinstance(h_vap_water, numbers.Real) and isinstance(rho_ethanol, numbers.Real)
+              and isinstance(rho_water, numbers.Real))
+    if scalar:
+        # Scalar calls (Distiller.analyze_node) skip array broadcasting
+        mix_ratio, tdp_watts, turbine_efficiency = float(mix_ratio), float(tdp_watts), float(turbine_efficiency)
+        mix_points = mix_ratio
+    else:
+        mix_points = np.asarray(mix_ratio, dtype=float)
+        (mix_ratio, tdp_watts, turbine_efficiency,
+         h_vap_ethanol, h_vap_water, rho_ethanol, rho_water) = np.broadcast_arrays(
+            *[np.asarray(value, dtype=float) for value in inputs])
+    count("thermo.analyze_nodes.points", 1 if scalar else mix_ratio.size)
+    h_vap_mix, rho_mix = mix_properties(mix_ratio, h_vap_ethanol, h_vap_water, rho_ethanol, rho_water)
+
+    mass_flow_rate = tdp_watts / (h_vap_mix * 1000)  # kg/s
+    vol_flow_rate_ml_min = mass_flow_rate / rho_mix * 1e6 * 60
+
+    boiling, flash = boiling_point(mix_points), flash_point(mix_points)
+    if not scalar and mix_points.shape != mix_ratio.shape:
+        # The mix curves only depend on mix_ratio; evaluate them once per
+        # mix (e.g. a fixed mix under sampled properties) and broadcast
+        boiling = np.broadcast_to(boiling, mix_ratio.shape)
+        flash = np.broadcast_to(flash, mix_ratio.shape)
+
+    return {
+        "mass_flow_kg_s": mass_flow_rate,
+        "vol_flow_ml_min": vol_flow_rate_ml_min,
+        "recovered_power_w": tdp_watts * turbine_efficiency,
+        "boiling_point_c": boiling,
+        "flash_point_c": flash,
+    }
+
+
+def _drift_decay(leak_rate_vol_pct_per_day):
+    # Loss of ethanol is faster than loss of water in a vapor leak.
+    # Each day the mix shrinks by (1 - loss * factor), floored at zero.
+    loss = np.asarray(leak_rate_vol_pct_per_day, dtype=float) / 100.0
+    return np.maximum(0.0, 1.0 - loss * ETHANOL_LOSS_FACTOR)
+
+
+def drift_mix(initial_mix, leak_rate_vol_pct_per_day, days):
+    """
+    Closed-form mix ratio after `days` whole days of leakage.
+    All arguments broadcast against each other.
+    """
+    days = np.floor(np.asarray(days, dtype=float))
+    return np.asarray(initial_mix, dtype=float) * _drift_decay(leak_rate_vol_pct_per_day) ** days
+
+
+def drift_trajectory(initial_mix, leak_rate_vol_pct_per_day, days):
+    """
+    Daily mix and boiling-point series for day 0..days.
+    The day axis is appended after the broadcast shape of the inputs.
+    """
+    day = np.arange(int(days) + 1, dtype=float)
+    initial_mix = np.asarray(initial_mix, dtype=float)[..., None]
+    decay = _drift_decay(leak_rate_vol_pct_per_day)[..., None]
+    mix = initial_mix * decay ** day
+    return {
+        "day": day,
+        "mix_ratio": mix,
+        "boiling_point_c": boiling_point(mix),
+    }
+
+
+def flush_mix_threshold(threshold_c=FLUSH_THRESHOLD_C):
+    """
+    Mix ratio at which the boiling point reaches threshold_c.
+    Any mix below this value requires a flush.
+    """
+    return float(properties.mix_ratio_at_boiling_point(threshold_c))
+
+
+@span("thermo.solve_flush_day")
+def solve_flush_day(initial_mix, leak_rate_vol_pct_per_day, threshold_c=FLUSH_THRESHOLD_C):
+    """
+    First whole day on which requires_flush becomes true, solved directly
+    from the closed form. Returns np.inf for nodes that never cross.
+    """
+    initial_mix, decay = np.broadcast_arrays(
+        np.asarray(initial_mix, dtype=float),
+        _drift_decay(leak_rate_vol_pct_per_day),
+    )
+    x_flush = flush_mix_threshold(threshold_c)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        estimate = np.floor(np.log(x_flush / initial_mix) / np.log(decay)) + 1
+    estimate = np.where((decay > 0) & (decay < 1), estimate, np.inf)
+    estimate = np.where(decay == 0, 1.0, estimate)
+
+    # The log solve can land one day off where the threshold is hit almost
+    # exactly; nudge it so it agrees with evaluating the curve day by day.
+    def crossed(day):
+        finite_day = np.where(np.isfinite(day), np.maximum(day, 0), 0)
+        return boiling_point(initial_mix * decay ** finite_day) > threshold_c
+
+    finite = np.isfinite(estimate)
+    estimate = np.where(finite & ~crossed(estimate), estimate + 1, estimate)
+    estimate = np.where(finite & (estimate > 1) & crossed(estimate - 1), estimate - 1, estimate)
+
+    already = boiling_point(initial_mix) > threshold_c
+    return np.where(already, 0.0, estimate)
+
+
 class Distiller:
     """
     The Core Physics Engine for Project Moonshine.
     Calculates thermodynamic performance of the Rankine Cycle.
     """
-    
+
     def __init__(self, mix_ratio=0.60):
+        count("thermo.Distiller.created")
         self.mix_ratio = mix_ratio
-        # Latent Heat (kJ/kg) approx
-        self.h_vap_ethanol = 841
-        self.h_vap_water = 2260
-        self.rho_ethanol = 789
-        self.rho_water = 997
-        
+        self.h_vap_ethanol = H_VAP_ETHANOL
+        self.h_vap_water = H_VAP_WATER
+        self.rho_ethanol = RHO_ETHANOL
+        self.rho_water = RHO_WATER
+
         # Weighted Average
         self.h_vap_mix = (mix_ratio * self.h_vap_ethanol) + ((1-mix_ratio) * self.h_vap_water)
         self.rho_mix = (mix_ratio * self.rho_ethanol) + ((1-mix_ratio) * self.rho_water)
 
-    def get_boiling_point(self):
+    def get_boiling_point(self, pressure_pa=None):
         """
-        Returns boiling point in Celsius for the current mix_ratio at 1 atm.
+        Returns boiling point in Celsius for the current mix_ratio at 1 atm
+        (or at pressure_pa, e.g. ejector or turbine inlet conditions).
         Accounts for zeotropic 'Glide'.
         """
-        x = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0]
-        y = [100.0, 92.7, 87.7, 84.4, 82.5, 81.3, 80.5, 79.8, 79.1, 78.5, 78.4]
-        return np.interp(self.mix_ratio, x, y)
+        return float(boiling_point(self.mix_ratio, pressure_pa))
 
     def get_flash_point(self):
         """
         Estimates the flash point in Celsius.
         Data based on standard Ethanol/Water flash point curves.
         """
-        # x: Ethanol volume fraction, y: Flash point (C)
-        x = [0.05, 0.10, 0.20, 0.30, 0.40, 0.60, 0.80, 0.96, 1.0]
-        y = [62, 49, 36, 29, 26, 22, 19, 17, 13]
-        if self.mix_ratio < 0.01:
-            return 100 # Effectively non-flammable
-        return np.interp(self.mix_ratio, x, y)
-
-    def analyze_node(self, tdp_watts, turbine_efficiency=0.15):
-        h_vap_joules = self.h_vap_mix * 1000
-        mass_flow_rate = tdp_watts / h_vap_joules # kg/s
-        
-        vol_flow_rate_m3 = mass_flow_rate / self.rho_mix
-        vol_flow_rate_ml_min = vol_flow_rate_m3 * 1e6 * 60
-        
-        recovered_power = tdp_watts * turbine_efficiency
-        bp = self.get_boiling_point()
-        
+        return float(flash_point(self.mix_ratio))
+
+    @span("thermo.Distiller.analyze_node")
+    def analyze_node(self, tdp_watts, turbine_efficiency=DEFAULT_TURBINE_EFFICIENCY):
+        data = analyze_nodes(self.mix_ratio, tdp_watts, turbine_efficiency)
         return {
-            "mass_flow_kg_s": mass_flow_rate,
-            "vol_flow_ml_min": vol_flow_rate_ml_min,
-            "recovered_power_w": recovered_power,
-            "boiling_point_c": bp
+            "mass_flow_kg_s": float(data["mass_flow_kg_s"]),
+            "vol_flow_ml_min": float(data["vol_flow_ml_min"]),
+            "recovered_power_w": float(data["recovered_power_w"]),
+            "boiling_point_c": float(data["boiling_point_c"])
         }
 
-    def simulate_drift(self, leak_rate_vol_pct_per_day, days):
+    @span("thermo.Distiller.simulate_drift")
+    def simulate_drift(self, leak_rate_vol_pct_per_day, days, return_trajectory=False, return_flush_day=False):
         """
         Simulates 'Boiling Point Drift' due to fractional distillation.
-        Assumes any vapor leak is 85% ethanol (azeotrope-ish) while the 
+        Assumes any vapor leak is 85% ethanol (azeotrope-ish) while the
         bulk liquid is 60%. This causes the liquid to become water-heavy.
+
+        With return_trajectory=True the daily mix/boiling-point series is
+        included under "trajectory"; with return_flush_day=True the first
+        day requiring a flush (solve_flush_day) under "flush_day".
         """
-        current_mix = self.mix_ratio
-        for _ in range(int(days)):
-            # Loss of ethanol is faster than loss of water in a vapor leak
-            # This is a simplified model of preferential evaporation
-            ethanol_loss_factor = 1.5 
-            loss = (leak_rate_vol_pct_per_day / 100.0)
-            current_mix -= (loss * current_mix * ethanol_loss_factor)
-            current_mix = max(0.0, current_mix)
-            
-        new_bp = np.interp(current_mix, 
-                           [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0], 
-                           [100.0, 92.7, 87.7, 84.4, 82.5, 81.3, 80.5, 79.8, 79.1, 78.5, 78.4])
-        
-        return {
+        current_mix = float(drift_mix(self.mix_ratio, leak_rate_vol_pct_per_day, days))
+        new_bp = float(boiling_point(current_mix))
+
+        result = {
             "new_mix_ratio": current_mix,
             "new_boiling_point_c": new_bp,
-            "requires_flush": new_bp > 85.0 # Maintenance trigger
+            "requires_flush": new_bp > FLUSH_THRESHOLD_C # Maintenance trigger
         }
+        if return_flush_day:
+            result["flush_day"] = float(solve_flush_day(self.mix_ratio, leak_rate_vol_pct_per_day))
+        if return_trajectory:
+            result["trajectory"] = drift_trajectory(self.mix_ratio, leak_rate_vol_pct_per_day, days)
+        return result
 
 if __name__ == "__main__":
     still = Distiller(mix_ratio=0.60)
     data = still.analyze_node(tdp_watts=350)
     print(f"Boiling Point: {data['boiling_point_c']:.2f} °C")
     print(f"Required Flow: {data['vol_flow_ml_min']:.2f} mL/min")
-    print(f"Recovered Power: {data['recovered_power_w']:.2f} W")
\ No newline at end of file
+    print(f"Recovered Power: {data['recovered_power_w']:.2f} W")
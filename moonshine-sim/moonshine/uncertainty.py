@@ -0,0 +1,312 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+
+import numpy as np
+
+from moonshine import impact, instrument
+from moonshine.data import DATA_DIR, load_yaml
+from moonshine.impact import ImpactAnalyzer
+from moonshine.thermo import (DEFAULT_TURBINE_EFFICIENCY, H_VAP_ETHANOL, H_VAP_WATER, RHO_ETHANOL,
+                              RHO_WATER, analyze_nodes)
+
+DEFAULT_DISTRIBUTIONS_PATH = DATA_DIR / "uncertainty.yaml"
+
+DEFAULT_BATCH_SIZE = 250_000
+# Independent sample streams; fixed so results do not depend on worker count
+DEFAULT_STREAMS = 16
+HISTOGRAM_BINS = 4096
+
+OUTPUTS = ("mass_flow_kg_s", "vol_flow_ml_min", "recovered_power_w",
+           "total_carbon_kg", "total_water_l", "carbon_per_l")
+
+
+def load_distributions(path=None) -> Dict[str, dict]:
+    return dict(load_yaml(path or DEFAULT_DISTRIBUTIONS_PATH)["parameters"])
+
+
+def sample(spec, rng, n):
+    """
+    Draw n samples from one declared distribution (see data/uncertainty.yaml).
+    """
+    kind = spec.get("dist", "fixed")
+    if kind == "fixed":
+        return np.full(n, float(spec["value"]))
+    if kind == "normal":
+        return rng.normal(spec["mean"], spec["std"], n)
+    if kind == "uniform":
+        return rng.uniform(spec["low"], spec["high"], n)
+    if kind == "triangular":
+        return rng.triangular(spec["low"], spec["mode"], spec["high"], n)
+    if kind == "lognormal":
+        return rng.lognormal(math.log(spec["median"]), spec["sigma"], n)
+    raise ValueError(f"Unknown distribution: {kind}")
+
+
+def sample_inputs(distributions, rng, n):
+    return {name: sample(spec, rng, n) for name, spec in distributions.items()}
+
+
+def evaluate_samples(samples, mix_ratio=0.60, tdp_watts=350, feedstock="CORN", distance_km=500,
+                     mode="TRUCK", volume_l=1000):
+    """
+    Pushes one batch of sampled inputs through analyze_nodes and
+    ImpactAnalyzer.analyze_batch. Parameters missing from `samples` keep
+    their point estimate. Returns a dict of output arrays.
+    """
+    n = len(next(iter(samples.values())))
+    get = lambda name, default: samples.get(name, default)
+
+    node = analyze_nodes(
+        mix_ratio, tdp_watts, get("turbine_efficiency", DEFAULT_TURBINE_EFFICIENCY),
+        h_vap_ethanol=get("h_vap_ethanol", H_VAP_ETHANOL),
+        h_vap_water=get("h_vap_water", H_VAP_WATER),
+        rho_ethanol=get("rho_ethanol", RHO_ETHANOL),
+        rho_water=get("rho_water", RHO_WATER),
+    )
+    source = ImpactAnalyzer(volume_l).analyze_batch(
+        feedstock, distance_km, mode,
+        carbon_intensity_factor=get("carbon_intensity_factor", 1.0),
+        water_intensity_factor=get("water_intensity_factor", 1.0),
+        emission_factor_scale=get("emission_factor_scale", 1.0),
+    )
+    outputs = {**node, **source}
+    return {name: np.broadcast_to(outputs[name], (n,)) for name in OUTPUTS}
+
+
+class StreamingHistogram:
+    """
+    Fixed-size histogram on a power-of-two bin grid for streaming quantiles.
+
+    Bin i at level L covers [i * 2**L, (i + 1) * 2**L). When new data does
+    not fit in n_bins, the level is raised and neighbouring bins are merged
+    pairwise; since every histogram shares the same grid family, two
+    histograms can always be merged exactly. Quantiles are accurate to
+    about one bin width, i.e. (data range) / n_bins.
+    """
+    def __init__(self, n_bins=HISTOGRAM_BINS):
+        self.n_bins = n_bins
+        self.level = None
+        self.start = 0
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+
+    def _occupied(self):
+        nonzero = np.nonzero(self.counts)[0]
+        if not len(nonzero):
+            return None
+        return self.start + nonzero[0], self.start + nonzero[-1]
+
+    def _coarsen(self):
+        index = (self.start + np.arange(self.n_bins)) >> 1
+        self.start >>= 1
+        self.counts = np.bincount(index - self.start, weights=self.counts,
+                                  minlength=self.n_bins)[:self.n_bins].astype(np.int64)
+        self.level += 1
+
+    def _fit(self, lo, hi):
+        # Raise the level until [lo, hi] and the occupied bins fit in one
+        # window, then slide the window to start at the lowest bin. Returns
+        # the number of coarsening steps applied to lo/hi.
+        shifts = 0
+        while True:
+            occupied = self._occupied()
+            if occupied is not None:
+                lo_all, hi_all = min(lo, occupied[0]), max(hi, occupied[1])
+            else:
+                lo_all, hi_all = lo, hi
+            if hi_all - lo_all < self.n_bins:
+                break
+            self._coarsen()
+            lo >>= 1
+            hi >>= 1
+            shifts += 1
+
+        if lo_all != self.start:
+            counts = np.zeros(self.n_bins, dtype=np.int64)
+            if occupied is not None:
+                src = slice(occupied[0] - self.start, occupied[1] - self.start + 1)
+                dst = slice(occupied[0] - lo_all, occupied[1] - lo_all + 1)
+                counts[dst] = self.counts[src]
+            self.counts = counts
+            self.start = lo_all
+        return shifts
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return
+        lo, hi = float(values.min()), float(values.max())
+        if self.level is None:
+            magnitude = max(abs(lo), abs(hi))
+            span = hi - lo
+            # Keep bin indices well inside int64 even for a constant batch
+            floor = math.frexp(magnitude)[1] - 40 if magnitude > 0 else -1074
+            self.level = max(math.frexp(span / (self.n_bins - 1))[1] if span > 0 else floor, floor)
+        width = math.ldexp(1.0, self.level)
+        index = np.floor(values / width).astype(np.int64)
+        shifts = self._fit(int(index.min()), int(index.max()))
+        index >>= shifts
+        self.counts += np.bincount(index - self.start, minlength=self.n_bins)
+
+    def merge(self, other: "StreamingHistogram"):
+        if other.level is None:
+            return
+        other = other.copy()
+        if self.level is None:
+            self.level, self.start, self.counts = other.level, other.start, other.counts
+            return
+        while self.level < other.level:
+            self._coarsen()
+        while other.level < self.level:
+            other._coarsen()
+        occupied = other._occupied()
+        if occupied is None:
+            return
+        lo, hi = occupied
+        shifts = self._fit(lo, hi)
+        for _ in range(shifts):
+            other._coarsen()
+        index = other.start + np.arange(self.n_bins)
+        nonzero = other.counts > 0
+        np.add.at(self.counts, index[nonzero] - self.start, other.counts[nonzero])
+
+    def copy(self):
+        clone = StreamingHistogram(self.n_bins)
+        clone.level, clone.start, clone.counts = self.level, self.start, self.counts.copy()
+        return clone
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def quantile(self, q):
+        q = np.asarray(q, dtype=float)
+        total = self.count
+        if not total:
+            return np.full(q.shape, np.nan)
+        width = math.ldexp(1.0, self.level)
+        cumulative = np.concatenate([[0], np.cumsum(self.counts)])
+        edges = (self.start + np.arange(self.n_bins + 1)) * width
+        # Linear interpolation of the empirical CDF inside each bin
+        return np.interp(q * total, cumulative, edges)
+
+
+class RunningStats:
+    """
+    Streaming mean/variance (Welford, merged batch-wise with Chan's
+    formula), min/max and histogram quantiles for one output. Memory use
+    is constant in the number of samples, and partial results from
+    different streams or workers combine with merge().
+    """
+    def __init__(self, n_bins=HISTOGRAM_BINS):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.histogram = StreamingHistogram(n_bins)
+
+    def _combine(self, count, mean, m2, lo, hi):
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        if not len(values):
+            return
+        mean = float(values.mean())
+        self._combine(len(values), mean, float(((values - mean) ** 2).sum()),
+                      float(values.min()), float(values.max()))
+        self.histogram.update(values)
+
+    def merge(self, other: "RunningStats"):
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        self.histogram.merge(other.histogram)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def quantile(self, q):
+        return np.clip(self.histogram.quantile(q), self.min, self.max)
+
+    def summary(self, quantiles=(0.05, 0.5, 0.95)):
+        result = {"count": self.count, "mean": self.mean, "std": self.std, "min": self.min, "max": self.max}
+        for q, value in zip(quantiles, np.atleast_1d(self.quantile(quantiles))):
+            result[f"p{q * 100:g}"] = float(value)
+        return result
+
+
+@instrument.span("uncertainty.stream")
+def _run_stream(distributions, scenario, seed, n_samples, batch_size):
+    # Work unit: one independent sample stream. Pure function of its
+    # arguments, so the result does not depend on where it ran.
+    rng = np.random.default_rng(seed)
+    stats = {name: RunningStats() for name in OUTPUTS}
+    for start in range(0, n_samples, batch_size):
+        n = min(batch_size, n_samples - start)
+        outputs = evaluate_samples(sample_inputs(distributions, rng, n), **scenario)
+        for name in OUTPUTS:
+            stats[name].update(outputs[name])
+    return stats
+
+
+def _init_worker(data_path):
+    # Workers must see the same feedstock data as the parent process
+    impact.use_data_file(data_path)
+
+
+@instrument.span("uncertainty.run_uncertainty")
+def run_uncertainty(n_samples, mix_ratio=0.60, tdp_watts=350, feedstock="CORN", distance_km=500,
+                    mode="TRUCK", volume_l=1000, distributions=None, seed=0, workers=None,
+                    streams=DEFAULT_STREAMS, batch_size=DEFAULT_BATCH_SIZE) -> Dict[str, RunningStats]:
+    """
+    Monte Carlo propagation of the input distributions through the
+    Distiller and ImpactAnalyzer calculations for one scenario.
+
+    Samples are split over `streams` independent generators spawned from
+    SeedSequence(seed) and evaluated in batches of batch_size, so memory
+    stays bounded for any n_samples. Streams run on a process pool
+    (workers=None uses all cores, workers=1 runs in-process) and are
+    merged in stream order, so a given seed gives the same result for
+    any worker count. Returns RunningStats per output name.
+    """
+    distributions = load_distributions() if distributions is None else distributions
+    scenario = {"mix_ratio": mix_ratio, "tdp_watts": tdp_watts, "feedstock": feedstock,
+                "distance_km": distance_km, "mode": mode, "volume_l": volume_l}
+    # Fail fast on bad inputs before any work is shipped to workers
+    impact.get_feedstock_table().lookup(feedstock)
+    for spec in distributions.values():
+        sample(spec, np.random.default_rng(0), 1)
+
+    streams = max(1, min(streams, n_samples))
+    seeds = np.random.SeedSequence(seed).spawn(streams)
+    counts = [n_samples // streams + (i < n_samples % streams) for i in range(streams)]
+    workers = workers or os.cpu_count() or 1
+
+    args = ([distributions] * streams, [scenario] * streams, seeds, counts, [batch_size] * streams)
+    if workers == 1:
+        parts = list(map(_run_stream, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(impact.get_data_file(),)) as pool:
+            parts = instrument.pool_map(pool, _run_stream, *args)
+
+    stats = {name: RunningStats() for name in OUTPUTS}
+    for part in parts:
+        for name in OUTPUTS:
+            stats[name].merge(part[name])
+    return stats
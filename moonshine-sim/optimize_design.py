@@ -0,0 +1,33 @@
+import time
+
+import numpy as np
+from moonshine.optimize import optimize_design
+
+def run_design_optimization(tdp_watts=350, dist_km=100, n_mix=2000, n_fill=500):
+    """
+    Searches mix ratio x fill volume x feedstock x architecture for the
+    best feasible designs under each objective.
+    """
+    mix_ratio = np.linspace(0.01, 1.0, n_mix)
+    fill_volume_l = np.linspace(0.5, 20.0, n_fill)
+    for objective in ("surplus", "carbon_per_watt"):
+        start = time.perf_counter()
+        result = optimize_design(mix_ratio, fill_volume_l, objective=objective, tdp_watts=tdp_watts,
+                                 dist_km=dist_km, top_k=5)
+        elapsed = time.perf_counter() - start
+
+        print(f"--- Design Optimization: {objective} ({tdp_watts}W TDP, {dist_km}km) ---")
+        print(f"{result.candidates:,} candidates | {result.feasible:,} feasible | "
+              f"{result.scored:,} scored | {result.bounded:,} bounded out | {elapsed:.2f}s")
+        for stage, count in result.pruned.items():
+            print(f"  pruned by {stage}: {count:,}")
+        best = result.best
+        for i in range(len(best["mix_ratio"])):
+            print(f"{best['option'][i]:<9} | mix {best['mix_ratio'][i]:.3f} | fill {best['fill_volume_l'][i]:5.2f}L | "
+                  f"{best['feedstock'][i]:<10} | surplus {best['surplus_w'][i]:5.1f}W | "
+                  f"{best['carbon_per_w'][i] * 1000:6.1f} g CO2/W | BP {best['boiling_point_c'][i]:.1f}°C | "
+                  f"FP {best['flash_point_c'][i]:.1f}°C | buffer {best['vapor_buffer_s'][i]:.0f}s")
+        print()
+
+if __name__ == "__main__":
+    run_design_optimization()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+
+import numpy as np
+from moonshine.fleet import stream_fleet
+
+def write_synthetic_trace(path, n_nodes=2048, hours=2, seed=0):
+    """
+    Writes a 1 Hz per-GPU power trace (W) as float32 .npy, (time, node).
+    Written in hourly blocks so the file can be much larger than memory.
+    """
+    rng = np.random.default_rng(seed)
+    n_samples = int(hours * 3600)
+    trace = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(n_samples, n_nodes))
+    base = rng.uniform(250, 700, n_nodes)
+    for start in range(0, n_samples, 3600):
+        stop = min(start + 3600, n_samples)
+        t = np.arange(start, stop)[:, None]
+        diurnal = 1 + 0.2 * np.sin(2 * np.pi * t / 86400)
+        trace[start:stop] = np.clip(base * diurnal + rng.normal(0, 40, (stop - start, n_nodes)), 0, 1000)
+    trace.flush()
+    return path
+
+def simulate_fleet(path=None, window_s=900, nodes_per_rack=32):
+    """
+    Streams a per-node TDP trace and prints rack-level rolling aggregates.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        if path is None:
+            path = write_synthetic_trace(os.path.join(tmp, "fleet_trace.npy"))
+
+        print(f"--- Fleet Simulation ({window_s // 60} min windows) ---")
+        total_energy_j = 0.0
+        for window in stream_fleet(path, window_s=window_s, nodes_per_rack=nodes_per_rack):
+            racks = window.racks
+            hottest = int(np.argmax(racks["peak_tdp_w"]))
+            total_energy_j += window.nodes["recovered_energy_j"].sum()
+            print(f"t={window.t_start_s / 3600:5.2f}h | fleet recovered {racks['mean_recovered_power_w'].sum() / 1000:8.1f} kW"
+                  f" | peak rack {hottest} at {racks['peak_tdp_w'][hottest] / 1000:.1f} kW"
+                  f" needing {racks['peak_vol_flow_ml_min'][hottest] / 1000:.2f} L/min")
+        print(f"Total recovered energy: {total_energy_j / 3.6e6:.1f} kWh")
+
+if __name__ == "__main__":
+    simulate_fleet()
@@ -1,107 +1,45 @@
 import numpy as np
 
-def simulate_gearbox_heat_transfer(temp_hot=80, temp_cold=25):
+from moonshine.thermal_network import ThermalNetwork, drivetrain_params, load_conductivities, material_grid
+
+def simulate_gearbox_heat_transfer(temp_hot=80, temp_cold=25, spec=None):
     """
     Simulates heat leakage from the turbine to the fan through the drivetrain.
     Baseline: Stainless Steel shaft and gears.
     Option A: Stainless shaft + Silicon Nitride gears.
     Option B: Stainless shaft + Zirconia gears.
     Option C: Invar/Composite shaft + Zirconia gears.
+
+    The drivetrain models live in data/thermal_models.yaml and are solved
+    with moonshine.thermal_network; all passive scenarios go through a
+    single batched solve. Shaft and gear geometry come from the hardware
+    spec (data/moonshine_v1.yaml) or the given variant of it.
     """
-    
-    # Material Conductivity (W/m*K)
-    k_values = {
-        "Stainless Steel": 16.0,
-        "Silicon Nitride (Si3N4)": 30.0,
-        "Zirconia (ZrO2)": 2.5,
-        "Invar (Low Expansion)": 13.0,
-        "G10 Garolite (Housing)": 0.3
+    geometry = drivetrain_params(spec)
+    passive = ThermalNetwork.from_yaml("drivetrain_passive")
+    scenarios = {
+        "Baseline (All Stainless)": ("STAINLESS_STEEL", "STAINLESS_STEEL"),
+        "Si3N4 Gears (Strength focus)": ("STAINLESS_STEEL", "SILICON_NITRIDE"),
+        "ZrO2 Gears (Thermal Break focus)": ("STAINLESS_STEEL", "ZIRCONIA"),
+        "Full Thermal Break (Invar + ZrO2)": ("INVAR", "ZIRCONIA"),
     }
-    
-    # Dimensions
-    shaft_length_m = 0.15 # 15cm
-    shaft_radius_m = 0.004 # 4mm
-    shaft_area = np.pi * (shaft_radius_m**2)
-    
-    delta_t = temp_hot - temp_cold
-    
-    def calculate_leakage(k_shaft, k_gears=None):
-        # Simplified: Heat flows through the shaft. 
-        # If we have gears, they act as a series resistance.
-        # R_total = L1/(k1*A) + L2/(k2*A) ...
-        
-        r_shaft = shaft_length_m / (k_shaft * shaft_area)
-        
-        if k_gears:
-            # Gear contact area is small, but for simulation let's assume 
-            # a 5mm 'gear zone' where the material changes.
-            gear_length_m = 0.01 # 10mm of gear interface
-            r_shaft_reduced = (shaft_length_m - gear_length_m) / (k_shaft * shaft_area)
-            r_gears = gear_length_m / (k_gears * shaft_area)
-            r_total = r_shaft_reduced + r_gears
-        else:
-            r_total = r_shaft
-            
-        watts = delta_t / r_total
-        return watts
-
-    def calculate_active_cooling(k_shaft, k_gears, h_air=50, fin_area=0.01):
-        """
-        Simulates an "Active Thermal Break" where the gearbox has fins and is in the airflow.
-        We treat the gearbox as a thermal node between the Turbine and the Fan.
-        
-        Q_in (from Turbine) = (T_hot - T_gearbox) / R_shaft_in
-        Q_out_air (to Air)  = h_air * fin_area * (T_gearbox - T_air)
-        Q_leak (to Fan)     = (T_gearbox - T_cold) / R_shaft_out
-        
-        We solve for T_gearbox where Q_in = Q_out_air + Q_leak
-        """
-        # Resistances
-        # Assume gearbox is at 1/3 distance from turbine
-        dist_to_gearbox = 0.05 # 5cm
-        dist_to_fan = 0.10     # 10cm remaining
-        
-        r_shaft_in = dist_to_gearbox / (k_shaft * shaft_area)
-        r_shaft_out = dist_to_fan / (k_shaft * shaft_area)
-        
-        # Add gear resistance to the input side (heat must cross gears to enter housing?)
-        # Or assume gears are the "node". Let's assume gears are the node.
-        gear_length_m = 0.01
-        r_gears = gear_length_m / (k_gears * shaft_area)
-        r_in_total = r_shaft_in + r_gears
-        
-        # Convection Resistance (1 / hA)
-        r_convection = 1 / (h_air * fin_area)
-        
-        # Solve for T_gearbox (Node analysis)
-        # (T_h - T_g)/R_in = (T_g - T_air)/R_conv + (T_g - T_c)/R_out
-        # T_h/R_in + T_air/R_conv + T_c/R_out = T_g * (1/R_in + 1/R_conv + 1/R_out)
-        
-        t_air = 25 # Assuming intake air temp
-        
-        conductance_sum = (1/r_in_total) + (1/r_convection) + (1/r_shaft_out)
-        weighted_temps = (temp_hot/r_in_total) + (t_air/r_convection) + (temp_cold/r_shaft_out)
-        
-        t_gearbox = weighted_temps / conductance_sum
-        
-        # Calculate leakage to fan
-        q_leak = (t_gearbox - temp_cold) / r_shaft_out
-        
-        return q_leak, t_gearbox
+    shafts, gears = zip(*scenarios.values())
+    solution = passive.solve(**dict(geometry, temp_hot=temp_hot, temp_cold=temp_cold,
+                                    shaft=list(shafts), gears=list(gears)))
+    leaks = solution.flow("gears", "fan")
 
-    # Active Cooling Parameters
+    # "Active Thermal Break": the gearbox has fins and sits in the airflow.
     # h_air ~ 50-100 W/m^2K for forced air
     # fin_area ~ 10cm x 10cm effective surface area = 0.01 m^2
-    active_leak, active_temp = calculate_active_cooling(k_values["Stainless Steel"], k_values["Zirconia (ZrO2)"])
+    active = ThermalNetwork.from_yaml("drivetrain_active").solve(**dict(
+        geometry, temp_hot=temp_hot, temp_cold=temp_cold, temp_air=25,
+        shaft="STAINLESS_STEEL", gears="ZIRCONIA", h_air=50, fin_area=0.01))
+    active_leak = float(active.flow("gearbox", "fan")[0])
+    active_temp = float(active.temperature("gearbox")[0])
+
+    results = {name: float(w) for name, w in zip(scenarios, leaks)}
+    results["Active Cooling (Fins + Airflow)"] = active_leak
 
-    results = {
-        "Baseline (All Stainless)": calculate_leakage(k_values["Stainless Steel"]),
-        "Si3N4 Gears (Strength focus)": calculate_leakage(k_values["Stainless Steel"], k_values["Silicon Nitride (Si3N4)"]),
-        "ZrO2 Gears (Thermal Break focus)": calculate_leakage(k_values["Stainless Steel"], k_values["Zirconia (ZrO2)"]),
-        "Full Thermal Break (Invar + ZrO2)": calculate_leakage(k_values["Invar (Low Expansion)"], k_values["Zirconia (ZrO2)"]),
-        "Active Cooling (Fins + Airflow)": active_leak
-    }
-    
     print(f"--- Gearbox Thermal Leakage Simulation ({temp_hot}°C -> {temp_cold}°C) ---")
     for scenario, watts in results.items():
         print(f"{scenario:35}: {watts:.4f} Watts")
@@ -113,6 +51,25 @@ def simulate_gearbox_heat_transfer(temp_hot=80, temp_cold=25):
     active_reduction = (1 - (active_leak / results["Baseline (All Stainless)"])) * 100
     print(f"Zirconia gears reduce shaft heat creep by {reduction:.1f}%")
     print(f"Adding Fins + Airflow reduces it by {active_reduction:.1f}% (The 'Active Break')")
+    return results
+
+def sweep_enclosure_materials(temp_hot=80, temp_cold=25, top=5, spec=None):
+    """
+    Full enclosure model (bearings, gear stages, housing fins, chassis)
+    solved for every material combination in the catalogue.
+    """
+    materials = list(load_conductivities())
+    grid = material_grid(shaft=materials, gears=materials, housing=materials, mounts=materials)
+    solution = ThermalNetwork.from_yaml("drivetrain_enclosure").solve(
+        temp_hot=temp_hot, temp_cold=temp_cold, temp_air=25, shaft_area=drivetrain_params(spec)["shaft_area"],
+        h_air=50, fin_area=0.01, **grid)
+    leak = solution.flow("bearing_cold", "fan")
+
+    print(f"\n--- Enclosure Sweep ({len(leak)} material combinations) ---")
+    for i in np.argsort(leak)[:top]:
+        print(f"shaft={grid['shaft'][i]:16} gears={grid['gears'][i]:16} "
+              f"housing={grid['housing'][i]:16} mounts={grid['mounts'][i]:16}: {leak[i]:.4f} Watts")
 
 if __name__ == "__main__":
     simulate_gearbox_heat_transfer()
+    sweep_enclosure_materials()
@@ -1,12 +1,13 @@
 import numpy as np
 from moonshine.thermo import Distiller
-from moonshine.designs import Dimensions
+from moonshine.spec import load_spec
+from moonshine.hydraulics import HydraulicModel, evaluate_rack
 
 def test_gravity_pressure():
     distiller = Distiller(mix_ratio=0.60)
     rho = distiller.rho_mix # kg/m3
     g = 9.81 # m/s2
-    h = Dimensions.TOWER_V1["max_height_mm"] / 1000.0 # meters (0.4m)
+    h = load_spec().tracks.TOWER_V1.max_height_m # meters (0.4m)
     
     # Hydrostatic Pressure P = rho * g * h
     pressure_pa = rho * g * h
@@ -28,5 +29,21 @@ def test_gravity_pressure():
     
     print(f"Result: {'PASS' if passed else 'FAIL'} (Threshold: {threshold_bar} bar)")
 
+def run_rack_hydraulics(n_nodes=(8, 16, 32), condenser_height_m=1.8):
+    # Full rack loops: gravity-fed vs pumped, solved together per model
+    print(f"\n--- Rack Hydraulics (condenser at {condenser_height_m} m) ---")
+    for model, extra in (("rack_thermosyphon", {}), ("rack_pumped", {"pump_shutoff": 100.0})):
+        result = evaluate_rack(model, n_nodes=list(n_nodes), condenser_height=condenser_height_m,
+                               downcomer_length=condenser_height_m + 0.2, **extra)
+        for rack, n in enumerate(n_nodes):
+            sel = result["rack"] == rack
+            dp_bar = result["turbine_dp_pa"][sel] / 1e5
+            print(f"{model} x{n}: turbine dp {dp_bar.min():.3f}-{dp_bar.max():.3f} bar | "
+                  f"flow {result['flow_lpm'][sel].mean():.3f} L/min/node "
+                  f"(need {result['required_flow_lpm'][sel][0]:.3f}) | "
+                  f"pump {result['pump_parasitic_w'][sel].mean():.2f} W/node | "
+                  f"gravity head pass {np.count_nonzero(result['gravity_head_passed'][sel])}/{n}")
+
 if __name__ == "__main__":
     test_gravity_pressure()
+    run_rack_hydraulics()
@@ -1,5 +1,16 @@
+import numpy as np
+from moonshine import properties
+from moonshine.cache import cached
+from moonshine.maintenance import plan_flushes
 from moonshine.thermo import Distiller
 
+@cached(data_files=lambda: [properties.get_data_file()])
+def drift_checkpoints(initial_mix, leak_rate_vol_pct_per_day, checkpoints):
+    still = Distiller(mix_ratio=initial_mix)
+    return [still.simulate_drift(leak_rate_vol_pct_per_day=leak_rate_vol_pct_per_day, days=days,
+                                 return_flush_day=True)
+            for days in checkpoints]
+
 def run_maintenance_sim():
     initial_mix = 0.60
     still = Distiller(mix_ratio=initial_mix)
@@ -12,11 +23,31 @@ def run_maintenance_sim():
     # Vapor leaks are ethanol-rich, shifting the liquid composition.
     checkpoints = [30, 90, 180, 365]
     
-    for days in checkpoints:
-        drift = still.simulate_drift(leak_rate_vol_pct_per_day=0.5, days=days)
+    for days, drift in zip(checkpoints, drift_checkpoints(initial_mix, 0.5, checkpoints)):
         status = "OK" if not drift["requires_flush"] else "⚠️ REQUIRES FLUSH"
         
         print(f"Day {days:3}: Mix {drift['new_mix_ratio']*100:4.1f}% | BP {drift['new_boiling_point_c']:5.2f}°C | {status}")
 
+    print("-" * 50)
+    print(f"Flush threshold crossed on day {drift['flush_day']:.0f}")
+
+def run_fleet_schedule(n_nodes=100_000, n_crews=32, seed=0):
+    """
+    Plans a year of flushes for a synthetic fleet and reports how long
+    nodes ran above the flush threshold waiting for a crew.
+    """
+    rng = np.random.default_rng(seed)
+    leak = rng.lognormal(np.log(0.5), 0.6, n_nodes)  # vol %/day
+    initial_mix = rng.uniform(0.50, 0.62, n_nodes)
+    report = plan_flushes(initial_mix, leak, n_crews=n_crews)
+    summary = report.summary()
+
+    print(f"\n--- Fleet Flush Schedule ({n_nodes:,} nodes, {n_crews} crews, 1 year) ---")
+    print(f"Node events: {summary['node_events']:,} | Rack visits: {summary['jobs']:,} | Flushes: {summary['flushes']:,}")
+    print(f"Crew utilisation: {summary['crew_utilisation']*100:.1f}%")
+    print(f"Time above threshold: {summary['node_days_above_threshold']:,.0f} node-days "
+          f"(worst node {summary['max_days_above_threshold']:.1f} days)")
+
 if __name__ == "__main__":
     run_maintenance_sim()
+    run_fleet_schedule()
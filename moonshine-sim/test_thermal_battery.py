@@ -1,21 +1,22 @@
 import numpy as np
+from moonshine.designs import Dimensions
+from moonshine.pcm import load_pcm_catalogue, optimize_thermal_battery, size_grid
 
-def simulate_thermal_battery(target_runtime_minutes=5, turbine_load_watts=50):
+def simulate_thermal_battery(target_runtime_minutes=5, turbine_load_watts=50, material="BA_OH2_8H2O", radius_m=0.03):
     """
     Calculates the volume of Phase Change Material (PCM) required to 
     sustain the turbine output after the heat source (chip) is turned off.
     
-    Target PCM: Barium Hydroxide Octahydrate (Ba(OH)2·8H2O)
+    Default PCM: Barium Hydroxide Octahydrate (Ba(OH)2·8H2O)
     Melting Point: 78°C
     Latent Heat: 265 kJ/kg
     Density: 2180 kg/m3
+    Other materials come from data/pcm_materials.yaml.
     """
     
-    # PCM Properties
-    pcm_name = "Barium Hydroxide Octahydrate"
-    melting_point_c = 78.0
-    latent_heat_j_kg = 265 * 1000 # J/kg
-    density_kg_m3 = 2180
+    catalogue = load_pcm_catalogue()
+    i = catalogue["code"].index(material)
+    pcm_name = catalogue["name"][i]
     
     # Energy Required
     # We need to supply enough heat to boil the ethanol.
@@ -27,23 +28,12 @@ def simulate_thermal_battery(target_runtime_minutes=5, turbine_load_watts=50):
     # to maintain minimal idle RPM.
     thermal_input_required_watts = 300 
     
-    seconds = target_runtime_minutes * 60
-    total_energy_joules = thermal_input_required_watts * seconds
-    
-    # Mass of PCM required
-    # Energy = Mass * Latent_Heat
-    mass_pcm_kg = total_energy_joules / latent_heat_j_kg
-    
-    # Volume required
-    vol_pcm_m3 = mass_pcm_kg / density_kg_m3
-    vol_pcm_liters = vol_pcm_m3 * 1000
-    
-    # Dimensions (Cylinder)
-    # Assume we fit this inside a canister in the flow path.
-    # If cylinder radius is 3cm (0.03m)
-    radius_m = 0.03
-    area_m2 = np.pi * (radius_m**2)
-    length_m = vol_pcm_m3 / area_m2
+    # Energy = Mass * Latent_Heat, in a cylinder canister in the flow path
+    size = size_grid(target_runtime_minutes, thermal_input_required_watts, radius_m, catalogue)
+    total_energy_joules = float(size["energy_j"][i, 0, 0, 0])
+    mass_pcm_kg = float(size["mass_kg"][i, 0, 0, 0])
+    vol_pcm_liters = float(size["volume_l"][i, 0, 0, 0])
+    length_m = float(size["length_m"][i, 0, 0, 0])
     
     print(f"--- Thermal Battery Simulation ({pcm_name}) ---")
     print(f"Target Runtime: {target_runtime_minutes} minutes")
@@ -52,12 +42,27 @@ def simulate_thermal_battery(target_runtime_minutes=5, turbine_load_watts=50):
     print("-" * 40)
     print(f"Mass Required: {mass_pcm_kg:.3f} kg")
     print(f"Volume Required: {vol_pcm_liters:.3f} Liters")
-    print(f"Physical Size (r=3cm): Length = {length_m*100:.1f} cm")
+    print(f"Physical Size (r={radius_m*100:.0f}cm): Length = {length_m*100:.1f} cm")
     
     return {
         "mass_kg": mass_pcm_kg,
         "volume_l": vol_pcm_liters
     }
 
+def optimize_thermal_batteries(runtimes_min=(5, 15, 30), loads_w=(300, 1000, 3000), sku=Dimensions.RICKHOUSE_2U):
+    """
+    Prints the feasible Pareto set of PCM buffers for each runtime/load.
+    """
+    # PCM must melt above the 60% mix boiling point to keep it boiling
+    front = optimize_thermal_battery(runtimes_min, loads_w, sku=sku, min_melting_point_c=82.0)
+    print(f"\n--- PCM Buffer Options ({sku['name']}) ---")
+    for runtime in runtimes_min:
+        for load in loads_w:
+            rows = np.nonzero((front["runtime_min"] == runtime) & (front["thermal_load_w"] == load))[0]
+            print(f"{runtime:>3} min @ {load:>3} W: " + ("no feasible canister" if not len(rows) else ", ".join(
+                f"{front['material'][k]} r={front['radius_m'][k]*100:.1f}cm {front['mass_kg'][k]:.2f}kg "
+                f"{front['volume_l'][k]:.2f}L {front['length_m'][k]*100:.0f}cm" for k in rows)))
+
 if __name__ == "__main__":
     simulate_thermal_battery()
+    optimize_thermal_batteries()
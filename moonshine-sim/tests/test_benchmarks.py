@@ -0,0 +1,45 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+SUITE_PATH = Path(__file__).resolve().parent.parent / "benchmarks" / "suite.py"
+spec = importlib.util.spec_from_file_location("bench_suite", SUITE_PATH)
+suite = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(suite)
+
+def _doc(**per_item):
+    return {"version": suite.FORMAT_VERSION, "quick": True,
+            "results": {name: {"seconds": s, "items": 1, "seconds_per_item": s} for name, s in per_item.items()}}
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_compare_flags_regressions_past_threshold(self):
+        baseline = _doc(fast=1.0, slow=1.0, gone=1.0)
+        current = _doc(fast=1.2, slow=1.5, new=9.0)
+        rows, regressed = suite.compare(baseline, current, threshold=0.25)
+        self.assertEqual([r[0] for r in rows], ["fast", "slow"])
+        self.assertEqual(regressed, ["slow"])
+        _, regressed = suite.compare(baseline, current, threshold=0.6)
+        self.assertEqual(regressed, [])
+        with self.assertRaises(ValueError):
+            suite.compare(baseline, dict(current, quick=False))
+
+    def test_run_writes_baseline_and_compare_exit_code(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            self.assertEqual(suite.main(["run", "--quick", "--filter", "distiller.get_boiling_point",
+                                         "--output", path]), 0)
+            doc = json.loads(Path(path).read_text())
+            self.assertIn("distiller.get_boiling_point", doc["results"])
+
+            slower = os.path.join(tmp, "current.json")
+            for r in doc["results"].values():
+                r["seconds_per_item"] *= 2
+            Path(slower).write_text(json.dumps(doc))
+            self.assertEqual(suite.main(["compare", path, slower]), 1)
+            self.assertEqual(suite.main(["compare", path, slower, "--threshold", "1.5"]), 0)
+
+if __name__ == '__main__':
+    unittest.main()
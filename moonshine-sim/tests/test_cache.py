@@ -0,0 +1,134 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+from moonshine import properties
+from moonshine.cache import ResultCache, cached, default_cache, params_digest
+
+CALLS = []
+
+def _square(x, scale=1.0):
+    CALLS.append(x)
+    return np.asarray(x) ** 2 * scale
+
+def _store(args):
+    directory, i = args
+    cache = ResultCache(directory, max_bytes=10_000)
+    key, record = cache.make_key(_square, (i,))
+    return cache.put(key, np.full(100, i), record)
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.tmp.name)
+        CALLS.clear()
+        # Keep the default cache away from ~/.cache/moonshine
+        self._env = {name: os.environ.pop(name, None) for name in ("MOONSHINE_CACHE_DIR", "MOONSHINE_RESULT_CACHE")}
+        os.environ["MOONSHINE_CACHE_DIR"] = os.path.join(self.tmp.name, "home")
+
+    def tearDown(self):
+        for name, value in self._env.items():
+            os.environ.pop(name, None)
+            if value is not None:
+                os.environ[name] = value
+        self.tmp.cleanup()
+
+    def test_params_digest_is_canonical(self):
+        a = np.arange(6.0).reshape(2, 3)
+        self.assertEqual(params_digest(a, opts={"x": 1, "y": 2}), params_digest(np.asfortranarray(a), opts={"y": 2, "x": 1}))
+        self.assertNotEqual(params_digest(a), params_digest(a.astype(np.float32)))
+        self.assertNotEqual(params_digest(1), params_digest(1.0))
+        with self.assertRaises(ValueError):
+            params_digest(object())
+
+    def test_hits_misses_and_data_file_invalidation(self):
+        data = Path(self.tmp.name) / "inputs.yaml"
+        data.write_text("a: 1\n")
+        square = cached(data_files=lambda: [data], cache=self.cache)(_square)
+
+        np.testing.assert_array_equal(square([1, 2, 3]), [1, 4, 9])
+        np.testing.assert_array_equal(square([1, 2, 3]), [1, 4, 9])
+        square([1, 2, 3], scale=2.0)
+        self.assertEqual(len(CALLS), 2)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+        data.write_text("a: 2\n")
+        square([1, 2, 3])
+        self.assertEqual(len(CALLS), 3)
+
+        records = self.cache.manifest()
+        self.assertEqual(len(records), 3)
+        self.assertTrue(all(r["function"].endswith("_square") for r in records))
+        self.assertEqual(self.cache.verify(), [])
+
+    def test_verify_detects_corruption(self):
+        key, record = self.cache.make_key(_square, (3,))
+        self.cache.put(key, 9, record)
+        path = next(Path(self.tmp.name).rglob("*.pickle"))
+        path.write_bytes(path.read_bytes() + b"x")
+        self.assertEqual(self.cache.verify(), [key])
+
+    def test_lru_eviction(self):
+        cache = ResultCache(self.tmp.name, max_bytes=3000)
+        keys = []
+        for i in range(3):
+            key, record = cache.make_key(_square, (i,))
+            cache.put(key, np.zeros(100), record)
+            os.utime(cache._paths(key)[0], ns=(i * 10**9, i * 10**9))
+            keys.append(key)
+        cache.get(keys[0])  # refresh the oldest entry
+        key, record = cache.make_key(_square, (99,))
+        cache.put(key, np.zeros(100), record)
+
+        self.assertLessEqual(cache.size_bytes(), 3000)
+        self.assertTrue(cache.get(keys[0])[0])
+        self.assertFalse(cache.get(keys[1])[0])
+        self.assertGreater(cache.stats()["evictions"], 0)
+
+    def test_concurrent_writers(self):
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            ok = list(pool.map(_store, [(self.tmp.name, i) for i in range(40)]))
+        self.assertTrue(all(ok))
+        self.assertLessEqual(self.cache.size_bytes(), 10_000)
+        self.assertEqual(self.cache.verify(), [])
+
+    def test_default_cache_is_opt_in(self):
+        square = cached(data_files=lambda: [properties.get_data_file()])(_square)
+        square(2)
+        square(2)
+        self.assertEqual(len(CALLS), 2)
+        self.assertEqual(default_cache().manifest(), [])
+
+        os.environ["MOONSHINE_RESULT_CACHE"] = "1"
+        square(2)
+        square(2)
+        self.assertEqual(len(CALLS), 3)
+        self.assertTrue(str(default_cache().directory).startswith(self.tmp.name))
+        record, = default_cache().manifest()
+        self.assertEqual(record["data_files"][0][0], "properties.yaml")
+
+    def test_running_size_total(self):
+        cache = ResultCache(self.tmp.name, max_bytes=100_000)
+        for i in range(5):
+            key, record = cache.make_key(_square, (i,))
+            cache.put(key, np.zeros(100), record)
+        self.assertEqual(cache._read_total(), cache.size_bytes())
+        cache.clear()
+        self.assertEqual(cache._read_total(), 0)
+
+    def test_disabled_by_environment(self):
+        square = cached(cache=self.cache)(_square)
+        os.environ["MOONSHINE_RESULT_CACHE"] = "0"
+        try:
+            square(2)
+            square(2)
+        finally:
+            del os.environ["MOONSHINE_RESULT_CACHE"]
+        self.assertEqual(len(CALLS), 2)
+        self.assertEqual(self.cache.manifest(), [])
+
+if __name__ == '__main__':
+    unittest.main()
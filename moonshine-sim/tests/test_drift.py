@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+from moonshine.thermo import Distiller, drift_trajectory, solve_flush_day
+
+def _loop_drift(mix, leak, days):
+    # Reference day-by-day stepping, as simulate_drift originally did it
+    for _ in range(int(days)):
+        mix -= (leak / 100.0) * mix * 1.5
+        mix = max(0.0, mix)
+    return mix
+
+class TestDriftEngine(unittest.TestCase):
+    def test_closed_form_matches_loop(self):
+        for leak in [0.0, 0.1, 0.5, 2.0, 80.0]:
+            for days in [0, 1, 30, 365]:
+                drift = Distiller(mix_ratio=0.60).simulate_drift(leak, days)
+                self.assertAlmostEqual(drift["new_mix_ratio"], _loop_drift(0.60, leak, days), places=12)
+
+    def test_flush_day_is_first_crossing(self):
+        mixes = np.array([0.60, 0.55, 0.45, 0.25, 0.60])
+        leaks = np.array([0.5, 0.1, 1.0, 0.5, 0.0])
+        days = solve_flush_day(mixes, leaks)
+        for mix, leak, day in zip(mixes, leaks, days):
+            if not np.isfinite(day):
+                self.assertEqual(leak, 0.0)
+                continue
+            still = Distiller(mix_ratio=mix)
+            self.assertTrue(still.simulate_drift(leak, day)["requires_flush"])
+            if day > 0:
+                self.assertFalse(still.simulate_drift(leak, day - 1)["requires_flush"])
+
+    def test_trajectory_shape(self):
+        traj = drift_trajectory(np.array([0.55, 0.60]), np.array([[0.1], [0.5], [1.0]]), 365)
+        self.assertEqual(traj["mix_ratio"].shape, (3, 2, 366))
+        self.assertEqual(traj["boiling_point_c"].shape, (3, 2, 366))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from moonshine.fleet import FleetSimulator, open_trace, stream_fleet
+from moonshine.thermo import Distiller
+
+class TestFleetSimulator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(11)
+        self.trace = rng.uniform(100, 900, (257, 10)).astype(np.float32)
+        self.path = os.path.join(self.tmp.name, "trace.npy")
+        np.save(self.path, self.trace)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_windows_match_brute_force(self):
+        rack_of = np.array([0, 0, 1, 1, 1, 2, 2, 2, 2, 0])
+        mix = np.linspace(0.4, 0.8, 10)
+        # A small chunk budget forces windows to straddle chunk boundaries
+        windows = list(stream_fleet(self.path, mix_ratio=mix, rack_of=rack_of, window_s=60,
+                                    chunk_elements=230))
+        self.assertEqual(len(windows), 5)
+        self.assertEqual((windows[-1].t_start_s, windows[-1].t_stop_s), (240.0, 257.0))
+
+        trace = self.trace.astype(float)
+        per_watt_flow = np.array([Distiller(m).analyze_node(1.0)["vol_flow_ml_min"] for m in mix])
+        for window in windows:
+            block = trace[int(window.t_start_s):int(window.t_stop_s)]
+            np.testing.assert_allclose(window.nodes["mean_tdp_w"], block.mean(axis=0))
+            np.testing.assert_allclose(window.nodes["peak_vol_flow_ml_min"], block.max(axis=0) * per_watt_flow)
+            np.testing.assert_allclose(window.nodes["recovered_energy_j"], block.sum(axis=0) * 0.15)
+
+            rack_flow = np.stack([(block * per_watt_flow)[:, rack_of == r].sum(axis=1) for r in range(3)], axis=1)
+            np.testing.assert_allclose(window.racks["peak_vol_flow_ml_min"], rack_flow.max(axis=0))
+            np.testing.assert_allclose(window.racks["mean_tdp_w"],
+                                       [block[:, rack_of == r].sum(axis=1).mean() for r in range(3)])
+
+    def test_chunking_does_not_change_results(self):
+        trace = open_trace(self.path)
+        sim = FleetSimulator(10, nodes_per_rack=4)
+        small = list(sim.run(trace, window_s=30, chunk_elements=70))
+        large = list(sim.run(trace, window_s=30))
+        self.assertEqual(len(small), len(large))
+        for a, b in zip(small, large):
+            for name in a.racks:
+                np.testing.assert_allclose(a.racks[name], b.racks[name])
+
+    def test_raw_binary_trace(self):
+        raw = os.path.join(self.tmp.name, "trace.bin")
+        self.trace.tofile(raw)
+        with self.assertRaises(ValueError):
+            open_trace(raw)
+        trace = open_trace(raw, n_nodes=10)
+        np.testing.assert_array_equal(trace, self.trace)
+        with self.assertRaises(ValueError):
+            list(FleetSimulator(9).run(trace))
+
+if __name__ == '__main__':
+    unittest.main()
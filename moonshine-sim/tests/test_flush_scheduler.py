@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+from moonshine.maintenance import FlushScheduler, plan_flushes
+from moonshine.thermo import Distiller
+
+class TestFlushScheduler(unittest.TestCase):
+    def test_ample_crews_flush_on_time(self):
+        first = np.array([10.0, 20.0, 35.0, np.inf])
+        cycle = np.array([50.0, 100.0, 400.0, 30.0])
+        scheduler = FlushScheduler([0, 1, 2, 3], n_crews=8, setup_hours=0, hours_per_node=0, batch_window_days=0)
+        report = scheduler.run(first, cycle, horizon_days=365)
+        np.testing.assert_array_equal(report.flushes, [8, 4, 1, 0])
+        np.testing.assert_array_equal(report.overdue_days, 0.0)
+        self.assertEqual(report.node_events, 2 * 13)
+
+    def test_crew_capacity_causes_overdue_time(self):
+        # Two racks of two nodes due on day 10; one crew, 12 h per node
+        scheduler = FlushScheduler([0, 0, 1, 1], n_crews=1, setup_hours=0, hours_per_node=12, batch_window_days=0)
+        report = scheduler.run(10.0, 1000.0, horizon_days=30)
+        np.testing.assert_allclose(report.jobs["start_day"], [10, 11])
+        np.testing.assert_allclose(report.overdue_days, [1, 1, 2, 2])
+        self.assertAlmostEqual(report.crew_utilisation, 2 / 30)
+        # Nothing gets done after the horizon: time above threshold runs to it
+        late = scheduler.run([10, 10, 40, 40], 1000.0, horizon_days=10.5)
+        np.testing.assert_allclose(late.overdue_days, [0.5, 0.5, 0, 0])
+
+    def test_batching_and_invariants(self):
+        rng = np.random.default_rng(4)
+        n = 640
+        rack_of = rng.permutation(np.arange(n) // 32)
+        first = rng.uniform(0, 100, n)
+        cycle = rng.uniform(40, 120, n)
+        single = FlushScheduler(rack_of, n_crews=2, batch_window_days=0).run(first, cycle)
+        batched = FlushScheduler(rack_of, n_crews=2, batch_window_days=14).run(first, cycle)
+        self.assertLess(len(batched.jobs["rack"]), len(single.jobs["rack"]))
+        self.assertLess(batched.overdue_days.sum(), single.overdue_days.sum())
+        for report in (single, batched):
+            jobs = report.jobs
+            for crew in range(2):
+                mine = jobs["crew"] == crew
+                self.assertTrue(np.all(jobs["start_day"][mine][1:] >= jobs["end_day"][mine][:-1] - 1e-12))
+            self.assertEqual(jobs["nodes_flushed"].sum(), report.flushes.sum())
+            self.assertTrue(np.all(report.overdue_days >= 0))
+
+    def test_plan_from_drift_physics(self):
+        leak = np.array([0.5, 1.0, 2.0, 0.0])
+        report = plan_flushes(0.6, leak, nodes_per_rack=1, n_crews=4, setup_hours=0, hours_per_node=0,
+                              batch_window_days=0, horizon_days=365)
+        first = [Distiller(0.6).simulate_drift(rate, 1, return_flush_day=True)["flush_day"] for rate in leak[:3]]
+        np.testing.assert_array_equal(report.flushes[:3], [int(np.ceil(365 / f)) - 1 for f in first])
+        self.assertEqual(report.flushes[3], 0)
+        with self.assertRaises(ValueError):
+            plan_flushes(0.6, leak, fill_mix=0.2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+from moonshine.evaluator import DesignEvaluator, run_evaluation
+from moonshine.graph import DependencyGraph
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        g = DependencyGraph()
+        g.add_input("x", 2)
+        g.add_input("y", np.array([1.0, 2.0]))
+        g.add_node("sign", lambda x: self.calls.append("sign") or np.sign(x), ["x"])
+        g.add_node("scaled", lambda s, y: self.calls.append("scaled") or s * y, ["sign", "y"])
+        g.add_node("total", lambda v: self.calls.append("total") or float(v.sum()), ["scaled"])
+        self.graph = g
+
+    def test_memoized_until_inputs_change(self):
+        self.assertEqual(self.graph.value("total"), 3.0)
+        self.assertEqual(self.calls, ["sign", "scaled", "total"])
+        self.graph.evaluate()
+        self.assertEqual(self.graph.last_run["recomputed"], [])
+        self.assertEqual(self.graph.set_inputs(y=np.array([1.0, 2.0])), [])
+
+        self.graph.set_inputs(y=np.array([2.0, 2.0]))
+        self.calls.clear()
+        self.assertEqual(self.graph.value("total"), 4.0)
+        self.assertEqual(self.calls, ["scaled", "total"])
+        self.assertEqual(self.graph.last_run["reused"], ["sign"])
+
+    def test_early_cutoff(self):
+        self.graph.evaluate()
+        self.calls.clear()
+        self.graph.set_inputs(x=5)  # sign(5) == sign(2), so nothing downstream changes
+        self.graph.evaluate()
+        self.assertEqual(self.calls, ["sign"])
+        self.assertEqual(set(self.graph.last_run["reused"]), {"scaled", "total"})
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            self.graph.add_node("bad", len, ["missing"])
+        with self.assertRaises(ValueError):
+            self.graph.set_inputs(total=1)
+        self.assertEqual(set(self.graph.dependents("x")), {"sign", "scaled", "total"})
+
+class TestDesignEvaluator(unittest.TestCase):
+    def test_matches_run_evaluation(self):
+        evaluator = DesignEvaluator()
+        evaluator.evaluate()
+        for inputs in ({"tdp_watts": 60}, {"feedstock": "POTATO", "dist_km": 9000}, {"fill_volume_l": 1.0}):
+            options = evaluator.evaluate(**inputs)
+            expected = run_evaluation(**evaluator.inputs, verbose=False)
+            for key, opt in options.items():
+                for test in ("NET_ENERGY_SURPLUS", "THERMAL_STABILITY", "ENVIRONMENTAL_IMPACT"):
+                    self.assertEqual(opt.tests[test].passed, expected[key].tests[test].passed)
+                    self.assertEqual(opt.tests[test].result_data, expected[key].tests[test].result_data)
+
+    def test_only_affected_tests_recompute(self):
+        evaluator = DesignEvaluator()
+        evaluator.evaluate()
+        self.assertEqual(len(evaluator.last_run["recomputed"]), 12)
+
+        evaluator.evaluate(tdp_watts=500)
+        self.assertEqual(evaluator.inputs["tdp_watts"], 500)
+        recomputed = set(evaluator.last_run["recomputed"])
+        self.assertEqual(recomputed, {"node_analysis", "OPTION_A.NET_ENERGY_SURPLUS",
+                                      "OPTION_B.NET_ENERGY_SURPLUS", "OPTION_C.NET_ENERGY_SURPLUS"})
+        self.assertIn("impact", evaluator.last_run["reused"])
+
+        evaluator.evaluate(dist_km=250)
+        recomputed = set(evaluator.last_run["recomputed"])
+        self.assertIn("OPTION_B.ENVIRONMENTAL_IMPACT", recomputed)
+        self.assertNotIn("node_analysis", recomputed)
+
+if __name__ == '__main__':
+    unittest.main()
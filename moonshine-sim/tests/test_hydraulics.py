@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+from moonshine.hydraulics import G, LPM, HydraulicModel, _component, _pipe, evaluate_rack
+from moonshine.evaluator import PUMPED_RACK, DesignEvaluator
+from moonshine.thermo import mix_properties
+
+class TestHydraulics(unittest.TestCase):
+    def test_tower_loop_balances_static_head(self):
+        model = HydraulicModel.from_yaml("tower_thermosyphon")
+        solution = model.solve(mix_ratio=0.60, condenser_height=0.4)
+        _, rho = mix_properties(0.60)
+        mu = model.fluid["viscosity_pa_s"]
+        spec = model._layouts({"condenser_height": 0.4})[0]
+        q = solution.nodes["flow_lpm"][0] * LPM
+        segment = dict(spec["manifold"], length_m=1e-3)
+        loss = 0.0
+        for r1, r2 in (_pipe(spec["downcomer"], rho, mu), _pipe(segment, rho, mu),
+                       _pipe(spec["branch_pipe"], rho, mu), _component(spec["cold_plate"]),
+                       _component(spec["turbine"])):
+            loss += r1 * q + r2 * q * q
+        self.assertAlmostEqual(loss, rho * G * 0.4, delta=1e-6)
+        # Less than the bare hydrostatic head, so the 0.4 m tower still fails
+        self.assertLess(solution.nodes["turbine_dp_pa"][0], rho * G * 0.4)
+        self.assertFalse(solution.gravity_head_passed()[0])
+
+    def test_batch_matches_individual_solves(self):
+        model = HydraulicModel.from_yaml("rack_thermosyphon")
+        sizes, heights = [4, 16, 32], [1.0, 1.5, 2.0]
+        batch = model.solve(n_nodes=sizes, condenser_height=heights, downcomer_length=2.0)
+        self.assertEqual(len(batch.nodes["flow_lpm"]), sum(sizes))
+        for i, (n, h) in enumerate(zip(sizes, heights)):
+            single = model.solve(n_nodes=n, condenser_height=h, downcomer_length=2.0)
+            sel = batch.nodes["rack"] == i
+            np.testing.assert_allclose(batch.nodes["flow_lpm"][sel], single.nodes["flow_lpm"], rtol=1e-8)
+            np.testing.assert_allclose(batch.nodes["turbine_dp_pa"][sel], single.nodes["turbine_dp_pa"], rtol=1e-8)
+            # Mass conservation and falling head with elevation
+            self.assertAlmostEqual(batch.racks["total_flow_lpm"][i], single.nodes["flow_lpm"].sum(), places=9)
+            self.assertTrue(np.all(np.diff(single.nodes["turbine_dp_pa"]) < 0))
+
+    def test_pump_parasitic(self):
+        result = evaluate_rack("rack_pumped", n_nodes=16, condenser_height=1.0, downcomer_length=1.5,
+                               pump_shutoff=[50.0, 150.0])
+        model = HydraulicModel.from_yaml("rack_pumped")
+        solution = model.solve(n_nodes=16, condenser_height=1.0, downcomer_length=1.5, pump_shutoff=[50.0, 150.0])
+        for rack in range(2):
+            sel = result["rack"] == rack
+            self.assertAlmostEqual(result["pump_parasitic_w"][sel].sum(), solution.racks["pump_power_w"][rack])
+        self.assertGreater(solution.racks["total_flow_lpm"][1], solution.racks["total_flow_lpm"][0])
+        self.assertTrue(np.all(solution.racks["pump_power_w"] > model.spec["pump"]["idle_w"]))
+        self.assertTrue(np.all(result["gravity_head_passed"]))
+        np.testing.assert_allclose(result["net_surplus_w"] + result["pump_parasitic_w"], 52.5)
+
+        passive = evaluate_rack("rack_thermosyphon", n_nodes=8, condenser_height=1.8, downcomer_length=2.0)
+        np.testing.assert_array_equal(passive["pump_parasitic_w"], 0.0)
+
+    def test_evaluator_gravity_head(self):
+        options = DesignEvaluator().evaluate()
+        test = options["OPTION_C"].tests["GRAVITY_HEAD_PRESSURE"]
+        self.assertFalse(test.passed)
+        self.assertLess(test.result_data["pressure_bar"], 0.1)
+
+    def test_evaluator_pump_load(self):
+        options = DesignEvaluator().evaluate()
+        rack = evaluate_rack("rack_pumped", **PUMPED_RACK)
+        self.assertAlmostEqual(options["OPTION_A"].parasitic_load_w, rack["pump_parasitic_w"].mean())
+        surplus = options["OPTION_A"].tests["NET_ENERGY_SURPLUS"].result_data["surplus_w"]
+        self.assertAlmostEqual(surplus, rack["net_surplus_w"].mean())
+
+    def test_invalid_models(self):
+        with self.assertRaises(ValueError):
+            HydraulicModel.from_yaml("no_such_loop")
+        model = HydraulicModel.from_yaml("rack_thermosyphon")
+        with self.assertRaises(ValueError):
+            model.solve(n_nodes=[4, 8], condenser_height=[1.0, 1.5, 2.0], downcomer_length=2.0)
+        with self.assertRaises(ValueError):
+            model.solve(n_nodes=4, condenser_height=1.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from moonshine import data, impact
+from moonshine.impact import ImpactAnalyzer, Logistics
+
+SIM_ROOT = Path(__file__).resolve().parent.parent
+
+ALT_DATA = """
+feedstocks:
+  TEST:
+    name: "Test Feedstock"
+    water_intensity_l_per_l: 1.0
+    carbon_intensity_kg_per_l: {carbon}
+    avg_price_usd_per_l: 1.0
+    typical_yield_l_per_hectare: 1000
+    water_scarcity_index: 1.0
+logistics:
+  emissions_per_kg_km:
+    TRUCK: 0.001
+    RAIL: 0.0001
+    SHIP: 0.00001
+"""
+
+class TestLazyData(unittest.TestCase):
+    def setUp(self):
+        self._cache = tempfile.TemporaryDirectory()
+        self._env = os.environ.get("MOONSHINE_CACHE_DIR")
+        os.environ["MOONSHINE_CACHE_DIR"] = self._cache.name
+
+    def tearDown(self):
+        impact.use_data_file(None)
+        if self._env is None:
+            del os.environ["MOONSHINE_CACHE_DIR"]
+        else:
+            os.environ["MOONSHINE_CACHE_DIR"] = self._env
+        self._cache.cleanup()
+
+    def test_import_does_not_parse_yaml(self):
+        # The cache directory is empty, so any eager data load would parse YAML
+        for module in ("moonshine.impact", "moonshine.evaluator", "moonshine.pcm", "moonshine.optimize"):
+            probe = f"import sys, {module}; print('yaml' in sys.modules)"
+            out = subprocess.run([sys.executable, "-c", probe], env=dict(os.environ, PYTHONPATH=str(SIM_ROOT)),
+                                 check=True, capture_output=True, text=True).stdout
+            self.assertEqual(out.strip(), "False", module)
+
+    def test_alternate_data_file_and_invalidation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "alt.yaml"
+            path.write_text(ALT_DATA.format(carbon=1.0))
+            impact.use_data_file(path)
+            self.assertEqual(list(impact.get_feedstocks()), ["TEST"])
+            self.assertEqual(Logistics.EMISSIONS_TRUCK, 0.001)
+            res = ImpactAnalyzer(volume_l=2.0).analyze_source("TEST", 100, "TRUCK")
+            self.assertAlmostEqual(res["total_carbon_kg"], 2.0 + 0.2)
+
+            # Edit the file: the compiled cache must not serve stale values
+            path.write_text(ALT_DATA.format(carbon=3.0))
+            os.utime(path, ns=(0, 123456789))
+            data.clear_memory_cache()
+            impact.use_data_file(path)
+            self.assertEqual(impact.get_feedstocks()["TEST"].carbon_intensity_kg_per_l, 3.0)
+
+        impact.use_data_file(None)
+        self.assertIn("CORN", impact.FEEDSTOCKS)
+
+class TestBatchAnalyzer(unittest.TestCase):
+    def test_batch_matches_analyze_source(self):
+        analyzer = ImpactAnalyzer(volume_l=5.0)
+        keys = ["CORN", "SUGAR_BEET", "SUGARCANE", "CELLULOSIC", "POTATO", "CORN"]
+        dists = [100, 1000, 8200, 50, 500, 0]
+        modes = ["TRUCK", "RAIL", "SHIP", "TRUCK", "TRUCK", "BARGE"]
+        batch = analyzer.analyze_batch(keys, dists, modes)
+        for i, (key, dist, mode) in enumerate(zip(keys, dists, modes)):
+            scalar = analyzer.analyze_source(key, dist, mode)
+            for column, value in scalar.items():
+                if column != "feedstock":
+                    self.assertAlmostEqual(batch[column][i], value, places=12)
+
+    def test_batch_volumes_and_unknown_feedstock(self):
+        analyzer = ImpactAnalyzer(volume_l=5.0)
+        batch = analyzer.analyze_batch("CORN", np.array([0.0, 10.0]), "TRUCK", volumes_l=np.array([1.0, 2.0]))
+        self.assertEqual(batch["total_carbon_kg"].shape, (2,))
+        self.assertAlmostEqual(batch["production_carbon_kg"][1], 2.4)
+        with self.assertRaises(ValueError):
+            analyzer.analyze_batch(["CORN", "BANANA"], [1, 2])
+
+    def test_batch_factor_columns(self):
+        analyzer = ImpactAnalyzer(volume_l=5.0)
+        base = analyzer.analyze_source("CORN", 100)
+        batch = analyzer.analyze_batch("CORN", 100, carbon_intensity_factor=np.array([1.0, 2.0]),
+                                       water_intensity_factor=0.5, emission_factor_scale=np.array([1.0, 3.0]))
+        np.testing.assert_allclose(batch["production_carbon_kg"], np.array([1.0, 2.0]) * base["production_carbon_kg"])
+        np.testing.assert_allclose(batch["transport_carbon_kg"], np.array([1.0, 3.0]) * base["transport_carbon_kg"])
+        np.testing.assert_allclose(batch["total_water_l"], 0.5 * base["total_water_l"])
+
+if __name__ == '__main__':
+    unittest.main()
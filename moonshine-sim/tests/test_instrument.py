@@ -0,0 +1,91 @@
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+from moonshine import instrument
+from moonshine.instrument import Profile, SpanStats, count, load_json, span
+from moonshine.thermo import Distiller
+from moonshine.uncertainty import run_uncertainty
+
+@span("test.inner")
+def inner():
+    time.sleep(0.001)
+
+@span("test.outer")
+def outer():
+    inner()
+    inner()
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        instrument.enable(reset=True)
+
+    def tearDown(self):
+        instrument.disable()
+        instrument.reset()
+
+    def test_disabled_records_nothing(self):
+        instrument.disable()
+        outer()
+        count("test.counter")
+        Distiller(0.6).analyze_node(350)
+        self.assertEqual(instrument.profile().spans, {})
+        self.assertEqual(instrument.profile().counters, {})
+
+    def test_nested_spans_and_counters(self):
+        outer()
+        with span("test.block"):
+            count("test.counter", 3)
+        Distiller(0.6).analyze_node(350)
+        profile = instrument.profile()
+        self.assertEqual(profile.spans["test.inner"].count, 2)
+        self.assertEqual(profile.spans["test.outer"].count, 1)
+        self.assertGreaterEqual(profile.spans["test.inner"].min_ns, 1_000_000)
+        self.assertEqual(profile.counters["test.counter"], 3)
+        self.assertEqual(profile.counters["thermo.Distiller.created"], 1)
+        self.assertIn("thermo.Distiller.analyze_node;thermo.analyze_nodes", profile.folded)
+        # Self times along the outer stack add up to the outer total
+        outer_total = profile.spans["test.outer"].total_ns
+        stacks = [ns for stack, ns in profile.folded.items() if stack.startswith("test.outer")]
+        self.assertEqual(sum(stacks), outer_total)
+        self.assertEqual(profile.folded["test.outer;test.inner"], profile.spans["test.inner"].total_ns)
+
+    def test_histogram_merge_and_export(self):
+        a, b = SpanStats(), SpanStats()
+        for ns in (1_000, 2_000, 4_000):
+            a.record(ns)
+        for ns in range(10_000, 110_000, 1_000):
+            b.record(ns)
+        a.merge(b)
+        self.assertEqual(a.count, 103)
+        self.assertEqual((a.min_ns, a.max_ns), (1_000, 109_000))
+        # One bucket is a factor of 2**(1/4)
+        self.assertAlmostEqual(float(a.quantile_ns(0.5)) / 58_000, 1, delta=0.2)
+
+        outer()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile")
+            instrument.profile().write_json(path + ".json")
+            instrument.profile().write_folded(path + ".folded")
+            loaded = load_json(path + ".json")
+            with open(path + ".folded") as f:
+                lines = f.read().splitlines()
+        self.assertEqual(loaded.spans["test.inner"].count, 2)
+        np.testing.assert_array_equal(loaded.spans["test.inner"].buckets, instrument.profile().spans["test.inner"].buckets)
+        self.assertIn("test.outer;test.inner", {line.rsplit(" ", 1)[0] for line in lines})
+        merged = Profile()
+        merged.merge(loaded)
+        merged.merge(loaded)
+        self.assertEqual(merged.spans["test.outer"].count, 2)
+        self.assertIn("test.outer", merged.report())
+
+    def test_worker_profiles_are_merged(self):
+        with span("test.run"):
+            run_uncertainty(2000, workers=2, streams=4, batch_size=500)
+        profile = instrument.profile()
+        self.assertEqual(profile.spans["uncertainty.stream"].count, 4)
+        self.assertIn("test.run;uncertainty.run_uncertainty;uncertainty.stream", profile.folded)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+from moonshine.evaluator import ARCHITECTURES
+from moonshine.impact import ImpactAnalyzer, get_feedstock_table
+from moonshine.optimize import optimize_design
+from moonshine.startup import solve_startup
+from moonshine.thermo import boiling_point, flash_point
+
+MIX = np.linspace(0.05, 0.95, 37)
+FILL = np.linspace(1.0, 12.0, 23)
+
+def brute_force(objective, min_flash_point_c=20.0, min_startup_margin_s=60.0):
+    # Every candidate of the full grid, filtered and sorted directly
+    codes = get_feedstock_table().codes
+    keys = list(ARCHITECTURES)
+    m, v, f, o = (a.ravel() for a in np.meshgrid(np.arange(len(MIX)), np.arange(len(FILL)),
+                                                 np.arange(len(codes)), np.arange(len(keys)), indexing="ij"))
+    mix, fill = MIX[m], FILL[v]
+    surplus = 350 * 0.15 - np.array([ARCHITECTURES[k].parasitic_load_w for k in keys])[o]
+    carbon = ImpactAnalyzer(volume_l=1.0).analyze_batch(np.array(codes)[f], 100)["total_carbon_kg"] * fill
+    buffer = solve_startup(tdp_watts=350, fluid_volume_ml=fill * 100, mix_ratio=mix)["vapor_buffer_s"]
+    ok = ((boiling_point(mix) <= 85) & (flash_point(mix) >= min_flash_point_c)
+          & (np.nan_to_num(buffer, nan=-np.inf) >= min_startup_margin_s) & (surplus > 0))
+    per_w = carbon / surplus
+    primary, secondary = (-surplus, per_w) if objective == "surplus" else (per_w, -surplus)
+    order = np.lexsort((secondary[ok], primary[ok]))
+    return int(ok.sum()), primary[ok][order], secondary[ok][order]
+
+class TestOptimize(unittest.TestCase):
+    def test_matches_brute_force(self):
+        for objective in ("surplus", "carbon_per_watt"):
+            n_feasible, primary, secondary = brute_force(objective)
+            result = optimize_design(MIX, FILL, objective=objective, top_k=15, chunk_pairs=7)
+            self.assertEqual(result.candidates, len(MIX) * len(FILL) * len(get_feedstock_table().codes) * 3)
+            self.assertEqual(result.feasible, n_feasible)
+            self.assertEqual(result.candidates - sum(result.pruned.values()), n_feasible)
+            best = result.best
+            got_primary = -best["surplus_w"] if objective == "surplus" else best["carbon_per_w"]
+            np.testing.assert_allclose(got_primary, primary[:15])
+            # Bound pruning skipped part of the feasible set without changing the answer
+            self.assertGreater(result.bounded, 0)
+            self.assertEqual(result.scored + result.bounded, n_feasible)
+            # Every reported design satisfies the constraints
+            self.assertTrue(np.all(best["boiling_point_c"] <= 85))
+            self.assertTrue(np.all(best["flash_point_c"] >= 20))
+            self.assertTrue(np.all(best["vapor_buffer_s"] >= 60))
+            np.testing.assert_allclose(best["carbon_per_w"], best["total_carbon_kg"] / best["surplus_w"])
+
+    def test_constraints_prune(self):
+        stable = optimize_design(MIX, FILL, require_thermal_stability=True, top_k=5)
+        self.assertTrue(np.all(stable.best["option"] == "OPTION_A"))
+        self.assertAlmostEqual(stable.best["surplus_w"][0], 350 * 0.15 - ARCHITECTURES["OPTION_A"].parasitic_load_w)
+
+        nothing = optimize_design(MIX, FILL, min_flash_point_c=70.0)
+        self.assertEqual(nothing.feasible, 0)
+        self.assertEqual(len(nothing.best["mix_ratio"]), 0)
+        self.assertEqual(nothing.pruned["boiling_flash_point"], nothing.candidates)
+
+        # A stricter startup margin needs a larger fill
+        loose = optimize_design(MIX, FILL, min_startup_margin_s=30.0, top_k=1)
+        strict = optimize_design(MIX, FILL, min_startup_margin_s=75.0, top_k=1)
+        self.assertLess(loose.best["fill_volume_l"][0], strict.best["fill_volume_l"][0])
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            optimize_design(objective="cost")
+        with self.assertRaises(ValueError):
+            optimize_design(mix_ratio=[0.0, 0.5])
+        with self.assertRaises(ValueError):
+            optimize_design(feedstock=["UNOBTAINIUM"])
+
+if __name__ == "__main__":
+    unittest.main()
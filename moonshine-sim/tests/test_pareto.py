@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+from moonshine.impact import ImpactAnalyzer
+from moonshine.pareto import ParetoFront, dominance_layers, pareto_front, select_sourcing
+
+def _brute_front(x):
+    return np.nonzero(~np.array([((x <= p).all(1) & (x < p).any(1)).any() for p in x]))[0]
+
+class TestParetoSelector(unittest.TestCase):
+    def test_front_matches_brute_force(self):
+        rng = np.random.default_rng(7)
+        for k in (2, 3, 4):
+            # Integer grids produce plenty of ties and duplicate rows
+            x = rng.integers(0, 6, (600, k)).astype(float)
+            np.testing.assert_array_equal(pareto_front(x), _brute_front(x))
+            x = rng.random((600, k))
+            np.testing.assert_array_equal(pareto_front(x), _brute_front(x))
+
+    def test_incremental_insert_matches_batch(self):
+        rng = np.random.default_rng(3)
+        x = rng.random((3000, 3))
+        front = ParetoFront(3)
+        for batch in np.array_split(x, 11):
+            front.insert(batch)
+        np.testing.assert_array_equal(np.sort(front.ids), pareto_front(x))
+
+    def test_layers_peel_fronts(self):
+        x = np.array([[1, 1, 1], [2, 2, 2], [3, 3, 3], [1, 3, 3], [3, 3, 3]], dtype=float)
+        np.testing.assert_array_equal(dominance_layers(x), [0, 1, 2, 1, 2])
+        np.testing.assert_array_equal(dominance_layers(x, max_layers=1), [0, 1, 1, 1, 1])
+        # Only the first few layers are peeled unless asked for
+        chain = np.arange(10.0)[:, None].repeat(3, axis=1)
+        np.testing.assert_array_equal(dominance_layers(chain), [0, 1, 2] + [3] * 7)
+        np.testing.assert_array_equal(dominance_layers(chain, max_layers=None), np.arange(10))
+
+    def test_select_sourcing(self):
+        results = ImpactAnalyzer(volume_l=5.0).analyze_batch(
+            ["CORN", "SUGAR_BEET", "SUGARCANE", "CELLULOSIC", "POTATO"], [100, 1000, 8200, 50, 500],
+            ["TRUCK", "RAIL", "SHIP", "TRUCK", "TRUCK"])
+        front, layers = select_sourcing(results)
+        # Beet trades carbon for water against cane; corn and potato lose on all three
+        np.testing.assert_array_equal(front, [1, 2, 3])
+        np.testing.assert_array_equal(layers[[0, 4]], [1, 2])
+
+if __name__ == '__main__':
+    unittest.main()
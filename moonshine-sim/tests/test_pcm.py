@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+from moonshine.designs import Dimensions
+from moonshine.pareto import pareto_front
+from moonshine.pcm import canister_envelope, feasible_mask, load_pcm_catalogue, optimize_thermal_battery, size_grid
+
+class TestPCMSizing(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.catalogue = load_pcm_catalogue()
+
+    def test_grid_matches_hand_sizing(self):
+        # Original single-material sizing: 300 W for 5 min of Ba(OH)2.8H2O at r = 3 cm
+        i = self.catalogue["code"].index("BA_OH2_8H2O")
+        grid = size_grid([5, 10], [300, 600, 900], [0.02, 0.03], self.catalogue)
+        self.assertEqual(grid["mass_kg"].shape, (len(self.catalogue["code"]), 2, 2, 3))
+        mass = 300 * 5 * 60 / 265e3
+        self.assertAlmostEqual(grid["mass_kg"][i, 1, 0, 0], mass)
+        self.assertAlmostEqual(grid["volume_l"][i, 1, 0, 0], mass / 2180 * 1000)
+        self.assertAlmostEqual(grid["length_m"][i, 1, 0, 0], mass / 2180 / (np.pi * 0.03 ** 2))
+        self.assertAlmostEqual(grid["mass_kg"][i, 0, 1, 2], 6 * mass)
+
+    def test_envelope_pruning(self):
+        self.assertEqual(canister_envelope(Dimensions.TOWER_V1), (140.0, 400.0))
+        self.assertEqual(canister_envelope(Dimensions.RICKHOUSE_2U), (88.0, 700.0))
+        grid = size_grid(30, 3000, [0.04, 0.05], self.catalogue)
+        ok = feasible_mask(grid, self.catalogue, Dimensions.RICKHOUSE_2U)
+        self.assertFalse(ok[:, 1].any())  # 100 mm diameter exceeds 2U
+        np.testing.assert_array_equal(ok[:, 0], grid["length_m"][:, 0] <= 0.7)
+
+    def test_front_is_feasible_and_non_dominated(self):
+        runtimes, loads = [5, 15, 30], [300, 1000, 3000]
+        front = optimize_thermal_battery(runtimes, loads, sku=Dimensions.RICKHOUSE_2U, min_melting_point_c=80.0,
+                                         fill_fraction=0.85)
+        self.assertTrue(np.all(front["melting_point_c"] >= 80.0))
+        self.assertTrue(np.all(front["radius_m"] * 2000 <= 88.0 + 1e-9))
+        self.assertTrue(np.all(front["length_m"] <= 0.7))
+        # Brute force per requirement over every feasible material x radius
+        grid = size_grid(runtimes, loads, catalogue=self.catalogue, fill_fraction=0.85)
+        ok = feasible_mask(grid, self.catalogue, Dimensions.RICKHOUSE_2U, min_melting_point_c=80.0)
+        for t, runtime in enumerate(runtimes):
+            for w, load in enumerate(loads):
+                rows = (front["runtime_min"] == runtime) & (front["thermal_load_w"] == load)
+                m, r = np.nonzero(ok[:, :, t, w])
+                objs = np.column_stack([grid[k][m, r, t, w] for k in ("mass_kg", "volume_l", "length_m")])
+                expected = objs[pareto_front(objs)] if len(objs) else np.empty((0, 3))
+                got = np.column_stack([front[k][rows] for k in ("mass_kg", "volume_l", "length_m")])
+                np.testing.assert_allclose(np.sort(got, axis=0), np.sort(expected, axis=0))
+        self.assertFalse(np.any((front["runtime_min"] == 30) & (front["thermal_load_w"] == 3000)))
+
+if __name__ == '__main__':
+    unittest.main()
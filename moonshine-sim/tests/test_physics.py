@@ -1,15 +1,40 @@
 import unittest
-from moonshine.thermo import Distiller
+import numpy as np
+from moonshine.thermo import Distiller, analyze_nodes
 
 class TestDistillerPhysics(unittest.TestCase):
     def test_h100_flow_rate(self):
         still = Distiller(mix_ratio=0.60)
         # Test with 350W load
-        _, flow_rate, power = still.analyze_node(tdp_watts=350)
+        data = still.analyze_node(tdp_watts=350)
+        flow_rate = data["vol_flow_ml_min"]
+        power = data["recovered_power_w"]
         
         # Expect flow roughly 15mL/min
         self.assertTrue(10 < flow_rate < 20, f"Flow rate {flow_rate} outside expected range")
         self.assertGreater(power, 0)
 
+    def test_batch_matches_scalar(self):
+        mixes = np.array([0.0, 0.005, 0.35, 0.60, 0.95])
+        tdps = np.array([200.0, 350.0, 700.0, 1000.0, 150.0])
+        batch = analyze_nodes(mixes, tdps, 0.2)
+        for i, (mix, tdp) in enumerate(zip(mixes, tdps)):
+            still = Distiller(mix_ratio=mix)
+            scalar = still.analyze_node(tdp, turbine_efficiency=0.2)
+            for key, value in scalar.items():
+                self.assertAlmostEqual(batch[key][i], value, places=9)
+            self.assertAlmostEqual(batch["flash_point_c"][i], still.get_flash_point(), places=9)
+
+    def test_batch_broadcasts(self):
+        batch = analyze_nodes(np.linspace(0.4, 0.8, 5)[:, None], np.array([350.0, 700.0]))
+        self.assertEqual(batch["mass_flow_kg_s"].shape, (5, 2))
+        self.assertEqual(batch["boiling_point_c"].shape, (5, 2))
+
+    def test_property_overrides_broadcast(self):
+        batch = analyze_nodes(0.6, 350, h_vap_water=np.array([2260.0, 2000.0]))
+        self.assertEqual(batch["boiling_point_c"].shape, (2,))
+        self.assertAlmostEqual(batch["vol_flow_ml_min"][0], Distiller(0.6).analyze_node(350)["vol_flow_ml_min"])
+        self.assertGreater(batch["mass_flow_kg_s"][1], batch["mass_flow_kg_s"][0])
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
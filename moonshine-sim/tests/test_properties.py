@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from moonshine import properties
+from moonshine.data import load_yaml
+from moonshine.thermo import Distiller, boiling_point
+
+class TestVLETables(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.spec = load_yaml(properties.DEFAULT_PROPERTIES_PATH)
+        cls.table = properties.get_vle_table()
+
+    def test_tables_match_rigorous_solve_off_grid(self):
+        rng = np.random.default_rng(5)
+        x = rng.uniform(0, 1, 500)
+        p = np.exp(rng.uniform(np.log(0.2 * properties.P_ATM), np.log(5 * properties.P_ATM), 500))
+        t_exact, y_exact = properties.solve_bubble_point(x, p, self.spec)
+        np.testing.assert_allclose(self.table.bubble_point(x, p), t_exact, atol=0.05)
+        np.testing.assert_allclose(self.table.vapor_composition(x, p), y_exact, atol=5e-3)
+
+    def test_known_equilibrium_points(self):
+        # Azeotrope near x = 0.894 mole fraction, 78.2 C at 1 atm
+        x = self.table.x
+        t = self.table.bubble_point(x)
+        self.assertAlmostEqual(x[np.argmin(t)], 0.894, delta=0.02)
+        self.assertAlmostEqual(t.min(), 78.15, delta=0.3)
+        self.assertAlmostEqual(float(self.table.bubble_point(0.0)), 100.0, delta=0.05)
+        # Boiling point rises with pressure
+        self.assertLess(boiling_point(0.6, 0.5 * properties.P_ATM), boiling_point(0.6) - 10)
+        self.assertGreater(Distiller(0.6).get_boiling_point(2 * properties.P_ATM), boiling_point(0.6) + 15)
+
+    def test_dew_point_consistent_with_bubble_point(self):
+        mix = np.linspace(0.02, 0.9, 30)
+        for pressure in (0.5 * properties.P_ATM, properties.P_ATM, 3 * properties.P_ATM):
+            vapor = properties.vapor_mix_ratio(mix, pressure)
+            np.testing.assert_allclose(properties.dew_point(vapor, pressure),
+                                       properties.boiling_point(mix, pressure), atol=0.05)
+        np.testing.assert_allclose(properties.boiling_point(mix), properties.boiling_point(mix, properties.P_ATM),
+                                   atol=1e-3)
+
+    def test_latent_heat_and_units(self):
+        h = properties.latent_heat(np.array([0.0, 1.0]))
+        self.assertAlmostEqual(h[0], 2257, delta=10)
+        self.assertAlmostEqual(h[1], 838, delta=10)
+        mix = np.linspace(0, 1, 11)
+        np.testing.assert_allclose(self.table.mole_to_volume(self.table.volume_to_mole(mix)), mix, atol=1e-12)
+        with self.assertRaises(ValueError):
+            properties.boiling_point(0.6, 100.0)
+
+    def test_tables_persisted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["MOONSHINE_CACHE_DIR"] = tmp
+            try:
+                first = properties.load_vle_table()
+                files = os.listdir(os.path.join(tmp, "properties"))
+                self.assertEqual(len(files), 1)
+                second = properties.load_vle_table()
+            finally:
+                del os.environ["MOONSHINE_CACHE_DIR"]
+        np.testing.assert_array_equal(first.bubble_t_c, second.bubble_t_c)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from moonshine import rayleigh
+from moonshine.properties import P_ATM, boiling_point, vapor_mix_ratio
+
+def stepped_evaporation(initial_mix, fractions, step=1e-4):
+    # Reference: the original demo's explicit loop with a tiny step
+    mix, volume, out = initial_mix, 1.0, []
+    for target in fractions:
+        while 1.0 - volume < target - 1e-12:
+            dv = min(volume * step, volume - (1.0 - target))
+            mix = (volume * mix - dv * vapor_mix_ratio(mix)) / (volume - dv)
+            volume -= dv
+        out.append(mix)
+    return np.array(out)
+
+class TestRayleigh(unittest.TestCase):
+    def test_batch_matches_stepped_reference(self):
+        fractions = np.array([0.0, 0.2, 0.5])
+        chunks = list(rayleigh.iter_evaporation([500, 1000], [[0.3], [0.6], [0.8]], fractions, chunk_size=4))
+        self.assertEqual([c.start for c in chunks], [0, 4])
+        mix = np.vstack([c.mix_ratio for c in chunks])
+        self.assertEqual(mix.shape, (6, 3))
+        for row, m0 in zip(mix, (0.3, 0.3, 0.6, 0.6, 0.8, 0.8)):
+            np.testing.assert_allclose(row, stepped_evaporation(m0, fractions), atol=2e-3)
+        np.testing.assert_allclose(chunks[0].volume_ml[1], [1000, 800, 500])
+        np.testing.assert_allclose(chunks[0].boiling_point_c, boiling_point(chunks[0].mix_ratio))
+
+    def test_crossing_fraction_agrees_with_trajectory(self):
+        m0 = np.array([0.45, 0.6, 0.75])
+        fraction = rayleigh.evaporated_fraction_at_boiling_point(m0, 85.0)
+        grid = np.linspace(0.0, 0.99, 500)
+        chunk = next(rayleigh.iter_evaporation(1000, m0, grid))
+        for i in range(len(m0)):
+            self.assertAlmostEqual(fraction[i], np.interp(85.0, chunk.boiling_point_c[i], grid), delta=1e-3)
+        self.assertAlmostEqual(float(rayleigh.volume_at_boiling_point(1000, 0.6, 85.0)), 1000 * (1 - fraction[1]))
+
+    def test_crossing_edge_cases(self):
+        f = rayleigh.evaporated_fraction_at_boiling_point([0.2, 0.99, 0.6, 0.6], [85.0, 85.0, 101.0, 70.0])
+        self.assertEqual(f[0], 0.0)           # already boils above the target
+        self.assertEqual(f[1], np.inf)        # past the azeotrope, gets richer
+        self.assertEqual(f[2], np.inf)        # above the boiling point of water
+        self.assertEqual(f[3], 0.0)           # below the azeotrope temperature
+        low = rayleigh.evaporated_fraction_at_boiling_point(0.6, 75.0, pressure_pa=0.7 * P_ATM)
+        self.assertTrue(0 < low < 1)
+        with self.assertRaises(ValueError):
+            next(rayleigh.iter_evaporation(1000, 0.6, [0.5, 0.2]))
+
+    def test_columnar_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = rayleigh.write_evaporation(tmp, 1000, np.linspace(0.3, 0.8, 10), [0.0, 0.3], chunk_size=3)
+            mix = np.load(paths["mix_ratio"])
+            self.assertEqual(mix.shape, (10, 2))
+            np.testing.assert_allclose(mix[:, 0], np.linspace(0.3, 0.8, 10))
+            expected = np.vstack([c.mix_ratio for c in rayleigh.iter_evaporation(1000, np.linspace(0.3, 0.8, 10), [0.0, 0.3])])
+            np.testing.assert_allclose(mix, expected, atol=1e-6)
+            self.assertTrue(os.path.exists(paths["boiling_point_c"]))
+
+if __name__ == '__main__':
+    unittest.main()
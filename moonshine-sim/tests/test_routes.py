@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from moonshine.impact import ImpactAnalyzer, Logistics
+from moonshine.routes import LogisticsNetwork, load_network
+
+def _toy_network():
+    # origin -> site directly by truck, or via a port by ship + truck
+    nodes = {
+        "FARM": {"type": "origin", "feedstock": "SUGARCANE"},
+        "PORT_A": {"type": "port"},
+        "PORT_B": {"type": "port"},
+        "DC": {"type": "site"},
+        "ISLAND": {"type": "site"},
+    }
+    modes, _ = Logistics.emission_table()
+    m = {mode: i for i, mode in enumerate(modes)}
+    edges = [
+        (0, 3, m["TRUCK"], 3000.0),
+        (0, 1, m["TRUCK"], 100.0),
+        (1, 2, m["SHIP"], 5000.0),
+        (1, 2, m["TRUCK"], 2500.0),  # parallel edge, worse for carbon
+        (2, 3, m["TRUCK"], 200.0),
+    ]
+    src, dst, mode, km = zip(*edges)
+    return LogisticsNetwork(nodes, src, dst, mode, km)
+
+class TestRouteOptimizer(unittest.TestCase):
+    def test_min_carbon_route_uses_ship(self):
+        solution = _toy_network().shortest_routes("carbon")
+        route = solution.route("FARM", "DC")
+        self.assertEqual([leg[2] for leg in route.legs], ["TRUCK", "SHIP", "TRUCK"])
+        expected = Logistics.calculate_route_impact(1.0, route.transport_legs)
+        self.assertAlmostEqual(route.carbon_kg_per_l, expected)
+        self.assertTrue(np.isinf(solution.carbon_kg_per_l[0, solution.sites.index("ISLAND")]))
+
+    def test_results_feed_impact_analyzer(self):
+        analyzer = ImpactAnalyzer(volume_l=5.0)
+        solution = _toy_network().shortest_routes("carbon", sites=["DC"])
+        batch = solution.analyze(analyzer)
+        route = solution.route("FARM", "DC")
+        scalar = analyzer.analyze_route("SUGARCANE", route.transport_legs)
+        self.assertAlmostEqual(batch["total_carbon_kg"][0], scalar["total_carbon_kg"])
+
+    def test_default_network_loads(self):
+        solution = load_network().shortest_routes("cost")
+        self.assertTrue(np.isfinite(solution.cost_usd_per_l).all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from unittest import mock
+import numpy as np
+from moonshine import sensitivity
+from moonshine.sensitivity import SobolAccumulator, ppf, run_morris, run_sobol
+
+# Ishigami function: analytic Sobol indices for a nonlinear, interacting model
+ISHIGAMI = {
+    "outputs": ["y"],
+    "factors": {name: {"dist": "uniform", "low": -np.pi, "high": np.pi} for name in ("x1", "x2", "x3")},
+}
+
+def ishigami(p):
+    return {"y": np.sin(p["x1"]) + 7 * np.sin(p["x2"]) ** 2 + 0.1 * p["x3"] ** 4 * np.sin(p["x1"])}
+
+class TestSensitivity(unittest.TestCase):
+    def test_sobol_matches_ishigami(self):
+        with mock.patch.dict(sensitivity.MODELS, {"ishigami": ishigami}):
+            names, stats = run_sobol("ishigami", 1 << 15, models={"ishigami": ISHIGAMI}, workers=1,
+                                     batch_size=4096)
+        self.assertEqual(names, ["x1", "x2", "x3"])
+        y = stats["y"]
+        self.assertEqual(y.count, 1 << 15)
+        np.testing.assert_allclose(y.first_order, [0.3139, 0.4424, 0.0], atol=0.02)
+        np.testing.assert_allclose(y.total, [0.5576, 0.4424, 0.2437], atol=0.02)
+
+    def test_merge_matches_single_accumulator(self):
+        rng = np.random.default_rng(1)
+        f_a, f_b = rng.normal(5, 2, 1000), rng.normal(5, 2, 1000)
+        f_ab = f_a + rng.normal(0, 1, (3, 1000))
+        whole = SobolAccumulator(3)
+        # Same shift as the merged result, which takes it from its first part
+        whole.shift = float(f_a[:100].mean())
+        whole.update(f_a, f_b, f_ab)
+        parts = SobolAccumulator(3)
+        for lo, hi in ((0, 100), (100, 700), (700, 1000)):
+            part = SobolAccumulator(3)
+            part.update(f_a[lo:hi], f_b[lo:hi], f_ab[:, lo:hi])
+            parts.merge(part)
+        self.assertAlmostEqual(parts.variance, whole.variance)
+        np.testing.assert_allclose(parts.first_order, whole.first_order)
+        np.testing.assert_allclose(parts.total, whole.total)
+
+    def test_node_model_drivers(self):
+        names, stats = run_sobol("node", 1 << 14, workers=1)
+        power = stats["recovered_power_w"]
+        # Recovered power ignores the mix; boiling point depends on nothing else
+        self.assertLess(abs(power.total[names.index("mix_ratio")]), 1e-9)
+        self.assertGreater(power.first_order[names.index("tdp_watts")], 0.9)
+        np.testing.assert_allclose(stats["boiling_point_c"].total, [1, 0, 0], atol=0.02)
+
+        names, effects = run_morris("node", 500, workers=1)
+        self.assertEqual(effects["boiling_point_c"].count.sum(), 500 * len(names))
+        self.assertEqual(effects["recovered_power_w"].mu_star[names.index("mix_ratio")], 0.0)
+        # Power is linear in each factor but they interact (TDP x efficiency)
+        self.assertGreater(effects["recovered_power_w"].sigma[names.index("tdp_watts")], 0)
+
+    def test_reproducible_across_workers(self):
+        kwargs = dict(n_samples=3000, seed=5, streams=4, batch_size=512)
+        serial_names, serial = run_sobol("impact", workers=1, **kwargs)
+        _, parallel = run_sobol("impact", workers=2, **kwargs)
+        for name in serial:
+            np.testing.assert_array_equal(serial[name].first_order, parallel[name].first_order)
+            np.testing.assert_array_equal(serial[name].total, parallel[name].total)
+        self.assertIn("feedstock", serial_names)
+        self.assertNotIn("mode", serial_names)
+
+    def test_ppf(self):
+        u = np.linspace(0, 1, 5)
+        np.testing.assert_allclose(ppf({"dist": "uniform", "low": 2, "high": 4}, u), [2, 2.5, 3, 3.5, 4])
+        tri = ppf({"dist": "triangular", "low": 0, "mode": 1, "high": 4}, u)
+        self.assertAlmostEqual(tri[0], 0)
+        self.assertAlmostEqual(tri[-1], 4)
+        self.assertTrue(np.all(np.diff(tri) > 0))
+        self.assertTrue(np.all(np.isfinite(ppf({"dist": "normal", "mean": 0, "std": 1}, u))))
+        self.assertEqual(list(ppf({"dist": "choice", "values": ["A", "B"]}, [0.0, 0.49, 0.5, 1.0])),
+                         ["A", "A", "B", "B"])
+        with self.assertRaises(ValueError):
+            ppf({"dist": "cauchy"}, u)
+
+    def test_invalid_requests(self):
+        with self.assertRaises(ValueError):
+            run_sobol("fleet", 10, workers=1)
+        with self.assertRaises(ValueError):
+            run_morris("node", 10, levels=1, workers=1)
+        with self.assertRaises(ValueError):
+            run_sobol("node", 10, outputs=["surplus_w"], workers=1)
+
+if __name__ == "__main__":
+    unittest.main()
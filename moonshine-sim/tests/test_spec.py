@@ -0,0 +1,90 @@
+import copy
+import os
+import pickle
+import tempfile
+import time
+import unittest
+import yaml
+from moonshine import spec as spec_module
+from moonshine.designs import Dimensions, hardware_spec
+from moonshine.spec import ParamSet, compile_spec, load_spec
+
+class TestHardwareSpec(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(spec_module.DEFAULT_SPEC_PATH) as f:
+            cls.raw = yaml.safe_load(f)
+
+    def test_units_converted_to_si(self):
+        spec = load_spec()
+        self.assertAlmostEqual(spec.drivetrain.shaft_length_m, 0.14)
+        self.assertAlmostEqual(spec.drivetrain.shaft_radius_m, 0.004)
+        self.assertAlmostEqual(spec.thermal.copper_mass_kg, 0.5)
+        self.assertAlmostEqual(spec.thermal.fluid_volume_m3, 5e-4)
+        self.assertAlmostEqual(spec.drivetrain.break_shaft_cold_m, 0.10)
+        self.assertEqual(spec.tracks.TOWER_V1.max_footprint_m, (0.14, 0.14))
+        self.assertEqual(spec.track("RICKHOUSE_2U").max_height_m, Dimensions.RICKHOUSE_2U["max_height_mm"] / 1000)
+        self.assertEqual(spec.drivetrain.shaft_material, "STAINLESS_STEEL")
+
+    def test_objects_are_slotted_and_immutable(self):
+        drivetrain = load_spec().drivetrain
+        self.assertIsInstance(drivetrain, ParamSet)
+        self.assertFalse(hasattr(drivetrain, "__dict__"))
+        with self.assertRaises(AttributeError):
+            drivetrain.shaft_length_m = 1.0
+        with self.assertRaises(AttributeError):
+            drivetrain.new_field = 1.0
+        clone = pickle.loads(pickle.dumps(load_spec()))
+        self.assertEqual(clone.drivetrain, drivetrain)
+        self.assertEqual(clone.variant_names(), load_spec().variant_names())
+
+    def test_variants_override_and_share(self):
+        spec = hardware_spec()
+        short = hardware_spec("short_shaft")
+        self.assertAlmostEqual(short.drivetrain.shaft_length_m, 0.10)
+        self.assertIs(short.thermal, spec.thermal)
+        self.assertEqual(spec.variant("full_thermal_break").drivetrain.shaft_material, "INVAR")
+        with self.assertRaises(ValueError):
+            spec.variant("missing")
+
+    def test_validation_errors(self):
+        cases = [
+            (lambda r: r.pop("drivetrain"), "drivetrain"),
+            (lambda r: r.update(version=2), "version"),
+            (lambda r: r["drivetrain"].update(shaft_length_mm="long"), "shaft_length_mm"),
+            (lambda r: r["thermal"].update(copper_mass_g=-1), "copper_mass_g"),
+            (lambda r: r["tracks"]["TOWER_V1"].pop("max_height_mm"), "max_height_mm"),
+            (lambda r: r["variants"].append({"name": "x", "drivetrain.shaft_width_mm": 3}), "shaft_width_mm"),
+            (lambda r: r["variants"].append({"name": "short_shaft", "thermal.mix_ratio": 0.5}), "Duplicate"),
+        ]
+        for edit, message in cases:
+            raw = copy.deepcopy(self.raw)
+            edit(raw)
+            with self.assertRaisesRegex(ValueError, message):
+                compile_spec(raw)
+
+    def test_compiled_spec_cached_per_file_hash(self):
+        raw = copy.deepcopy(self.raw)
+        raw["variants"] = [{"name": f"v{i}", "drivetrain.shaft_length_mm": 100 + i % 40,
+                            "thermal.copper_mass_g": 300 + i} for i in range(400)]
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["MOONSHINE_CACHE_DIR"] = tmp
+            try:
+                path = os.path.join(tmp, "variants.yaml")
+                with open(path, "w") as f:
+                    yaml.safe_dump(raw, f)
+                first = load_spec(path)
+                self.assertEqual(len(os.listdir(os.path.join(tmp, "spec"))), 1)
+                spec_module.clear_memory_cache()
+                start = time.perf_counter()
+                second = load_spec(path)
+                self.assertLess(time.perf_counter() - start, 0.5)
+                self.assertEqual(second.variant("v399").thermal.copper_mass_kg, first.variant("v399").thermal.copper_mass_kg)
+                self.assertEqual(second.sha256, first.sha256)
+                self.assertIs(load_spec(path), second)
+            finally:
+                del os.environ["MOONSHINE_CACHE_DIR"]
+                spec_module.clear_memory_cache()
+
+if __name__ == '__main__':
+    unittest.main()
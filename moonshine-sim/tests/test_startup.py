@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+from moonshine.startup import solve_startup, system_heat_capacity
+from moonshine.thermo import boiling_point
+
+class TestStartupSolver(unittest.TestCase):
+    def test_matches_stepped_warmup(self):
+        # Reference: the original 1 s stepping loop
+        tdp, volume, ambient = 350.0, 500.0, 20.0
+        capacity = float(system_heat_capacity(volume))
+        bp = float(boiling_point(0.60))
+        temp, boil_time = ambient, None
+        for s in range(1, 3601):
+            temp += tdp / capacity
+            if temp >= bp:
+                boil_time = s
+                break
+        result = solve_startup(tdp, volume, ambient)
+        self.assertEqual(np.ceil(result["boil_time_s"]), boil_time)
+
+    def test_grid_and_heat_loss(self):
+        tdp = np.array([350.0, 700.0, 1000.0])[:, None, None]
+        volume = np.array([250.0, 500.0, 1000.0])[None, :, None]
+        ambient = np.array([15.0, 25.0, 35.0])[None, None, :]
+        lossless = solve_startup(tdp, volume, ambient)
+        lossy = solve_startup(tdp, volume, ambient, loss_w_per_k=2.0)
+        self.assertEqual(lossless["vapor_buffer_s"].shape, (3, 3, 3))
+        self.assertTrue(np.all(lossy["boil_time_s"] > lossless["boil_time_s"]))
+        self.assertTrue(np.all(lossless["vapor_buffer_s"] > 0))
+
+    def test_unreachable_boil_is_inf(self):
+        # 50 W against a 5 W/K loss never gets more than 10 K above ambient
+        result = solve_startup(50.0, 500.0, 20.0, loss_w_per_k=5.0)
+        self.assertTrue(np.isinf(result["boil_time_s"]))
+        self.assertTrue(np.isinf(result["meltdown_time_s"]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import tempfile
+import unittest
+import numpy as np
+from moonshine.evaluator import run_evaluation
+from moonshine.impact import ImpactAnalyzer
+from moonshine.store import ResultStore, design_records
+from moonshine.sweep import run_sweep
+from moonshine.thermo import Distiller
+
+GRID = ([350.0, 700.0], [2.0, 5.0, 9.0], ["CORN", "CELLULOSIC"], [50.0, 100.0, 4000.0])
+
+class TestResultStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def make_store(self):
+        rng = np.random.default_rng(3)
+        store = ResultStore(self.tmp.name)
+        # Sorted by x, so chunks cover disjoint ranges of it
+        x = np.arange(10_000, dtype=float)
+        columns = {"x": x, "y": rng.normal(size=x.size), "flag": x % 3 == 0,
+                   "group": (x % 4).astype(np.int32), "label": np.where(x < 5000, "low", "high")}
+        store.append(columns, chunk_rows=1000)
+        return store, columns
+
+    def test_query_matches_numpy_and_skips_chunks(self):
+        store, columns = self.make_store()
+        self.assertEqual(len(store), 10_000)
+        self.assertEqual(len(store.chunks), 10)
+        where = [("x", ">=", 2500), ("x", "<", 4200), ("y", ">", 0)]
+        self.assertEqual(len(store.chunks_matching(where)), 3)
+        result = store.query(where, columns=["x", "y", "label"])
+        mask = (columns["x"] >= 2500) & (columns["x"] < 4200) & (columns["y"] > 0)
+        np.testing.assert_array_equal(result["x"], columns["x"][mask])
+        np.testing.assert_array_equal(result["y"], columns["y"][mask])
+        self.assertTrue(np.all(result["label"] == "low"))
+        self.assertEqual(len(store.chunks_matching(("label", "==", "high"))), 5)
+        self.assertEqual(len(store.chunks_matching(("x", "in", [5, 9999]))), 2)
+        self.assertEqual(len(store.query(("x", ">", 1e9))["x"]), 0)
+
+    def test_reopen_append_and_aggregate(self):
+        store, columns = self.make_store()
+        reopened = ResultStore(self.tmp.name)
+        reopened.append({"x": [10_000.0], "y": [np.nan], "flag": [True], "group": [1], "label": ["extra-long"]})
+        self.assertEqual(len(ResultStore(self.tmp.name)), 10_001)
+
+        total = reopened.aggregate("y", where=("flag", "==", True))
+        expected = columns["y"][columns["flag"]]
+        self.assertEqual(total["count"], len(expected))
+        self.assertAlmostEqual(total["mean"], expected.mean())
+        self.assertAlmostEqual(total["max"], expected.max())
+
+        grouped = reopened.aggregate("y", by="group")
+        np.testing.assert_array_equal(grouped["keys"], [0, 1, 2, 3])
+        for i, key in enumerate(grouped["keys"]):
+            values = columns["y"][columns["group"] == key]
+            self.assertEqual(grouped["count"][i], len(values))
+            self.assertAlmostEqual(grouped["sum"][i], values.sum())
+            self.assertAlmostEqual(grouped["min"][i], values.min())
+
+    def test_schema_is_enforced(self):
+        store, _ = self.make_store()
+        with self.assertRaises(ValueError):
+            store.append({"x": [1.0]})
+        with self.assertRaises(ValueError):
+            store.append({"x": [1.0], "y": [1.0], "flag": [1.5], "group": [1], "label": ["a"]})
+        with self.assertRaises(ValueError):
+            store.query(("missing", "<", 1))
+        with self.assertRaises(ValueError):
+            store.query(("x", "~", 1))
+
+    def test_records_from_result_dicts(self):
+        store = ResultStore(self.tmp.name)
+        store.append_records([{"mix_ratio": mix, **Distiller(mix).analyze_node(350)} for mix in (0.4, 0.6, 0.8)])
+        self.assertEqual(len(store.query(("recovered_power_w", ">", 0))["mix_ratio"]), 3)
+
+        analyzer = ImpactAnalyzer(volume_l=5.0)
+        sources = ResultStore(f"{self.tmp.name}/sources")
+        sources.append_records([analyzer.analyze_source("CORN", km) for km in (10, 100, 1000)])
+        self.assertEqual(list(sources.query(("feedstock", "==", "Corn (Maize)"))["total_carbon_kg"]),
+                         [analyzer.analyze_source("CORN", km)["total_carbon_kg"] for km in (10, 100, 1000)])
+
+        designs = ResultStore(f"{self.tmp.name}/designs")
+        options = run_evaluation(700, 5.0, "CORN", 100, verbose=False)
+        designs.append_records(design_records(options, tdp_watts=700.0))
+        result = designs.query(("option", "==", "OPTION_B"), columns=["surplus_w", "net_energy_surplus_passed"])
+        self.assertAlmostEqual(result["surplus_w"][0], options["OPTION_B"].tests["NET_ENERGY_SURPLUS"].result_data["surplus_w"])
+        self.assertTrue(result["net_energy_surplus_passed"][0])
+
+    def test_sweep_into_store(self):
+        table = run_sweep(*GRID, workers=1, chunk_size=5)
+        store = run_sweep(*GRID, workers=2, chunk_size=5, store=self.tmp.name)
+        self.assertEqual(store.attrs["option_keys"], table["option_keys"])
+        where = [("total_carbon_kg", "<", 10), ("surplus_w", ">", 0)]
+        result = store.query(where)
+        mask = (table["total_carbon_kg"] < 10) & (table["surplus_w"] > 0)
+        self.assertGreater(mask.sum(), 0)
+        for name in result:
+            np.testing.assert_array_equal(result[name], table[name][mask])
+
+if __name__ == "__main__":
+    unittest.main()
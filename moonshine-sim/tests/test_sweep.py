@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+from moonshine.evaluator import ARCHITECTURES, run_evaluation
+from moonshine.impact import get_feedstock_table
+from moonshine.sweep import run_sweep
+
+GRID = ([350.0, 700.0], [2.0, 5.0, 9.0], ["CORN", "CELLULOSIC"], [50.0, 100.0, 4000.0])
+
+class TestDesignSweep(unittest.TestCase):
+    def test_run_evaluation_is_stateless(self):
+        options = run_evaluation(verbose=False)
+        self.assertTrue(options["OPTION_B"].tests["NET_ENERGY_SURPLUS"].passed)
+        self.assertFalse(ARCHITECTURES["OPTION_B"].tests["NET_ENERGY_SURPLUS"].passed)
+        self.assertIsNot(options["OPTION_B"], ARCHITECTURES["OPTION_B"])
+
+    def test_sweep_matches_run_evaluation(self):
+        table = run_sweep(*GRID, workers=1)
+        keys = table["option_keys"]
+        codes = get_feedstock_table().codes
+        for row in range(0, len(table["surplus_w"]), 7):
+            options = run_evaluation(table["tdp_watts"][row], table["fill_volume_l"][row],
+                                     codes[table["feedstock_index"][row]],
+                                     table["dist_km"][row], verbose=False)
+            opt = options[keys[table["option_index"][row]]]
+            self.assertAlmostEqual(opt.tests["NET_ENERGY_SURPLUS"].result_data["surplus_w"], table["surplus_w"][row])
+            self.assertEqual(opt.tests["ENVIRONMENTAL_IMPACT"].passed, table["environmental_passed"][row])
+            gravity = opt.tests.get("GRAVITY_HEAD_PRESSURE")
+            if gravity is None:
+                self.assertFalse(table["gravity_head_passed"][row])
+                self.assertTrue(np.isnan(table["pressure_bar"][row]))
+            else:
+                self.assertEqual(gravity.passed, table["gravity_head_passed"][row])
+                self.assertAlmostEqual(gravity.result_data["pressure_bar"], table["pressure_bar"][row])
+
+    def test_deterministic_across_workers(self):
+        serial = run_sweep(*GRID, workers=1, chunk_size=5)
+        parallel = run_sweep(*GRID, workers=2, chunk_size=5)
+        for name, column in serial.items():
+            if name != "option_keys":
+                np.testing.assert_array_equal(column, parallel[name])
+
+if __name__ == '__main__':
+    unittest.main()
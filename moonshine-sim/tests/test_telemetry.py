@@ -0,0 +1,110 @@
+import asyncio
+import os
+import tempfile
+import unittest
+import numpy as np
+from moonshine.telemetry import DAY_S, DriftEstimator, TelemetryIngest, parse_lines
+from moonshine.thermo import Distiller, boiling_point, drift_mix, solve_flush_day
+
+def readings(n_nodes, days, leak, m0, noise=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    node = np.repeat(np.arange(n_nodes), len(days))
+    t = np.tile(days, n_nodes)
+    mix = drift_mix(m0[node], leak[node], 0) * (1 - leak[node] / 100 * 1.5) ** t
+    return node, t * DAY_S, mix * np.exp(rng.normal(0, noise, len(mix)))
+
+class TestDriftEstimator(unittest.TestCase):
+    def test_recovers_leak_rate_and_flush_day(self):
+        leak = np.array([0.5, 1.0, 2.0, 0.0])
+        m0 = np.full(4, 0.6)
+        est = DriftEstimator(4)
+        node, t, mix = readings(4, np.arange(0, 8, 0.25), leak, m0)
+        order = np.random.default_rng(1).permutation(len(node))
+        est.update(node[order], t[order], mix[order])
+        e = est.estimates()
+        np.testing.assert_allclose(e["leak_rate_vol_pct_per_day"], leak, atol=1e-9)
+        np.testing.assert_allclose(e["mix_ratio"], m0 * (1 - leak / 100 * 1.5) ** 7.75)
+        # Continuous crossing time lands in the day before the first flagged whole day
+        flush_day = (e["flush_time_s"][:3]) / DAY_S
+        expected = solve_flush_day(m0[:3], leak[:3])
+        self.assertTrue(np.all((flush_day <= expected) & (flush_day > expected - 1)))
+        self.assertEqual(e["flush_time_s"][3], np.inf)
+        self.assertEqual(Distiller(0.6).simulate_drift(2.0, 20, return_flush_day=True)["flush_day"], expected[2])
+        self.assertFalse(e["requires_flush"].any())
+
+    def test_batches_and_flags(self):
+        est = DriftEstimator(3)
+        self.assertTrue(np.isnan(est.estimates()["mix_ratio"]).all())
+        est.update([0, 1], [0.0, 0.0], [0.6, 0.3])
+        est.update([0, 1, 2, 5, 0], [DAY_S, DAY_S, 0.0, 0.0, 2 * DAY_S], [0.59, 0.29, 0.6, 0.5, 1.5])
+        e = est.estimates([0, 1, 2])
+        np.testing.assert_array_equal(e["samples"], [2, 2, 1])
+        self.assertTrue(np.isnan(e["mix_ratio"][2]))
+        self.assertTrue(e["requires_flush"][1])
+        self.assertGreater(e["boiling_point_c"][1], 85)
+        self.assertEqual(e["days_to_flush"][1], 0.0)
+
+    def test_forgetting_tracks_a_new_leak(self):
+        days = np.arange(0, 10, 0.1)
+        leak = np.where(days < 5, 0.2, 2.0)
+        mix = 0.6 * np.cumprod(np.r_[1.0, (1 - leak[:-1] / 100 * 1.5) ** 0.1])
+        batched, at_once, plain = DriftEstimator(1, half_life_days=0.5), DriftEstimator(1, half_life_days=0.5), DriftEstimator(1)
+        for chunk in np.array_split(np.arange(len(days)), 7):
+            batched.update(np.zeros(len(chunk), dtype=int), days[chunk] * DAY_S, mix[chunk])
+        for est in (at_once, plain):
+            est.update(np.zeros(len(days), dtype=int), days * DAY_S, mix)
+        tracked = batched.estimates()["leak_rate_vol_pct_per_day"][0]
+        self.assertAlmostEqual(tracked, at_once.estimates()["leak_rate_vol_pct_per_day"][0], places=9)
+        self.assertAlmostEqual(tracked, 2.0, delta=0.1)
+        self.assertLess(plain.estimates()["leak_rate_vol_pct_per_day"][0], 1.5)
+
+    def test_parse_lines(self):
+        node, t, mix = parse_lines([b"1,10,mix,0.55", b"", b"junk", b"2,11,temp_c,85.0", b"3,1,pressure,1"])
+        np.testing.assert_array_equal(node, [1, 2])
+        np.testing.assert_array_equal(t, [10, 11])
+        self.assertAlmostEqual(float(boiling_point(mix[1])), 85.0, places=3)
+
+class TestTelemetryIngest(unittest.TestCase):
+    def test_socket_and_file_streams(self):
+        n_nodes = 2000
+        leak = np.random.default_rng(0).uniform(0.2, 2.0, n_nodes)
+        node, t, mix = readings(n_nodes, np.arange(0, 6, 0.5), leak, np.full(n_nodes, 0.6))
+        lines = [b"%d,%.3f,mix,%.9f" % row for row in zip(node, t, mix)]
+        half = len(lines) // 2
+
+        async def scenario(tmp):
+            est = DriftEstimator(n_nodes)
+            ingest = TelemetryIngest(est, max_latency_s=0.01, max_batch=5000)
+            runner = asyncio.create_task(ingest.run())
+            server = await ingest.serve_unix(os.path.join(tmp, "telemetry.sock"))
+
+            async def sensor(chunk):
+                _, writer = await asyncio.open_unix_connection(os.path.join(tmp, "telemetry.sock"))
+                writer.write(b"\n".join(chunk) + b"\n")
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+
+            path = os.path.join(tmp, "telemetry.log")
+            with open(path, "wb") as f:
+                f.write(b"\n".join(lines[half:]) + b"\n")
+            tail = asyncio.create_task(ingest.tail_file(path, poll_interval_s=0.01))
+            await asyncio.gather(*(sensor(chunk) for chunk in np.array_split(np.array(lines[:half], dtype=object), 8)))
+            for _ in range(200):
+                if ingest.readings == len(lines):
+                    break
+                await asyncio.sleep(0.01)
+            ingest.stop()
+            await asyncio.gather(runner, tail)
+            server.close()
+            await server.wait_closed()
+            return est, ingest
+
+        with tempfile.TemporaryDirectory() as tmp:
+            est, ingest = asyncio.run(scenario(tmp))
+        self.assertEqual(ingest.readings, len(lines))
+        self.assertGreater(ingest.batches, 1)
+        np.testing.assert_allclose(est.estimates()["leak_rate_vol_pct_per_day"], leak, atol=1e-6)
+
+if __name__ == '__main__':
+    unittest.main()
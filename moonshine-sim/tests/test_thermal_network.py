@@ -0,0 +1,87 @@
+import unittest
+import numpy as np
+from moonshine.designs import hardware_spec
+from moonshine.thermal_network import ThermalNetwork, drivetrain_params, load_conductivities, material_grid
+
+SHAFT_AREA = np.pi * 0.004**2
+K = {"SS": 16.0, "SI3N4": 30.0, "ZRO2": 2.5, "INVAR": 13.0}
+# Spec geometry (data/moonshine_v1.yaml), with the spec's default materials
+GEOMETRY = drivetrain_params()
+
+def _series_leak(k_shaft, k_gears, temp_hot=80, temp_cold=25):
+    # Hand-derived series resistance from the original gearbox script
+    r_total = 0.14 / (k_shaft * SHAFT_AREA) + 0.01 / (k_gears * SHAFT_AREA)
+    return (temp_hot - temp_cold) / r_total
+
+class TestThermalNetwork(unittest.TestCase):
+    def test_passive_scenarios_match_hand_formulas(self):
+        net = ThermalNetwork.from_yaml("drivetrain_passive")
+        solution = net.solve(**dict(GEOMETRY, temp_hot=80, temp_cold=25,
+                                    shaft=["STAINLESS_STEEL", "STAINLESS_STEEL", "STAINLESS_STEEL", "INVAR"],
+                                    gears=["STAINLESS_STEEL", "SILICON_NITRIDE", "ZIRCONIA", "ZIRCONIA"]))
+        expected = [
+            (80 - 25) * K["SS"] * SHAFT_AREA / 0.15,
+            _series_leak(K["SS"], K["SI3N4"]),
+            _series_leak(K["SS"], K["ZRO2"]),
+            _series_leak(K["INVAR"], K["ZRO2"]),
+        ]
+        np.testing.assert_allclose(solution.flow("gears", "fan"), expected, rtol=1e-10)
+        # Series network: the same heat enters and leaves
+        np.testing.assert_allclose(solution.flow("turbine", "gears"), expected, rtol=1e-10)
+
+    def test_active_break_matches_node_balance(self):
+        net = ThermalNetwork.from_yaml("drivetrain_active")
+        solution = net.solve(**dict(GEOMETRY, temp_hot=80, temp_cold=25, temp_air=25, h_air=50, fin_area=0.01))
+
+        r_in = 0.05 / (K["SS"] * SHAFT_AREA) + 0.01 / (K["ZRO2"] * SHAFT_AREA)
+        r_out = 0.10 / (K["SS"] * SHAFT_AREA)
+        r_conv = 1 / (50 * 0.01)
+        t_gearbox = (80 / r_in + 25 / r_conv + 25 / r_out) / (1 / r_in + 1 / r_conv + 1 / r_out)
+        self.assertAlmostEqual(solution.temperature("gearbox")[0], t_gearbox, places=10)
+        self.assertAlmostEqual(solution.flow("gearbox", "fan")[0], (t_gearbox - 25) / r_out, places=12)
+
+    def test_energy_balance_on_free_nodes(self):
+        net = ThermalNetwork.from_yaml("drivetrain_enclosure")
+        materials = list(load_conductivities())
+        grid = material_grid(shaft=materials, gears=materials, housing=["ALUMINUM_6061", "G10"],
+                             mounts=["G10"])
+        solution = net.solve(temp_hot=80, temp_cold=25, temp_air=25, shaft_area=SHAFT_AREA,
+                             h_air=50, fin_area=0.01, **grid)
+        self.assertEqual(solution.temperatures_c.shape, (len(materials) ** 2 * 2, len(net.node_names)))
+
+        a = [net.node_index[link["from"]] for link in net.links]
+        b = [net.node_index[link["to"]] for link in net.links]
+        net_in = np.zeros_like(solution.temperatures_c)
+        np.add.at(net_in.T, b, solution.heat_flow_w.T)
+        np.add.at(net_in.T, a, -solution.heat_flow_w.T)
+        free = ~net.fixed
+        np.testing.assert_allclose(net_in[:, free], 0.0, atol=1e-10)
+        temps = solution.temperatures_c[:, free]
+        self.assertTrue(np.all((temps >= 25 - 1e-9) & (temps <= 80 + 1e-9)))
+
+    def test_spec_variants_change_the_leak(self):
+        net = ThermalNetwork.from_yaml("drivetrain_passive")
+        leak = {name: float(net.solve(**drivetrain_params(hardware_spec(name)), temp_hot=80, temp_cold=25)
+                            .flow("gears", "fan")[0])
+                for name in (None, "short_shaft", "full_thermal_break")}
+        self.assertAlmostEqual(leak[None], _series_leak(K["SS"], K["ZRO2"]), places=12)
+        self.assertGreater(leak["short_shaft"], leak[None])
+        self.assertAlmostEqual(leak["full_thermal_break"], _series_leak(K["INVAR"], K["ZRO2"]), places=12)
+
+    def test_numeric_conductivity_and_validation(self):
+        net = ThermalNetwork.from_yaml("drivetrain_passive")
+        geometry = dict(GEOMETRY)
+        del geometry["shaft"], geometry["gears"]
+        by_name = net.solve(temp_hot=80, temp_cold=25, shaft="INVAR", gears="ZIRCONIA", **geometry)
+        by_k = net.solve(temp_hot=80, temp_cold=25, shaft=13.0, gears=2.5, **geometry)
+        np.testing.assert_allclose(by_name.heat_flow_w, by_k.heat_flow_w)
+
+        with self.assertRaises(ValueError):
+            net.solve(temp_hot=80, temp_cold=25, shaft="UNOBTAINIUM", gears=2.5, **geometry)
+        with self.assertRaises(ValueError):
+            net.solve(temp_hot=80, temp_cold=25, shaft="INVAR", gears=2.5)
+        with self.assertRaises(ValueError):
+            ThermalNetwork({"a": {}, "b": {}}, [{"type": "conduction", "from": "a", "to": "b"}], {})
+
+if __name__ == '__main__':
+    unittest.main()
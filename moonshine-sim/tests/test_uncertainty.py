@@ -0,0 +1,70 @@
+import unittest
+import numpy as np
+from moonshine.thermo import Distiller
+from moonshine.impact import ImpactAnalyzer
+from moonshine.uncertainty import (OUTPUTS, RunningStats, StreamingHistogram, evaluate_samples,
+                                   run_uncertainty)
+
+class TestStreamingStats(unittest.TestCase):
+    def test_running_stats_match_numpy(self):
+        rng = np.random.default_rng(3)
+        values = rng.lognormal(0.0, 0.5, 200_000)
+        stats = RunningStats()
+        for chunk in np.array_split(values, 13):
+            stats.update(chunk)
+        self.assertAlmostEqual(stats.mean, values.mean(), places=10)
+        self.assertAlmostEqual(stats.variance, values.var(ddof=1), places=10)
+        self.assertEqual(stats.min, values.min())
+        q = [0.01, 0.5, 0.99]
+        np.testing.assert_allclose(stats.quantile(q), np.quantile(values, q), atol=3 * np.ptp(values) / 4096)
+
+    def test_merge_equals_single_stream(self):
+        rng = np.random.default_rng(4)
+        a, b = rng.normal(-50, 1, 5000), rng.normal(1e4, 300, 7000)
+        merged, left = RunningStats(), RunningStats()
+        left.update(a)
+        right = RunningStats()
+        right.update(b)
+        merged.merge(left)
+        merged.merge(right)
+        both = np.concatenate([a, b])
+        self.assertEqual(merged.count, len(both))
+        self.assertAlmostEqual(merged.mean, both.mean(), places=8)
+        self.assertAlmostEqual(merged.variance / both.var(ddof=1), 1.0, places=12)
+        self.assertEqual(merged.histogram.count, len(both))
+
+        single = StreamingHistogram()
+        single.update(a)
+        single.update(b)
+        np.testing.assert_allclose(merged.histogram.quantile([0.1, 0.5, 0.9]), single.quantile([0.1, 0.5, 0.9]))
+
+class TestMonteCarlo(unittest.TestCase):
+    def test_point_estimates_reproduce_deterministic_models(self):
+        fixed = {"turbine_efficiency": np.full(3, 0.15)}
+        out = evaluate_samples(fixed, mix_ratio=0.6, tdp_watts=350, feedstock="CORN", distance_km=500)
+        node = Distiller(0.6).analyze_node(350)
+        source = ImpactAnalyzer(1000).analyze_source("CORN", 500)
+        np.testing.assert_allclose(out["vol_flow_ml_min"], node["vol_flow_ml_min"])
+        np.testing.assert_allclose(out["recovered_power_w"], node["recovered_power_w"])
+        np.testing.assert_allclose(out["total_carbon_kg"], source["total_carbon_kg"])
+
+    def test_reproducible_across_workers(self):
+        kwargs = dict(n_samples=20_000, seed=7, streams=4, batch_size=3000)
+        serial = run_uncertainty(workers=1, **kwargs)
+        parallel = run_uncertainty(workers=2, **kwargs)
+        for name in OUTPUTS:
+            self.assertEqual(serial[name].count, 20_000)
+            self.assertEqual(serial[name].summary(), parallel[name].summary())
+        other = run_uncertainty(workers=1, **dict(kwargs, seed=8))
+        self.assertNotEqual(serial["total_carbon_kg"].mean, other["total_carbon_kg"].mean)
+
+    def test_fixed_distributions_collapse(self):
+        stats = run_uncertainty(1000, distributions={"turbine_efficiency": {"dist": "fixed", "value": 0.2}},
+                                workers=1)
+        self.assertAlmostEqual(stats["recovered_power_w"].mean, 70.0)
+        self.assertEqual(stats["recovered_power_w"].std, 0.0)
+        with self.assertRaises(ValueError):
+            run_uncertainty(10, distributions={"turbine_efficiency": {"dist": "cauchy"}}, workers=1)
+
+if __name__ == '__main__':
+    unittest.main()